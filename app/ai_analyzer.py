@@ -1,13 +1,20 @@
-import logging
+import json
 import os
 import sys
+import threading
+import time
 from dotenv import load_dotenv
+import httpx
 import openai
-from tkinter import messagebox
+from app import settings, telemetry
+from app.rate_limiter import RequestScheduler
+from app.tokens import estimate_tokens
 
 
 class AIAnalyzer:
-    def __init__(self):
+    STREAM_EMIT_INTERVAL = 0.1
+
+    def __init__(self, max_concurrent_requests=None):
         if getattr(sys, "frozen", False):
             env_path = os.path.join(sys._MEIPASS, ".env")
         else:
@@ -17,37 +24,129 @@ class AIAnalyzer:
         load_dotenv(env_path)
         openai.api_key = os.getenv("OPENAI_API_KEY")
 
-    def analyze(self, task, content, model="gpt-4o-mini"):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.scheduler = RequestScheduler(max_concurrent=max_concurrent_requests)
+
+    def get_client(self):
+        """Return the shared OpenAI client, creating it on first use.
+
+        Created lazily so an API key entered after start-up is picked up. The
+        underlying httpx client is thread-safe, so all worker threads share one
+        connection pool and reuse kept-alive TLS connections.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @staticmethod
+    def _create_client():
+        http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=10.0),
+        )
+        # Retries are handled by the RequestScheduler, which also honours
+        # the rate limit budgets
+        return openai.OpenAI(http_client=http_client, max_retries=0)
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        """Return the analysis Markdown.
+
+        When on_delta is given the response is streamed and on_delta is called
+        with the text received so far, at most every STREAM_EMIT_INTERVAL seconds.
+        """
         # logging.getLogger("app").info(f"Analyzing with ChatGPT: {task}")
-        try:
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "developer" if model in ["o1", "o3-mini"] else "system",
-                        "content": task
-                        + "Generated response must be compatible with markdown2 for pretty rendering, so avoid unexpected characters and wrap code snippets carefully.",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Please analyze this for me:\n{content}",
-                    },
-                ],
-            )
-
-            # logging.getLogger("app").info("Response generated" + str(response))
-            print("model:", model)
+        # Errors are raised rather than shown here: this runs on worker threads,
+        # and Tk dialogs must only be opened from the main loop.
+        started = time.perf_counter()
+        client = self.get_client()
+
+        messages = [
+            {
+                "role": "developer" if model in ["o1", "o3-mini"] else "system",
+                "content": task
+                + "Generated response must be compatible with markdown2 for pretty rendering, so avoid unexpected characters and wrap code snippets carefully.",
+            },
+            {
+                "role": "user",
+                "content": f"Please analyze this for me:\n{content}",
+            },
+        ]
 
+        tokens = (
+            estimate_tokens(messages[0]["content"])
+            + estimate_tokens(messages[1]["content"])
+            + settings.RATE_LIMIT_OUTPUT_TOKENS
+        )
+        context = telemetry.current()
+        record = telemetry.RequestRecord(
+            context.task if context else None,
+            model,
+            on_delta is not None,
+            len(json.dumps({"model": model, "messages": messages}).encode("utf-8")),
+            telemetry.take_queued_at() or started,
+        )
+
+        def complete():
+            record.start_attempt()
+            if on_delta is not None:
+                return self._stream(client, model, messages, on_delta, record)
+            response = client.chat.completions.create(model=model, messages=messages)
+            record.set_usage(response.usage)
             return response.choices[0].message.content
 
-            # return self._return_test_response()
+        try:
+            result = self.scheduler.run(model, tokens, complete)
+        except Exception:
+            record.status = "failed"
+            raise
+        finally:
+            record.finished_at = time.perf_counter()
+            telemetry.record_request(record)
+        return result
+
+        # return self._return_test_response()
+
+    def _stream(self, client, model, messages, on_delta, record):
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        parts = []
+        last_emit = 0.0
+        for chunk in stream:
+            # Usage comes in a final chunk without choices
+            if chunk.usage is not None:
+                record.set_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+
+            record.first_token()
+            parts.append(delta)
+            now = time.monotonic()
+            if now - last_emit >= self.STREAM_EMIT_INTERVAL:
+                on_delta("".join(parts))
+                last_emit = now
 
-        except Exception as e:
-            messagebox.showerror(
-                "API Error", f"Failed to analyze with ChatGPT: {str(e)}"
-            )
-            return None
+        return "".join(parts)
 
     @staticmethod
     def _return_test_response():
@@ -0,0 +1,184 @@
+from app.task_context import ALL_FIELDS, TASK_CONTEXT
+
+ACTIONS = ("added", "removed", "changed")
+
+
+class Change:
+    __slots__ = ("kind", "ref", "action", "fields", "calculated")
+
+    def __init__(self, kind, ref, action, fields, calculated=False):
+        self.kind = kind  # TMSL section, e.g. "measures" or "relationships"
+        self.ref = ref
+        self.action = action
+        # TMSL properties that differ; every property for added/removed objects
+        self.fields = fields
+        # Calculated column or calculated table partition, on either side
+        self.calculated = calculated
+
+    def __repr__(self):
+        return f"Change({self.action} {self.kind} {self.ref})"
+
+
+class ModelDiff:
+    """Semantic differences between two versions of a SemanticModel.
+
+    Objects are matched by name (relationships by name, or by their
+    endpoints when unnamed) and compared on their parsed properties, so
+    formatting, property order and pruned metadata don't count as changes.
+    """
+
+    def __init__(self, old, new):
+        self.changes = []
+        self._compare_model(old, new)
+        self._compare(
+            "tables",
+            {t.name: t for t in old.tables},
+            {t.name: t for t in new.tables},
+            lambda table: table.to_dict(include_children=False),
+        )
+        for kind, children in (
+            ("columns", lambda table: table.columns),
+            ("measures", lambda table: table.measures),
+            ("hierarchies", lambda table: table.hierarchies),
+            ("partitions", lambda table: table.partitions),
+        ):
+            self._compare(
+                kind,
+                {
+                    f"{table.name}[{item.name}]": item
+                    for table in old.tables
+                    for item in children(table)
+                },
+                {
+                    f"{table.name}[{item.name}]": item
+                    for table in new.tables
+                    for item in children(table)
+                },
+            )
+        for kind, key in (
+            ("relationships", _relationship_key),
+            ("roles", lambda role: role.name),
+            ("perspectives", lambda perspective: perspective.name),
+        ):
+            self._compare(
+                kind,
+                {key(item): item for item in getattr(old, kind)},
+                {key(item): item for item in getattr(new, kind)},
+            )
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def _compare_model(self, old, new):
+        for field, old_value, new_value in (
+            ("culture", old.culture, new.culture),
+            ("compatibilityLevel", old.compatibility_level, new.compatibility_level),
+            ("dataSources", old.data_sources, new.data_sources),
+        ):
+            if old_value != new_value:
+                self.changes.append(Change("model", field, "changed", (field,)))
+        if old.report != new.report:
+            # Only tasks whose slice includes the layout, or the whole file
+            self.changes.append(Change("report", "layout", "changed", ("layout",)))
+        self._compare(
+            "expressions",
+            {name: {"expression": text} for name, text in old.expressions.items()},
+            {name: {"expression": text} for name, text in new.expressions.items()},
+            lambda data: data,
+        )
+
+    def _compare(self, kind, old_items, new_items, to_dict=None):
+        to_dict = to_dict or (lambda item: item.to_dict())
+        for ref, item in old_items.items():
+            if ref not in new_items:
+                data = to_dict(item)
+                self.changes.append(
+                    Change(kind, ref, "removed", tuple(data), _is_calculated(item))
+                )
+        for ref, item in new_items.items():
+            old_item = old_items.get(ref)
+            data = to_dict(item)
+            if old_item is None:
+                self.changes.append(
+                    Change(kind, ref, "added", tuple(data), _is_calculated(item))
+                )
+                continue
+            old_data = to_dict(old_item)
+            if old_data != data:
+                fields = tuple(
+                    field
+                    for field in dict.fromkeys((*old_data, *data))
+                    if old_data.get(field) != data.get(field)
+                )
+                self.changes.append(
+                    Change(
+                        kind,
+                        ref,
+                        "changed",
+                        fields,
+                        _is_calculated(item) or _is_calculated(old_item),
+                    )
+                )
+
+    def counts(self):
+        """{kind: {action: count}} for the changed object kinds."""
+        counts = {}
+        for change in self.changes:
+            by_action = counts.setdefault(change.kind, dict.fromkeys(ACTIONS, 0))
+            by_action[change.action] += 1
+        return counts
+
+    def summary(self):
+        if not self.changes:
+            return "no semantic changes"
+        return "; ".join(
+            f"{kind}: "
+            + ", ".join(
+                f"{count} {action}" for action, count in by_action.items() if count
+            )
+            for kind, by_action in self.counts().items()
+        )
+
+    def affects(self, selector):
+        """True if any change shows up in a task's slice (see TASK_CONTEXT)."""
+        return any(_affects(change, selector) for change in self.changes)
+
+    def affected_tasks(self, task_names, selectors=None):
+        """The tasks whose context changed; tasks without a selector see everything."""
+        selectors = TASK_CONTEXT if selectors is None else selectors
+        return [
+            task_name
+            for task_name in task_names
+            if self.changes
+            and (selectors.get(task_name) is None or self.affects(selectors[task_name]))
+        ]
+
+
+def _relationship_key(relationship):
+    return relationship.name or (
+        f"{relationship.from_table}[{relationship.from_column}] -> "
+        f"{relationship.to_table}[{relationship.to_column}]"
+    )
+
+
+def _is_calculated(item):
+    if getattr(item, "column_type", None) == "calculated":
+        return True
+    return getattr(item, "source_type", None) == "calculated"
+
+
+def _affects(change, selector):
+    if change.kind == "tables" and change.action != "changed":
+        # A table coming or going changes every slice that lists its objects
+        return True
+
+    fields = selector.get(change.kind)
+    if not fields and change.calculated:
+        fields = selector.get(
+            "calculated_columns" if change.kind == "columns" else "calculated_tables"
+        )
+    if not fields:
+        return False
+    if fields == ALL_FIELDS:
+        return True
+    return any(field in fields for field in change.fields)
@@ -0,0 +1,526 @@
+import json
+from collections import defaultdict
+
+
+def _text(value):
+    """TMSL stores multi-line expressions either as a string or a list of lines."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return "\n".join(str(line) for line in value)
+    return str(value)
+
+
+def _objects(data, key):
+    """The list of objects under key; malformed TMSL raises ValueError."""
+    items = data.get(key)
+    if items is None:
+        return []
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ValueError(f'"{key}" must be a list of objects')
+    return items
+
+
+def _compact(data):
+    """Drop unset and default-valued keys so serialised slices stay small."""
+    return {
+        key: value
+        for key, value in data.items()
+        if value not in (None, False, "", [], {})
+    }
+
+
+class Column:
+    __slots__ = (
+        "name",
+        "table",
+        "data_type",
+        "column_type",
+        "expression",
+        "source_column",
+        "description",
+        "format_string",
+        "data_category",
+        "summarize_by",
+        "sort_by_column",
+        "display_folder",
+        "is_hidden",
+        "is_key",
+    )
+
+    def __init__(self, table, data):
+        self.name = data.get("name", "")
+        self.table = table
+        self.data_type = data.get("dataType")
+        self.column_type = data.get("type", "data")
+        self.expression = _text(data.get("expression"))
+        self.source_column = data.get("sourceColumn")
+        self.description = _text(data.get("description"))
+        self.format_string = data.get("formatString")
+        self.data_category = data.get("dataCategory")
+        self.summarize_by = data.get("summarizeBy")
+        self.sort_by_column = data.get("sortByColumn")
+        self.display_folder = data.get("displayFolder")
+        self.is_hidden = bool(data.get("isHidden", False))
+        self.is_key = bool(data.get("isKey", False))
+
+    @property
+    def is_calculated(self):
+        return self.column_type == "calculated"
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "dataType": self.data_type,
+                "type": self.column_type if self.column_type != "data" else None,
+                "expression": self.expression,
+                "sourceColumn": self.source_column,
+                "description": self.description,
+                "formatString": self.format_string,
+                "dataCategory": self.data_category,
+                "summarizeBy": self.summarize_by,
+                "sortByColumn": self.sort_by_column,
+                "displayFolder": self.display_folder,
+                "isHidden": self.is_hidden,
+                "isKey": self.is_key,
+            }
+        )
+
+    def __repr__(self):
+        return f"Column({self.table}[{self.name}])"
+
+
+class Measure:
+    __slots__ = (
+        "name",
+        "table",
+        "expression",
+        "description",
+        "format_string",
+        "display_folder",
+        "is_hidden",
+    )
+
+    def __init__(self, table, data):
+        self.name = data.get("name", "")
+        self.table = table
+        self.expression = _text(data.get("expression")) or ""
+        self.description = _text(data.get("description"))
+        self.format_string = data.get("formatString")
+        self.display_folder = data.get("displayFolder")
+        self.is_hidden = bool(data.get("isHidden", False))
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "expression": self.expression,
+                "description": self.description,
+                "formatString": self.format_string,
+                "displayFolder": self.display_folder,
+                "isHidden": self.is_hidden,
+            }
+        )
+
+    def __repr__(self):
+        return f"Measure({self.table}[{self.name}])"
+
+
+class Hierarchy:
+    __slots__ = ("name", "table", "levels", "description", "is_hidden")
+
+    def __init__(self, table, data):
+        self.name = data.get("name", "")
+        self.table = table
+        levels = sorted(
+            _objects(data, "levels"), key=lambda level: level.get("ordinal", 0)
+        )
+        # (level name, column name) pairs in drill-down order
+        self.levels = tuple(
+            (level.get("name", ""), level.get("column", "")) for level in levels
+        )
+        self.description = _text(data.get("description"))
+        self.is_hidden = bool(data.get("isHidden", False))
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "description": self.description,
+                "isHidden": self.is_hidden,
+                "levels": [
+                    {"name": name, "ordinal": ordinal, "column": column}
+                    for ordinal, (name, column) in enumerate(self.levels)
+                ],
+            }
+        )
+
+
+class Partition:
+    __slots__ = ("name", "table", "mode", "source_type", "expression", "query_group")
+
+    def __init__(self, table, data):
+        source = data.get("source") or {}
+        self.name = data.get("name", "")
+        self.table = table
+        self.mode = data.get("mode")
+        self.source_type = source.get("type")
+        self.expression = _text(source.get("expression") or source.get("query"))
+        self.query_group = data.get("queryGroup")
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "mode": self.mode,
+                "queryGroup": self.query_group,
+                "source": _compact(
+                    {"type": self.source_type, "expression": self.expression}
+                ),
+            }
+        )
+
+
+class Relationship:
+    __slots__ = (
+        "name",
+        "from_table",
+        "from_column",
+        "to_table",
+        "to_column",
+        "from_cardinality",
+        "to_cardinality",
+        "cross_filtering",
+        "security_filtering",
+        "is_active",
+    )
+
+    def __init__(self, data):
+        self.name = data.get("name", "")
+        self.from_table = data.get("fromTable", "")
+        self.from_column = data.get("fromColumn", "")
+        self.to_table = data.get("toTable", "")
+        self.to_column = data.get("toColumn", "")
+        self.from_cardinality = data.get("fromCardinality", "many")
+        self.to_cardinality = data.get("toCardinality", "one")
+        self.cross_filtering = data.get("crossFilteringBehavior", "oneDirection")
+        self.security_filtering = data.get("securityFilteringBehavior")
+        self.is_active = bool(data.get("isActive", True))
+
+    @property
+    def is_bidirectional(self):
+        return self.cross_filtering == "bothDirections"
+
+    def to_dict(self):
+        data = _compact(
+            {
+                "name": self.name,
+                "fromTable": self.from_table,
+                "fromColumn": self.from_column,
+                "toTable": self.to_table,
+                "toColumn": self.to_column,
+                "securityFilteringBehavior": self.security_filtering,
+            }
+        )
+        # Only non-default relationship settings are emitted, as in TMSL itself
+        if self.from_cardinality != "many":
+            data["fromCardinality"] = self.from_cardinality
+        if self.to_cardinality != "one":
+            data["toCardinality"] = self.to_cardinality
+        if self.cross_filtering != "oneDirection":
+            data["crossFilteringBehavior"] = self.cross_filtering
+        if not self.is_active:
+            data["isActive"] = False
+        return data
+
+    def __repr__(self):
+        return (
+            f"Relationship({self.from_table}[{self.from_column}] -> "
+            f"{self.to_table}[{self.to_column}])"
+        )
+
+
+class Role:
+    __slots__ = ("name", "model_permission", "table_permissions", "member_count")
+
+    def __init__(self, data):
+        self.name = data.get("name", "")
+        self.model_permission = data.get("modelPermission")
+        # table name -> row-level security filter expression
+        self.table_permissions = {
+            permission.get("name", ""): _text(permission.get("filterExpression"))
+            for permission in _objects(data, "tablePermissions")
+        }
+        self.member_count = len(data.get("members", []))
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "modelPermission": self.model_permission,
+                "tablePermissions": [
+                    _compact({"name": table, "filterExpression": expression})
+                    for table, expression in self.table_permissions.items()
+                ],
+            }
+        )
+
+
+class Perspective:
+    __slots__ = ("name", "tables")
+
+    def __init__(self, data):
+        self.name = data.get("name", "")
+        # table name -> tuple of visible object names (columns, measures, hierarchies)
+        self.tables = {
+            table.get("name", ""): tuple(
+                item.get("name", "")
+                for kind in ("columns", "measures", "hierarchies")
+                for item in _objects(table, kind)
+            )
+            for table in _objects(data, "tables")
+        }
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "tables": [
+                {"name": table, "objects": list(objects)}
+                for table, objects in self.tables.items()
+            ],
+        }
+
+
+class Table:
+    __slots__ = (
+        "name",
+        "description",
+        "data_category",
+        "is_hidden",
+        "is_private",
+        "annotations",
+        "columns",
+        "measures",
+        "hierarchies",
+        "partitions",
+        "columns_by_name",
+        "measures_by_name",
+        "is_calculation_group",
+    )
+
+    def __init__(self, data):
+        self.name = data.get("name", "")
+        self.description = _text(data.get("description"))
+        self.data_category = data.get("dataCategory")
+        self.is_hidden = bool(data.get("isHidden", False))
+        self.is_private = bool(data.get("isPrivate", False))
+        self.annotations = {
+            annotation.get("name", ""): _text(annotation.get("value"))
+            for annotation in _objects(data, "annotations")
+        }
+        self.columns = [
+            Column(self.name, column) for column in _objects(data, "columns")
+        ]
+        self.measures = [
+            Measure(self.name, measure) for measure in _objects(data, "measures")
+        ]
+        self.hierarchies = [
+            Hierarchy(self.name, hierarchy)
+            for hierarchy in _objects(data, "hierarchies")
+        ]
+        self.partitions = [
+            Partition(self.name, partition)
+            for partition in _objects(data, "partitions")
+        ]
+        self.columns_by_name = {column.name: column for column in self.columns}
+        self.measures_by_name = {measure.name: measure for measure in self.measures}
+        self.is_calculation_group = "calculationGroup" in data
+
+    def column(self, name):
+        return self.columns_by_name.get(name)
+
+    def to_dict(self, include_children=True):
+        data = {
+            "name": self.name,
+            "description": self.description,
+            "dataCategory": self.data_category,
+            "isHidden": self.is_hidden,
+            "isPrivate": self.is_private,
+        }
+        if include_children:
+            data["columns"] = [column.to_dict() for column in self.columns]
+            data["measures"] = [measure.to_dict() for measure in self.measures]
+            data["hierarchies"] = [
+                hierarchy.to_dict() for hierarchy in self.hierarchies
+            ]
+            data["partitions"] = [partition.to_dict() for partition in self.partitions]
+        return _compact(data)
+
+    def __repr__(self):
+        return f"Table({self.name})"
+
+
+class SemanticModel:
+    """Compact, indexed view of a TMSL (.bim) model."""
+
+    __slots__ = (
+        "name",
+        "compatibility_level",
+        "culture",
+        "data_sources",
+        "expressions",
+        "tables",
+        "relationships",
+        "roles",
+        "perspectives",
+        "tables_by_name",
+        "measures_by_name",
+        "relationships_by_table",
+        "column_names",
+        "report",
+    )
+
+    def __init__(self, name="", compatibility_level=None, culture=None):
+        self.name = name
+        self.compatibility_level = compatibility_level
+        self.culture = culture
+        self.data_sources = []
+        self.expressions = {}  # shared M expression name -> expression text
+        self.tables = []
+        self.relationships = []
+        self.roles = []
+        self.perspectives = []
+        self.tables_by_name = {}
+        self.measures_by_name = {}
+        self.relationships_by_table = defaultdict(list)
+        # Names of the columns of every table, for unqualified references
+        self.column_names = set()
+        # Report layout summary of a .pbix / .pbit (see app/pbix_reader.py)
+        self.report = None
+
+    @classmethod
+    def from_dict(cls, data):
+        model_data = model_object(data)
+        model = cls(
+            name=data.get("name", model_data.get("name", "")),
+            compatibility_level=data.get("compatibilityLevel"),
+            culture=model_data.get("culture"),
+        )
+        model.load_model_properties(model_data)
+        for table in _objects(model_data, "tables"):
+            model.add_table(Table(table))
+        return model
+
+    def load_model_properties(self, model_data):
+        """Load everything under "model" except the tables."""
+        self.culture = model_data.get("culture", self.culture)
+        self.data_sources = [
+            source.get("name", "") for source in _objects(model_data, "dataSources")
+        ]
+        self.expressions = {
+            expression.get("name", ""): _text(expression.get("expression"))
+            for expression in _objects(model_data, "expressions")
+        }
+        for relationship in _objects(model_data, "relationships"):
+            self.add_relationship(Relationship(relationship))
+        self.roles = [Role(role) for role in _objects(model_data, "roles")]
+        self.perspectives = [
+            Perspective(perspective)
+            for perspective in _objects(model_data, "perspectives")
+        ]
+
+    def add_table(self, table):
+        self.tables.append(table)
+        self.tables_by_name[table.name] = table
+        for measure in table.measures:
+            self.measures_by_name[measure.name] = measure
+        self.column_names.update(table.columns_by_name)
+
+    def add_relationship(self, relationship):
+        self.relationships.append(relationship)
+        self.relationships_by_table[relationship.from_table].append(relationship)
+        if relationship.to_table != relationship.from_table:
+            self.relationships_by_table[relationship.to_table].append(relationship)
+
+    def table(self, name):
+        return self.tables_by_name.get(name)
+
+    def column(self, table_name, column_name):
+        table = self.tables_by_name.get(table_name)
+        return table.column(column_name) if table else None
+
+    def measure(self, name):
+        return self.measures_by_name.get(name)
+
+    def has_column(self, name):
+        """True if any table has a column of this name."""
+        return name in self.column_names
+
+    def iter_columns(self):
+        for table in self.tables:
+            yield from table.columns
+
+    def iter_measures(self):
+        for table in self.tables:
+            yield from table.measures
+
+    def stats(self):
+        return {
+            "tables": len(self.tables),
+            "columns": sum(len(table.columns) for table in self.tables),
+            "calculated_columns": sum(
+                1 for column in self.iter_columns() if column.is_calculated
+            ),
+            "measures": len(self.measures_by_name),
+            "hierarchies": sum(len(table.hierarchies) for table in self.tables),
+            "partitions": sum(len(table.partitions) for table in self.tables),
+            "relationships": len(self.relationships),
+            "roles": len(self.roles),
+            "perspectives": len(self.perspectives),
+        }
+
+    def to_dict(self):
+        return _compact(
+            {
+                "name": self.name,
+                "compatibilityLevel": self.compatibility_level,
+                "model": _compact(
+                    {
+                        "culture": self.culture,
+                        "dataSources": [{"name": name} for name in self.data_sources],
+                        "expressions": [
+                            {"name": name, "expression": expression}
+                            for name, expression in self.expressions.items()
+                        ],
+                        "tables": [table.to_dict() for table in self.tables],
+                        "relationships": [
+                            relationship.to_dict()
+                            for relationship in self.relationships
+                        ],
+                        "roles": [role.to_dict() for role in self.roles],
+                        "perspectives": [
+                            perspective.to_dict() for perspective in self.perspectives
+                        ],
+                    }
+                ),
+            }
+        )
+
+
+def model_object(data):
+    """The "model" object of a TMSL document, or the document itself."""
+    model_data = data.get("model", data)
+    if not isinstance(model_data, dict):
+        raise ValueError('"model" must be an object')
+    return model_data
+
+
+def parse_bim(content):
+    """Parse .bim (TMSL JSON) text into a SemanticModel."""
+    if isinstance(content, (bytes, bytearray)):
+        content = content.decode("utf-8-sig")
+    data = json.loads(content.lstrip("\ufeff"))
+    if not isinstance(data, dict):
+        raise ValueError("TMSL root must be an object")
+    return SemanticModel.from_dict(data)
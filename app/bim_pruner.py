@@ -0,0 +1,98 @@
+import json
+import logging
+from collections import Counter
+
+from app import settings
+from app.tokens import estimate_tokens
+
+# Properties that describe tooling state rather than model semantics
+DEFAULT_PRUNED_PROPERTIES = (
+    "lineageTag",
+    "sourceLineageTag",
+    "annotations",
+    "extendedProperties",
+    "changedProperties",
+    "formatString",
+    "formatStringDefinition",
+    "isDataTypeInferred",
+    "isNameInferred",
+    "sourceProviderType",
+    "modifiedTime",
+    "structureModifiedTime",
+    "refreshedTime",
+    "lastProcessed",
+    "lastUpdate",
+    "lastSchemaUpdate",
+)
+
+DEFAULT_PRUNED_PREFIXES = ("PBI_", "__PBI")
+
+
+class BimPruner:
+    """Drops non-semantic metadata from .bim JSON before it is sent to the model."""
+
+    def __init__(self, properties=None, prefixes=None, minify=True):
+        if properties is None:
+            properties = settings.BIM_PRUNE_PROPERTIES or DEFAULT_PRUNED_PROPERTIES
+        self.properties = frozenset(properties)
+        self.prefixes = tuple(
+            prefixes if prefixes is not None else DEFAULT_PRUNED_PREFIXES
+        )
+        self.minify = minify
+
+    def is_pruned(self, key):
+        return key in self.properties or key.startswith(self.prefixes)
+
+    def pairs_hook(self, removed):
+        """object_pairs_hook for json that drops pruned keys, counting them."""
+        properties = self.properties
+        prefixes = self.prefixes
+
+        def drop_properties(pairs):
+            kept = {}
+            for key, value in pairs:
+                if key in properties or key.startswith(prefixes):
+                    removed[key] += 1
+                else:
+                    kept[key] = value
+            return kept
+
+        return drop_properties
+
+    def prune_data(self, content):
+        """Parse .bim text, dropping pruned properties. Returns (data, removed counts)."""
+        removed = Counter()
+        data = json.loads(
+            content.lstrip("\ufeff"), object_pairs_hook=self.pairs_hook(removed)
+        )
+        return data, removed
+
+    def prune(self, content):
+        """Return (pruned_text, report). Content that isn't JSON is returned as-is."""
+        try:
+            data, removed = self.prune_data(content)
+        except ValueError as e:
+            logging.getLogger("app").warning(f"Skipping pruning, invalid JSON: {e}")
+            return content, self.report(content, content, Counter())
+
+        if self.minify:
+            pruned = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        else:
+            pruned = json.dumps(data, ensure_ascii=False, indent=2)
+        return pruned, self.report(content, pruned, removed)
+
+    @staticmethod
+    def report(original, pruned, removed):
+        original_bytes = len(original.encode("utf-8"))
+        pruned_bytes = len(pruned.encode("utf-8"))
+        original_tokens = estimate_tokens(original)
+        pruned_tokens = estimate_tokens(pruned)
+        return {
+            "original_bytes": original_bytes,
+            "pruned_bytes": pruned_bytes,
+            "bytes_saved": original_bytes - pruned_bytes,
+            "original_tokens": original_tokens,
+            "pruned_tokens": pruned_tokens,
+            "tokens_saved": original_tokens - pruned_tokens,
+            "removed_properties": dict(removed.most_common()),
+        }
@@ -0,0 +1,272 @@
+import codecs
+import json
+import logging
+import os
+import sys
+from collections import Counter
+
+from app import settings
+from app.bim_model import SemanticModel, Table, model_object
+from app.bim_pruner import BimPruner
+from app.tokens import CHARS_PER_TOKEN
+
+WHITESPACE = " \t\r\n"
+
+
+def detect_encoding(head):
+    """Guess the encoding of JSON bytes from their BOM or leading zero bytes."""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    # JSON starts with an ASCII character, so UTF-16 without a BOM shows up
+    # as a zero byte next to it
+    if len(head) >= 2:
+        if head[0] == 0 and head[1] != 0:
+            return "utf-16-be"
+        if head[0] != 0 and head[1] == 0:
+            return "utf-16-le"
+    return "utf-8"
+
+
+def peak_memory():
+    """Peak resident memory of the process in bytes, where the OS reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class JsonTextStream:
+    """Decoded text of a file, buffered a chunk at a time."""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = None
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+        self.chars_read = 0
+        self.max_buffered = 0
+
+    def fill(self, min_chars=1):
+        """Read until min_chars more characters are buffered past pos, or EOF."""
+        if self.pos > self.chunk_size:
+            # Drop what has been consumed so the buffer stays bounded
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        while not self.eof and len(self.buffer) - self.pos < min_chars:
+            data = self.file.read(self.chunk_size)
+            if self.decoder is None:
+                # The BOM or the zero bytes of UTF-16 need the first few bytes
+                while data and len(data) < 4:
+                    more = self.file.read(self.chunk_size)
+                    if not more:
+                        break
+                    data += more
+                self.decoder = codecs.getincrementaldecoder(detect_encoding(data))()
+            self.bytes_read += len(data)
+            text = self.decoder.decode(data, final=not data)
+            if not data:
+                self.eof = True
+            self.chars_read += len(text)
+            self.buffer += text
+        self.max_buffered = max(self.max_buffered, len(self.buffer))
+        return len(self.buffer) - self.pos >= min_chars
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(
+                f"Expected {char!r} at character {self.chars_read - len(self.buffer) + self.pos}"
+            )
+        self.pos += 1
+
+    def keys(self):
+        """Iterate the keys of the next object; the caller reads each value."""
+        self.expect("{")
+        first = True
+        while self.peek() != "}":
+            if not first:
+                self.expect(",")
+            first = False
+            key = self.value()
+            self.expect(":")
+            yield key
+        self.expect("}")
+
+    def items(self, raw_decode=None):
+        """Iterate the decoded items of the next array, one at a time."""
+        self.expect("[")
+        first = True
+        while self.peek() != "]":
+            if not first:
+                self.expect(",")
+            first = False
+            yield self.value(raw_decode)
+        self.expect("]")
+
+    def value(self, raw_decode=None):
+        """Decode the next JSON value, reading more text until it is complete."""
+        raw_decode = raw_decode or _DECODER.raw_decode
+        self.peek()
+        while True:
+            try:
+                value, end = raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Double the buffered text so large values aren't re-parsed
+                # once per chunk
+                self.fill(max(len(self.buffer) - self.pos, self.chunk_size) * 2)
+                continue
+            if (
+                end == len(self.buffer)
+                and not self.eof
+                and self.buffer[self.pos] not in '{["'
+            ):
+                # A number may continue in the next chunk
+                self.fill(len(self.buffer) - self.pos + 1)
+                continue
+            self.pos = end
+            return value
+
+
+class BimStreamReader:
+    """Reads a .bim file without holding its full text in memory.
+
+    The file is decoded incrementally (UTF-8 or UTF-16, with or without a
+    BOM) and each table is parsed, pruned and added to the SemanticModel on
+    its own, so memory tracks the pruned model rather than the file size.
+    """
+
+    def __init__(self, pruner=None, chunk_size=None):
+        self.pruner = pruner or BimPruner()
+        self.chunk_size = chunk_size or settings.BIM_READ_CHUNK_SIZE
+
+    def read(self, file_path):
+        """Return (semantic_model, pruned_text, report) for a .bim file."""
+        with open(file_path, "rb") as file:
+            return self.read_stream(file, os.path.basename(file_path))
+
+    def read_stream(self, file, name):
+        """Same as read() for a binary file object, e.g. a zip archive member."""
+        removed = Counter()
+
+        def decoder(text, pos):
+            # Count pruned keys only once the value decodes completely, as a
+            # value cut off by the chunk boundary is decoded again
+            attempt = Counter()
+            value, end = json.JSONDecoder(
+                object_pairs_hook=self.pruner.pairs_hook(attempt)
+            ).raw_decode(text, pos)
+            removed.update(attempt)
+            return value, end
+
+        parts = []
+        tables = []
+
+        stream = JsonTextStream(file, self.chunk_size)
+        top = self._read_object(stream, decoder, parts, tables, removed)
+        if stream.peek():
+            raise ValueError("Unexpected data after the model")
+
+        model_data = model_object(top)
+        if model_data.get("tables") is not None:
+            # A list of tables is streamed and never kept in the properties
+            raise ValueError('"tables" must be a list of objects')
+        semantic_model = SemanticModel(
+            name=top.get("name", model_data.get("name", "")),
+            compatibility_level=top.get("compatibilityLevel"),
+            culture=model_data.get("culture"),
+        )
+        for table in tables:
+            semantic_model.add_table(table)
+        semantic_model.load_model_properties(model_data)
+
+        text = "".join(parts)
+        del parts
+        report = self.report(stream, text, removed)
+        logging.getLogger("app").info(
+            f"Streamed {report['original_bytes']} bytes of {name}"
+            f" into {len(tables)} tables, buffering at most "
+            f"{report['max_buffered_chars']} characters"
+            + (
+                f", peak memory {report['peak_memory_bytes'] // (1024 * 1024)} MB"
+                if report["peak_memory_bytes"]
+                else ""
+            )
+        )
+        return semantic_model, text, report
+
+    def _read_object(self, stream, decoder, parts, tables, removed):
+        """Read an object key by key, streaming "tables" and recursing into "model".
+
+        The pruned JSON is written to parts as it is read; the returned dict
+        holds the object's other properties.
+        """
+        properties = {}
+        parts.append("{")
+        separator = ""
+        for key in stream.keys():
+            if self.pruner.is_pruned(key):
+                stream.value()
+                removed[key] += 1
+                continue
+
+            parts.append(separator + _dumps(key) + ":")
+            separator = ","
+            if key == "model" and stream.peek() == "{":
+                properties[key] = self._read_object(
+                    stream, decoder, parts, tables, removed
+                )
+            elif key == "tables" and stream.peek() == "[":
+                parts.append("[")
+                for index, data in enumerate(stream.items(decoder)):
+                    if not isinstance(data, dict):
+                        raise ValueError('"tables" must be a list of objects')
+                    parts.append(("," if index else "") + _dumps(data))
+                    tables.append(Table(data))
+                parts.append("]")
+            else:
+                properties[key] = stream.value(decoder)
+                parts.append(_dumps(properties[key]))
+        parts.append("}")
+        return properties
+
+    @staticmethod
+    def report(stream, text, removed):
+        """Same keys as BimPruner.report, plus reader statistics."""
+        original_tokens = -(-stream.chars_read // CHARS_PER_TOKEN)
+        pruned_bytes = len(text.encode("utf-8"))
+        pruned_tokens = -(-len(text) // CHARS_PER_TOKEN)
+        return {
+            "original_bytes": stream.bytes_read,
+            "pruned_bytes": pruned_bytes,
+            "bytes_saved": stream.bytes_read - pruned_bytes,
+            "original_tokens": original_tokens,
+            "pruned_tokens": pruned_tokens,
+            "tokens_saved": original_tokens - pruned_tokens,
+            "removed_properties": dict(removed.most_common()),
+            "max_buffered_chars": stream.max_buffered,
+            "peak_memory_bytes": peak_memory(),
+        }
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,251 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from app import settings, telemetry
+from app.tokens import estimate_tokens
+
+MAP_TASK = (
+    "\nThe model is too large for a single request, so you are given part {part} "
+    "of {parts}. Analyze only the objects in this part and report your findings "
+    "as Markdown; a later step merges the findings of all parts into one report."
+)
+
+REDUCE_TASK = (
+    "\nYou are given partial reports, each produced from a separate part of the "
+    "same model. Merge them into one coherent report with a single title: combine "
+    "matching sections, remove duplicates, and keep every distinct finding."
+)
+
+# Table child lists that can be split across chunks when one table is too big
+TABLE_CHILD_SECTIONS = ("columns", "measures", "hierarchies", "partitions")
+
+# Model-level lists that can be split across chunks when they are too big to
+# repeat in every chunk
+SHARED_SECTIONS = (
+    "relationships",
+    "roles",
+    "perspectives",
+    "expressions",
+    "dataSources",
+)
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _size(data):
+    return estimate_tokens(_dumps(data))
+
+
+class ModelChunker:
+    """Splits .bim JSON along table and measure boundaries within a token budget."""
+
+    def __init__(self, token_budget=None):
+        self.token_budget = token_budget or settings.CHUNK_TOKEN_BUDGET
+
+    def split(self, content):
+        """Return a list of JSON texts, each within the token budget where possible."""
+        if estimate_tokens(content) <= self.token_budget:
+            return [content]
+
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return self._split_text(content)
+
+        container = data.get("model", data) if isinstance(data, dict) else None
+        if not isinstance(container, dict) or not container.get("tables"):
+            return self._split_text(content)
+
+        units = [("tables", table) for table in container["tables"]]
+        skeleton_container = dict(container, tables=[])
+
+        # Keep model-level lists in every chunk unless they crowd out the tables
+        for section in SHARED_SECTIONS:
+            if _size(skeleton_container) <= self.token_budget // 4:
+                break
+            items = skeleton_container.pop(section, None)
+            if items:
+                units.extend((section, item) for item in items)
+
+        skeleton = (
+            dict(data, model=skeleton_container)
+            if "model" in data
+            else skeleton_container
+        )
+        available = max(self.token_budget - _size(skeleton), self.token_budget // 4)
+
+        chunks = []
+        current = {}
+        current_size = 0
+        for section, item in self._fit_units(units, available):
+            item_size = _size(item)
+            if current and current_size + item_size > available:
+                chunks.append(current)
+                current, current_size = {}, 0
+            current.setdefault(section, []).append(item)
+            current_size += item_size
+        if current:
+            chunks.append(current)
+
+        texts = []
+        for chunk in chunks:
+            chunk_container = dict(skeleton_container)
+            for section, items in chunk.items():
+                chunk_container[section] = chunk_container.get(section, []) + items
+            if "model" in data:
+                texts.append(_dumps(dict(data, model=chunk_container)))
+            else:
+                texts.append(_dumps(chunk_container))
+        return texts
+
+    def _fit_units(self, units, available):
+        """Yield units, splitting tables that are bigger than a chunk by children."""
+        for section, item in units:
+            if section != "tables" or _size(item) <= available:
+                yield section, item
+                continue
+
+            header = {
+                key: value
+                for key, value in item.items()
+                if key not in TABLE_CHILD_SECTIONS
+            }
+            header_size = _size(header)
+            part, part_size = dict(header), header_size
+            for child_section in TABLE_CHILD_SECTIONS:
+                for child in item.get(child_section, []):
+                    child_size = _size(child)
+                    if part_size + child_size > available and part_size > header_size:
+                        yield section, part
+                        part, part_size = dict(header), header_size
+                    part.setdefault(child_section, []).append(child)
+                    part_size += child_size
+            yield section, part
+
+    def _split_text(self, content):
+        """Fallback for content that isn't model JSON: split on line boundaries."""
+        limit = self.token_budget * 4
+        chunks, current, current_len = [], [], 0
+        for line in content.splitlines(keepends=True):
+            if current and current_len + len(line) > limit:
+                chunks.append("".join(current))
+                current, current_len = [], 0
+            current.append(line)
+            current_len += len(line)
+        if current:
+            chunks.append("".join(current))
+        return chunks
+
+
+class ChunkedAnalyzer:
+    """Map-reduce wrapper around AIAnalyzer for content over the token budget.
+
+    Small content goes straight to the wrapped analyzer. Larger content is
+    split into chunks that are analyzed in parallel (map), and the partial
+    Markdown reports are merged into one report by a final request (reduce).
+    """
+
+    def __init__(self, ai_analyzer, chunker=None, max_workers=None, enabled=None):
+        self.ai_analyzer = ai_analyzer
+        self.chunker = chunker or ModelChunker()
+        self.max_workers = max_workers or settings.ANALYSIS_MAX_WORKERS
+        self.enabled = settings.CHUNKING_ENABLED if enabled is None else enabled
+        # Chunk requests share one pool across tasks, so the total number of
+        # chunk requests in flight stays within max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="analysis-chunk"
+        )
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        if not self.enabled:
+            return self.ai_analyzer.analyze(task, content, model, on_delta=on_delta)
+
+        chunks = self.chunker.split(content)
+        if len(chunks) == 1:
+            return self.ai_analyzer.analyze(task, chunks[0], model, on_delta=on_delta)
+
+        logging.getLogger("app").info(
+            f"Content exceeds {self.chunker.token_budget} tokens, "
+            f"analyzing in {len(chunks)} chunks"
+        )
+        futures = [
+            telemetry.submit(
+                self.executor,
+                self.ai_analyzer.analyze,
+                task + MAP_TASK.format(part=index, parts=len(chunks)),
+                chunk,
+                model,
+            )
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+        partials = [future.result() for future in futures]
+        return self.reduce(task, partials, model, on_delta=on_delta)
+
+    def reduce(self, task, partials, model, on_delta=None):
+        """Merge partial reports, in several rounds if they don't fit one request."""
+        budget = self.chunker.token_budget
+        while True:
+            partials = self._usable_partials(partials)
+            groups, current, current_size = [], [], 0
+            for partial in partials:
+                size = estimate_tokens(partial)
+                if current and current_size + size > budget:
+                    groups.append(current)
+                    current, current_size = [], 0
+                current.append(partial)
+                current_size += size
+            groups.append(current)
+            if len(groups) == len(partials) > 1:
+                # Every partial fills a request on its own; merge them in pairs
+                # so each round still halves the count without one request
+                # holding all of them
+                groups = [partials[i : i + 2] for i in range(0, len(partials), 2)]
+                if len(groups[-1]) == 1:
+                    groups[-2].extend(groups.pop())
+
+            if len(groups) == 1:
+                # Final round: only the merged report is worth streaming
+                return self.ai_analyzer.analyze(
+                    task + REDUCE_TASK,
+                    self._join_partials(groups[0]),
+                    model,
+                    on_delta=on_delta,
+                )
+
+            futures = [
+                telemetry.submit(
+                    self.executor,
+                    self.ai_analyzer.analyze,
+                    task + REDUCE_TASK,
+                    self._join_partials(group),
+                    model,
+                )
+                for group in groups
+            ]
+            partials = [future.result() for future in futures]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _usable_partials(partials):
+        """Drop empty partial reports; raise when none are left to merge."""
+        usable = [partial for partial in partials if partial]
+        if not usable:
+            raise ValueError("empty response for every part")
+        if len(usable) < len(partials):
+            logging.getLogger("app").warning(
+                f"Skipping {len(partials) - len(usable)} empty partial reports "
+                f"of {len(partials)}"
+            )
+        return usable
+
+    @staticmethod
+    def _join_partials(partials):
+        return "\n\n".join(
+            f"<!-- Partial report {index} of {len(partials)} -->\n{partial}"
+            for index, partial in enumerate(partials, start=1)
+        )
@@ -1,14 +1,52 @@
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tkinter import messagebox, simpledialog
+from app import settings, telemetry
 from app.file_handler import FileHandler
 from app.ai_analyzer import AIAnalyzer
+from app.bim_diff import ModelDiff
+from app.bim_model import parse_bim
+from app.bim_pruner import BimPruner
+from app.bim_reader import BimStreamReader
+from app.chunking import ChunkedAnalyzer
+from app.local_checks import LocalChecker
+from app.multi_report import build_task, split_reports
+from app.pbix_reader import PbixReader
+from app.response_cache import ResponseCache
+from app.task_context import TASK_CONTEXT, ContextSlicer
+from app.tokens import estimate_tokens
+
+FORMAT_TASK = "\nAvoid generating Table of Contents. Please respond with proper well-structured Markdown format."
 
 
 class Controller:
-    def __init__(self, file_handler=None, ai_analyzer=None):
+    def __init__(
+        self,
+        file_handler=None,
+        ai_analyzer=None,
+        max_workers=None,
+        response_cache=None,
+        pruner=None,
+        local_checker=None,
+    ):
         self.file_handler = file_handler or FileHandler()
         self.ai_analyzer = ai_analyzer or AIAnalyzer()
+        self.response_cache = response_cache or ResponseCache()
+        self.pruner = pruner or BimPruner()
+        self.stream_reader = BimStreamReader(self.pruner)
+        self.pbix_reader = PbixReader(self.pruner)
+        self.local_checker = local_checker or LocalChecker()
+        self.max_workers = max_workers or settings.ANALYSIS_MAX_WORKERS
+        self.chunked_analyzer = ChunkedAnalyzer(
+            self.ai_analyzer, max_workers=self.max_workers
+        )
+        self.last_prune_report = None
+        self.last_findings = []
+        self.last_diff = None
+        self.last_telemetry = None
+        # Absolute file path -> the last complete run, for incremental analysis
+        self.previous_runs = {}
 
     def check_env_file(self):
         import sys
@@ -33,25 +71,368 @@ class Controller:
         )
         return False
 
-    def process_file(self, file_path, model="gpt-4o-mini"):
+    def process_file(
+        self,
+        file_path,
+        model="gpt-4o-mini",
+        concurrent=None,
+        use_cache=True,
+        refresh_cache=False,
+        prune=None,
+        slice_context=None,
+        local_checks=None,
+        incremental=None,
+        multi_report=None,
+        on_progress=None,
+    ):
+        """Yield (task_name, result) pairs, in completion order when concurrent.
+
+        use_cache=False bypasses the response cache entirely for this run;
+        refresh_cache=True ignores cached entries but stores the fresh results.
+        prune=False sends the file as-is instead of stripping non-semantic metadata.
+        slice_context=False sends every task the whole file instead of its slice.
+        local_checks=False skips the local rule engines; otherwise their findings
+        are passed to the AI as hints and appended to the results as a section.
+        incremental=False re-runs every task; otherwise tasks whose part of the
+        model is unchanged since the previous run of this file reuse its results.
+        multi_report=True asks for all remaining reports in a single request
+        with the content sent once, falling back to per-task requests for
+        reports that are missing or cut off.
+        on_progress(task_name, partial_markdown) is called from worker threads
+        while responses stream in, when streaming is enabled.
+        """
         if not self.file_handler.is_valid_file_type(file_path):
             raise ValueError("Unsupported file type")
 
-        content = self.file_handler.read_file(file_path)
+        run = telemetry.TelemetryRun(file_path, model)
+        self.last_telemetry = run
+        if prune is None:
+            prune = settings.BIM_PRUNE_ENABLED
+        content, semantic_model = self.read_content(file_path, prune)
         if not content:
             raise ValueError("Could not read file content")
 
+        if slice_context is None:
+            slice_context = settings.TASK_CONTEXT_SLICING
+        if local_checks is None:
+            local_checks = settings.LOCAL_CHECKS_ENABLED
+        if semantic_model is None and (slice_context or local_checks):
+            semantic_model = self.parse_model(content)
+        contexts = {}
+        if slice_context and semantic_model is not None and semantic_model.tables:
+            contexts = self.task_contexts(semantic_model, content)
+        findings = None
+        if local_checks and semantic_model is not None and semantic_model.tables:
+            findings = self.local_checker.run(semantic_model)
+        self.last_findings = findings or []
+        run.prepared()
+
+        if incremental is None:
+            incremental = settings.INCREMENTAL_ANALYSIS
+        options = (model, prune, slice_context, local_checks)
+        reusable = {}
+        if incremental and use_cache and not refresh_cache:
+            # Without tables nothing is sliced and every task sees the layout
+            reusable = self.reusable_results(
+                file_path, semantic_model, options, bool(contexts)
+            )
+        run_results = {}
+
+        if concurrent is None:
+            concurrent = settings.CONCURRENT_ANALYSIS
+        if not settings.STREAMING_ENABLED:
+            on_progress = None
+
+        tasks = {}
         for task_name, task in self.analysis_tasks().items():
-            if content:
-                try:
-                    formatTask = "\nAvoid generating Table of Contents. Please respond with proper well-structured Markdown format."
-                    result = self.ai_analyzer.analyze(task + formatTask, content, model)
-                    yield task_name, result
-                except Exception as e:
-                    logging.getLogger("app").error(
-                        f"Error processing task {task_name}: {str(e)}"
+            section = None
+            if findings is not None:
+                section = self.local_checker.task_section(findings, task_name)
+                if section is not None and task_name in settings.LOCAL_ONLY_TASKS:
+                    run.add_task(task_name, "local checks")
+                    yield task_name, section
+                    continue
+                task += self.local_checker.task_hints(findings, task_name)
+
+            if task_name in reusable:
+                run.add_task(task_name, "previous run")
+                run_results[task_name] = reusable[task_name]
+                yield task_name, self._append_section(reusable[task_name], section)
+                continue
+
+            task_content = contexts.get(task_name, content)
+            cache_key = None
+            if use_cache:
+                cache_key = self.response_cache.make_key(
+                    self.response_cache.content_hash(task_content),
+                    task,
+                    FORMAT_TASK,
+                    model,
+                )
+                cached = None if refresh_cache else self.response_cache.get(cache_key)
+                if cached is not None:
+                    logging.getLogger("app").info(
+                        f"Using cached result for {task_name}"
+                    )
+                    run.add_task(task_name, "cache")
+                    run_results[task_name] = cached
+                    yield task_name, self._append_section(cached, section)
+                    continue
+            if section is not None and on_progress:
+                # Local findings are ready long before the AI report
+                on_progress(task_name, section)
+            tasks[task_name] = (task, task_content, cache_key, section)
+
+        if multi_report is None:
+            multi_report = settings.MULTI_REPORT_ENABLED
+        if (
+            multi_report
+            and len(tasks) > 1
+            and estimate_tokens(content) <= self.chunked_analyzer.chunker.token_budget
+        ):
+            with telemetry.task(run, "multi_report", telemetry.BATCH):
+                reports = self._run_multi_report(tasks, content, model, on_progress)
+            for task_name, result in reports.items():
+                run.add_task(task_name, "multi-report request")
+                run_results[task_name] = result
+                yield task_name, self._append_section(result, tasks.pop(task_name)[3])
+
+        if not tasks:
+            completed = ()
+        elif concurrent and self.max_workers > 1:
+            completed = self._run_tasks_concurrently(tasks, model, on_progress, run)
+        else:
+            completed = (
+                self._run_task(
+                    task_name,
+                    task,
+                    task_content,
+                    model,
+                    cache_key,
+                    on_progress,
+                    section,
+                    run,
+                )
+                for task_name, (task, task_content, cache_key, section) in tasks.items()
+            )
+        for task_name, result in completed:
+            if not result:
+                result = "Analysis failed: empty response"
+            elif not result.startswith("Analysis failed"):
+                run_results[task_name] = result
+            yield task_name, self._append_section(result, tasks[task_name][3])
+
+        if semantic_model is not None:
+            self.previous_runs[os.path.abspath(file_path)] = {
+                "options": options,
+                "semantic_model": semantic_model,
+                "results": run_results,
+            }
+        run.finish()
+
+    def reusable_results(self, file_path, semantic_model, options, slice_context):
+        """Results of the previous run of a file for tasks its changes don't touch."""
+        self.last_diff = None
+        previous = self.previous_runs.get(os.path.abspath(file_path))
+        if previous is None or semantic_model is None or previous["options"] != options:
+            return {}
+
+        diff = ModelDiff(previous["semantic_model"], semantic_model)
+        self.last_diff = diff
+        affected = diff.affected_tasks(
+            self.analysis_tasks(), TASK_CONTEXT if slice_context else {}
+        )
+        reusable = {
+            task_name: result
+            for task_name, result in previous["results"].items()
+            if task_name not in affected
+        }
+        logging.getLogger("app").info(
+            f"Incremental analysis: {diff.summary()}; reusing "
+            f"{len(reusable)} of {len(self.analysis_tasks())} task results"
+        )
+        return reusable
+
+    def read_content(self, file_path, prune):
+        """Return (content, semantic_model); the model is None unless streamed.
+
+        Pruned content and .pbix / .pbit archives are streamed straight into
+        the parsed model, so the full file text is never held in memory.
+        """
+        if self.file_handler.is_pbix_file(file_path):
+            semantic_model, content, report = self.pbix_reader.read(file_path, prune)
+            if report is not None and prune:
+                self._log_prune_report(report)
+            return content, semantic_model
+
+        if prune:
+            try:
+                semantic_model, content, report = self.stream_reader.read(file_path)
+            except (OSError, ValueError) as e:
+                logging.getLogger("app").warning(
+                    f"Streaming read failed, reading the whole file: {e}"
+                )
+            else:
+                self._log_prune_report(report)
+                return content, semantic_model
+
+        content = self.file_handler.read_file(file_path)
+        if content and prune:
+            content = self.prune_content(content)
+        return content, None
+
+    def prune_content(self, content):
+        content, report = self.pruner.prune(content)
+        self._log_prune_report(report)
+        return content
+
+    def _log_prune_report(self, report):
+        self.last_prune_report = report
+        logging.getLogger("app").info(
+            f"Pruned model metadata: {report['bytes_saved']} bytes and "
+            f"~{report['tokens_saved']} tokens saved "
+            f"({report['original_tokens']} -> {report['pruned_tokens']} tokens)"
+        )
+
+    @staticmethod
+    def parse_model(content):
+        """Parse the content into a SemanticModel, or None if it isn't TMSL JSON."""
+        try:
+            return parse_bim(content)
+        except ValueError as e:
+            logging.getLogger("app").warning(f"Could not parse model: {e}")
+            return None
+
+    def task_contexts(self, semantic_model, content):
+        """Map task names to the slice of the model they need.
+
+        Tasks without a selector in TASK_CONTEXT are left out and get the
+        whole file.
+        """
+        slicer = ContextSlicer(semantic_model)
+        contexts = {}
+        for task_name in self.analysis_tasks():
+            task_content = slicer.render(task_name)
+            if task_content is not None:
+                contexts[task_name] = task_content
+
+        full_tokens = estimate_tokens(content)
+        sliced_tokens = sum(
+            estimate_tokens(contexts.get(task_name, content))
+            for task_name in self.analysis_tasks()
+        )
+        logging.getLogger("app").info(
+            f"Task context slicing: ~{sliced_tokens} prompt tokens across all tasks "
+            f"instead of ~{full_tokens * len(self.analysis_tasks())}"
+        )
+        return contexts
+
+    def _run_task(
+        self,
+        task_name,
+        task,
+        content,
+        model,
+        cache_key=None,
+        on_progress=None,
+        section=None,
+        run=None,
+    ):
+        def on_delta(text):
+            on_progress(task_name, self._append_section(text, section))
+
+        with telemetry.task(run, task_name) as context:
+            try:
+                result = self.chunked_analyzer.analyze(
+                    task + FORMAT_TASK,
+                    content,
+                    model,
+                    on_delta=on_delta if on_progress else None,
+                )
+                if not result:
+                    raise ValueError("empty response")
+                if cache_key:
+                    self.response_cache.put(cache_key, result)
+                return task_name, result
+            except Exception as e:
+                context.status = "failed"
+                logging.getLogger("app").error(
+                    f"Error processing task {task_name}: {str(e)}"
+                )
+                return task_name, f"Analysis failed: {str(e)}"
+
+    def _run_multi_report(self, tasks, content, model, on_progress=None):
+        """Run every task in one request; return the reports that came back whole."""
+
+        def on_delta(text):
+            for task_name, (report, _) in split_reports(text).items():
+                if task_name in tasks:
+                    on_progress(
+                        task_name, self._append_section(report, tasks[task_name][3])
                     )
-                    yield task_name, f"Analysis failed: {str(e)}"
+
+        try:
+            response = self.ai_analyzer.analyze(
+                build_task(
+                    {task_name: entry[0] for task_name, entry in tasks.items()},
+                    FORMAT_TASK,
+                ),
+                content,
+                model,
+                on_delta=on_delta if on_progress else None,
+            )
+        except Exception as e:
+            logging.getLogger("app").error(f"Multi-report request failed: {str(e)}")
+            return {}
+
+        results = {}
+        for task_name, (report, complete) in split_reports(response or "").items():
+            if task_name in tasks and complete and report:
+                results[task_name] = report
+                cache_key = tasks[task_name][2]
+                if cache_key:
+                    self.response_cache.put(cache_key, report)
+
+        missing = [task_name for task_name in tasks if task_name not in results]
+        logging.getLogger("app").info(
+            f"Multi-report request returned {len(results)} of {len(tasks)} reports"
+            + (f"; running {', '.join(missing)} separately" if missing else "")
+        )
+        return results
+
+    @staticmethod
+    def _append_section(result, section):
+        """Append the local findings section to an AI result."""
+        if not section:
+            return result
+        return f"{result}\n\n{section}"
+
+    def _run_tasks_concurrently(self, tasks, model, on_progress=None, run=None):
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(tasks)),
+            thread_name_prefix="analysis",
+        )
+        try:
+            futures = [
+                telemetry.submit(
+                    executor,
+                    self._run_task,
+                    task_name,
+                    task,
+                    task_content,
+                    model,
+                    cache_key,
+                    on_progress,
+                    section,
+                    run,
+                )
+                for task_name, (task, task_content, cache_key, section) in tasks.items()
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Don't block on pending tasks if the consumer stops early
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @staticmethod
     def analysis_tasks():
@@ -66,10 +447,36 @@ class Controller:
             "analysis_ideas": "Generate ideas for deeper analytical insights using the current dataset, such as trend analysis, segmentation strategies, anomaly detection, or advanced forecasting techniques that could add business value. Title the report as Analysis Ideas",
         }
 
+    @staticmethod
+    def combine_analyses(results):
+        """Combine per-task results into one Markdown document, in task order."""
+        combined_content = ""
+
+        for task_name in Controller.analysis_tasks().keys():
+            if task_name in results:
+                current_result = results[task_name]
+                display_name = task_name.replace("_", " ").title()
+
+                if not current_result.startswith("#"):
+                    combined_content += f"# {display_name}\n\n"
+                combined_content += current_result
+                combined_content += "\n\n\n---\n\n\n"
+
+        if combined_content.endswith("\n\n\n---\n\n\n"):
+            combined_content = combined_content[:-9]
+
+        return combined_content
+
     def reset(self):
         # Reset any state if needed
         pass
 
+    def close(self):
+        """Release worker threads and pooled connections on exit."""
+        self.chunked_analyzer.shutdown()
+        if hasattr(self.ai_analyzer, "close"):
+            self.ai_analyzer.close()
+
     @staticmethod
     def _ai_models():
         return [
@@ -0,0 +1,341 @@
+import re
+
+from app.findings import Finding
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<comment>//[^\n]*|--[^\n]*|/\*.*?(?:\*/|\Z))
+    |(?P<string>"(?:[^"]|"")*"?)
+    |(?P<table>'(?:[^']|'')*'?)
+    |(?P<column>\[(?:[^\]]|\]\])*\]?)
+    |(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+    |(?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    |(?P<operator>&&|\|\||<=|>=|<>|==|[-+*/^&=<>!])
+    |(?P<punctuation>[(),{}])
+    |(?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+ITERATORS = frozenset(
+    {
+        "SUMX",
+        "AVERAGEX",
+        "MINX",
+        "MAXX",
+        "COUNTX",
+        "COUNTAX",
+        "PRODUCTX",
+        "CONCATENATEX",
+        "RANKX",
+        "FILTER",
+        "ADDCOLUMNS",
+        "SELECTCOLUMNS",
+        "GENERATE",
+        "GENERATEALL",
+    }
+)
+
+CALCULATE_FUNCTIONS = frozenset({"CALCULATE", "CALCULATETABLE"})
+
+
+class Token:
+    __slots__ = ("kind", "text", "position")
+
+    def __init__(self, kind, text, position):
+        self.kind = kind
+        self.text = text
+        self.position = position
+
+    @property
+    def bracket_name(self):
+        """Name inside [brackets] for column and measure references."""
+        return self.text[1:-1].replace("]]", "]")
+
+    @property
+    def table_name(self):
+        if self.kind == "table":
+            return self.text[1:-1].replace("''", "'")
+        return self.text
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r})"
+
+
+class Call:
+    """A function call; args is a list of arguments, each a list of nodes."""
+
+    __slots__ = ("name", "args", "position")
+
+    def __init__(self, name, position):
+        self.name = name.upper()
+        self.args = [[]]
+        self.position = position
+
+    def walk(self):
+        """Yield this call and every call nested in its arguments."""
+        yield self
+        for arg in self.args:
+            for node in arg:
+                if isinstance(node, Call):
+                    yield from node.walk()
+
+    def __repr__(self):
+        return f"Call({self.name}, {len(self.args)} args)"
+
+
+def tokenize(expression):
+    """Split a DAX expression into tokens, dropping whitespace and comments."""
+    return [
+        Token(match.lastgroup, match.group(), match.start())
+        for match in TOKEN_PATTERN.finditer(expression)
+        if match.lastgroup not in ("space", "comment")
+    ]
+
+
+def parse(tokens):
+    """Build a light syntax tree: top-level nodes with function calls nested.
+
+    Only calls and their argument boundaries are recognised, which is all the
+    rules need; unbalanced parentheses are tolerated.
+    """
+    root = []
+    stack = []  # open calls
+    current = root
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        next_token = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token.kind == "name" and next_token is not None and next_token.text == "(":
+            call = Call(token.text, token.position)
+            current.append(call)
+            stack.append((call, current))
+            current = call.args[0]
+            index += 2
+            continue
+
+        if token.text == "," and stack:
+            call = stack[-1][0]
+            call.args.append([])
+            current = call.args[-1]
+        elif token.text == ")" and stack:
+            call, current = stack.pop()
+            if call.args == [[]]:
+                call.args = []
+        else:
+            current.append(token)
+        index += 1
+    return root
+
+
+def _calls(nodes):
+    for node in nodes:
+        if isinstance(node, Call):
+            yield from node.walk()
+
+
+def _is_table_reference(arg):
+    """True for an argument that is just a table name, e.g. Sales or 'Sales'."""
+    return (
+        len(arg) == 1
+        and isinstance(arg[0], Token)
+        and arg[0].kind in ("table", "name")
+        and arg[0].text.upper() not in ("TRUE", "FALSE", "BLANK", "VAR", "RETURN")
+    )
+
+
+class DaxRule:
+    __slots__ = ("rule_id", "severity", "title", "check")
+
+    def __init__(self, rule_id, severity, title, check):
+        self.rule_id = rule_id
+        self.severity = severity
+        self.title = title
+        # check(tree, tokens, model) -> iterable of messages
+        self.check = check
+
+
+def _filter_whole_table(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name not in CALCULATE_FUNCTIONS:
+            continue
+        for arg in call.args[1:]:
+            for node in arg:
+                if (
+                    isinstance(node, Call)
+                    and node.name == "FILTER"
+                    and node.args
+                    and _is_table_reference(node.args[0])
+                ):
+                    table = node.args[0][0].table_name
+                    yield (
+                        f"FILTER over the whole '{table}' table inside "
+                        f"{call.name}; filter only the needed columns, e.g. "
+                        f"KEEPFILTERS or FILTER(VALUES('{table}'[Column]), ...)"
+                    )
+
+
+def _nested_iterators(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name not in ITERATORS or call.name == "FILTER":
+            continue
+        for arg in call.args[1:]:
+            inner = next(
+                (nested for nested in _calls(arg) if nested.name in ITERATORS),
+                None,
+            )
+            if inner is not None:
+                yield (
+                    f"{inner.name} nested inside {call.name}; nested iterators "
+                    "multiply the rows scanned, consider a variable or a "
+                    "pre-aggregated column"
+                )
+                break
+
+
+def _iterator_over_all(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name not in ITERATORS or not call.args:
+            continue
+        first = call.args[0]
+        if (
+            len(first) == 1
+            and isinstance(first[0], Call)
+            and first[0].name == "ALL"
+            and first[0].args
+            and _is_table_reference(first[0].args[0])
+        ):
+            table = first[0].args[0][0].table_name
+            yield (
+                f"{call.name} iterates ALL('{table}'), every row of the table "
+                "regardless of filters; iterate only the columns needed, "
+                "or use ALL on specific columns"
+            )
+
+
+def _division_operator(tree, tokens, model):
+    if any(token.kind == "operator" and token.text == "/" for token in tokens):
+        yield (
+            "Uses the / operator; DIVIDE handles division by zero and blanks "
+            "without extra IF checks"
+        )
+
+
+def _iferror(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name in ("IFERROR", "ISERROR"):
+            yield (
+                f"{call.name} forces error checks on every evaluation; test for "
+                "the failing condition instead (e.g. DIVIDE, ISBLANK)"
+            )
+            return
+
+
+def _earlier(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name in ("EARLIER", "EARLIEST"):
+            yield f"{call.name} is hard to read and slow; use a variable instead"
+            return
+
+
+def _count_column(tree, tokens, model):
+    for call in _calls(tree):
+        if call.name == "COUNT" and call.args:
+            yield (
+                "COUNT on a column; COUNTROWS is clearer and faster when "
+                "counting rows of a table"
+            )
+            return
+
+
+def _unqualified_column(tree, tokens, model):
+    if model is None:
+        return
+    for index, token in enumerate(tokens):
+        if token.kind != "column":
+            continue
+        previous = tokens[index - 1] if index else None
+        if previous is not None and previous.kind in ("table", "name"):
+            continue
+        name = token.bracket_name
+        if model.measure(name) is None and model.has_column(name):
+            yield f"Column [{name}] is not qualified with its table name"
+            return
+
+
+def _qualified_measure(tree, tokens, model):
+    if model is None:
+        return
+    for index, token in enumerate(tokens[1:], start=1):
+        previous = tokens[index - 1]
+        if token.kind != "column" or previous.kind not in ("table", "name"):
+            continue
+        name = token.bracket_name
+        table = model.table(previous.table_name)
+        if (
+            model.measure(name) is not None
+            and table is not None
+            and table.column(name) is None
+        ):
+            yield (
+                f"Measure [{name}] is referenced with a table prefix; reference "
+                "measures without a table name to tell them apart from columns"
+            )
+            return
+
+
+DAX_RULES = (
+    DaxRule(
+        "DAX001",
+        "warning",
+        "FILTER over an entire table in CALCULATE",
+        _filter_whole_table,
+    ),
+    DaxRule("DAX002", "warning", "Nested iterators", _nested_iterators),
+    DaxRule("DAX003", "warning", "Iterator over ALL(table)", _iterator_over_all),
+    DaxRule("DAX004", "info", "Division without DIVIDE", _division_operator),
+    DaxRule("DAX005", "warning", "IFERROR / ISERROR", _iferror),
+    DaxRule("DAX006", "info", "EARLIER / EARLIEST", _earlier),
+    DaxRule("DAX007", "info", "COUNT instead of COUNTROWS", _count_column),
+    DaxRule("DAX008", "info", "Unqualified column reference", _unqualified_column),
+    DaxRule("DAX009", "info", "Measure referenced with table", _qualified_measure),
+)
+
+
+class DaxScanner:
+    """Checks every DAX expression in a SemanticModel against DAX_RULES."""
+
+    def __init__(self, rules=None):
+        self.rules = DAX_RULES if rules is None else rules
+
+    def scan_expression(self, expression, model=None):
+        """Yield (rule, message) pairs for one expression."""
+        tokens = tokenize(expression)
+        tree = parse(tokens)
+        for rule in self.rules:
+            for message in rule.check(tree, tokens, model):
+                yield rule, message
+
+    def scan_model(self, model):
+        findings = []
+        for object_ref, expression in self.expressions(model):
+            for rule, message in self.scan_expression(expression, model):
+                findings.append(
+                    Finding(rule.rule_id, "dax", rule.severity, object_ref, message)
+                )
+        return findings
+
+    @staticmethod
+    def expressions(model):
+        """Yield (object reference, DAX expression) for measures and calculations."""
+        for table in model.tables:
+            for measure in table.measures:
+                if measure.expression:
+                    yield f"{table.name}[{measure.name}]", measure.expression
+            for column in table.columns:
+                if column.is_calculated and column.expression:
+                    yield f"{table.name}[{column.name}]", column.expression
+            for partition in table.partitions:
+                if partition.source_type == "calculated" and partition.expression:
+                    yield f"'{table.name}'", partition.expression
@@ -0,0 +1,226 @@
+import os
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt, RGBColor
+
+from app import markdown_ir
+from app.markdown_ir import BOLD, BREAK, CODE, ITALIC
+
+LOGO_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "assets", "images", "ah_logo.png"
+)
+# Word's built-in list styles go three levels deep
+LIST_LEVELS = 3
+
+# Same palette as assets/css/pdf.css
+HEADING_STYLES = {
+    1: (28, RGBColor(202, 90, 139)),  # #ca5a8b
+    2: (22, RGBColor(102, 84, 245)),  # #6654f5
+    3: (18, RGBColor(102, 84, 245)),  # #6654f5
+}
+# pPr children that come after pBdr and shd in the schema
+PPR_SUCCESSORS = (
+    "w:tabs",
+    "w:suppressAutoHyphens",
+    "w:spacing",
+    "w:ind",
+    "w:jc",
+    "w:outlineLvl",
+    "w:rPr",
+    "w:sectPr",
+    "w:pPrChange",
+)
+
+
+class DocxWriter:
+    """Converts analysis Markdown into a Word document.
+
+    It walks the shared Markdown tree (app/markdown_ir.py), and the styles
+    are set up once per document. Paragraphs and runs get the style IDs
+    written directly, as python-docx resolves a style name or object by
+    scanning every style in the document. A code block is a single
+    paragraph with line breaks, and its border and shading live in the
+    CodeBlock style instead of being built into every line.
+    """
+
+    def __init__(self):
+        self.document = Document()
+        self.styles = self._setup_styles(self.document)
+
+    @staticmethod
+    def _setup_styles(document):
+        styles = document.styles
+        normal = styles["Normal"]
+        normal.font.name = "Calibri"
+        normal.font.size = Pt(12)
+
+        for level, (size, color) in HEADING_STYLES.items():
+            heading = styles[f"Heading {level}"]
+            heading.font.name = "Calibri"
+            heading.font.size = Pt(size)
+            heading.font.bold = True
+            heading.font.color.rgb = color
+
+        code = styles.add_style("CodeBlock", WD_STYLE_TYPE.PARAGRAPH)
+        code.base_style = normal
+        code.font.name = "Consolas"
+        code.font.size = Pt(10)
+        code.paragraph_format.space_before = Pt(6)
+        code.paragraph_format.space_after = Pt(6)
+        code.paragraph_format.keep_together = True
+        DocxWriter._add_border(code.element.get_or_add_pPr())
+
+        language = styles.add_style("CodeLanguage", WD_STYLE_TYPE.PARAGRAPH)
+        language.base_style = normal
+        language.font.bold = True
+        language.font.size = Pt(9)
+        language.font.color.rgb = RGBColor(70, 70, 70)  # Dark gray
+        language.paragraph_format.space_after = Pt(0)
+
+        inline_code = styles.add_style("InlineCode", WD_STYLE_TYPE.CHARACTER)
+        inline_code.font.name = "Consolas"
+        inline_code.font.size = Pt(10)
+
+        return {
+            "headings": {
+                level: styles[f"Heading {level}"].style_id for level in range(1, 7)
+            },
+            "bullet": DocxWriter._level_ids(styles, "List Bullet"),
+            "number": DocxWriter._level_ids(styles, "List Number"),
+            "continue": DocxWriter._level_ids(styles, "List Continue"),
+            "code": code.style_id,
+            "language": language.style_id,
+            "inline_code": inline_code.style_id,
+            "quote": styles["Quote"].style_id,
+            "table": styles["Table Grid"],
+        }
+
+    @staticmethod
+    def _level_ids(styles, name):
+        """Style IDs of "List Bullet", "List Bullet 2", ... one per level."""
+        return [
+            styles[name if level == 1 else f"{name} {level}"].style_id
+            for level in range(1, LIST_LEVELS + 1)
+        ]
+
+    @staticmethod
+    def _add_border(p_pr):
+        borders = OxmlElement("w:pBdr")
+        for side in ("top", "left", "bottom", "right"):
+            border = OxmlElement(f"w:{side}")
+            border.set(qn("w:val"), "single")
+            border.set(qn("w:sz"), "4")  # Border width in 1/8 points
+            border.set(qn("w:space"), "4")
+            border.set(qn("w:color"), "CCCCCC")  # Light gray border
+            borders.append(border)
+        p_pr.insert_element_before(borders, "w:shd", *PPR_SUCCESSORS)
+
+        shading = OxmlElement("w:shd")
+        shading.set(qn("w:val"), "clear")
+        shading.set(qn("w:fill"), "F5F5F5")  # Light gray background
+        p_pr.insert_element_before(shading, *PPR_SUCCESSORS)
+
+    def add_spans(self, paragraph, spans, bold=False):
+        """Add inline spans to a paragraph as runs."""
+        for text, flags, href in spans:
+            if flags & BREAK:
+                paragraph.add_run().add_break()
+                continue
+            run = paragraph.add_run(text)
+            if bold or flags & BOLD:
+                run.bold = True
+            if flags & ITALIC:
+                run.italic = True
+            if flags & CODE:
+                run._r.style = self.styles["inline_code"]
+            if href:
+                run.underline = True
+        return paragraph
+
+    def add_paragraph(self, text=None, style_id=None):
+        paragraph = self.document.add_paragraph(text)
+        if style_id:
+            paragraph._p.style = style_id
+        return paragraph
+
+    def add_logo(self):
+        if not os.path.exists(LOGO_PATH):
+            return
+        logo_paragraph = self.document.add_paragraph()
+        logo_paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        logo_paragraph.add_run().add_picture(LOGO_PATH, width=Inches(2.0))
+        # Add a space after the logo
+        self.document.add_paragraph()
+
+    def add_table(self, block):
+        table = self.document.add_table(
+            rows=len(block.rows) + 1, cols=len(block.header)
+        )
+        table.style = self.styles["table"]
+        for i, (row, table_row) in enumerate(
+            zip([block.header] + block.rows, table.rows)
+        ):
+            for spans, cell in zip(row, table_row.cells):
+                # Header row is bold
+                self.add_spans(cell.paragraphs[0], spans, bold=i == 0)
+        self.document.add_paragraph()  # Add space after table
+
+    def add_code_block(self, block):
+        if block.language:
+            self.add_paragraph(block.language, self.styles["language"])
+        # Line breaks keep the block a single bordered paragraph
+        self.add_paragraph(block.text, self.styles["code"])
+
+    def add_list(self, block, level=0):
+        level = min(level, LIST_LEVELS - 1)
+        item_style = self.styles["number" if block.ordered else "bullet"][level]
+        for item in block.items:
+            first = True
+            for child in item:
+                if child.kind == "list":
+                    self.add_list(child, level + 1)
+                elif child.kind == "paragraph":
+                    style = item_style if first else self.styles["continue"][level]
+                    self.add_spans(self.add_paragraph(style_id=style), child.spans)
+                else:
+                    self.add_block(child)
+                first = False
+
+    def add_block(self, block):
+        kind = block.kind
+        if kind == "paragraph":
+            self.add_spans(self.add_paragraph(), block.spans)
+        elif kind == "heading":
+            style = self.styles["headings"][block.level]
+            self.add_spans(self.add_paragraph(style_id=style), block.spans)
+        elif kind == "list":
+            self.add_list(block)
+        elif kind == "table":
+            self.add_table(block)
+        elif kind == "code":
+            self.add_code_block(block)
+        elif kind == "quote":
+            for child in block.blocks:
+                if child.kind == "paragraph":
+                    paragraph = self.add_paragraph(style_id=self.styles["quote"])
+                    self.add_spans(paragraph, child.spans)
+                else:
+                    self.add_block(child)
+        else:
+            self.add_paragraph()
+
+    def write(self, document):
+        for block in document.blocks:
+            self.add_block(block)
+        return self.document
+
+    @staticmethod
+    def save(content, filename):
+        """Convert Markdown content and save it as a .docx file."""
+        writer = DocxWriter()
+        writer.add_logo()
+        writer.write(markdown_ir.parse(content)).save(filename)
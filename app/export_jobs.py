@@ -0,0 +1,166 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+
+from app import markdown_ir, settings
+from app.file_handler import FileHandler
+
+EXTENSIONS = {"pdf": "pdf", "txt": "txt", "doc": "docx"}
+
+
+class ExportJob:
+    """One file being written in one format."""
+
+    __slots__ = (
+        "job_id",
+        "content",
+        "file_format",
+        "filename",
+        "status",
+        "messages",
+        "cancel_requested",
+        "future",
+    )
+
+    def __init__(self, job_id, content, file_format, filename):
+        self.job_id = job_id
+        self.content = content
+        self.file_format = file_format
+        self.filename = filename
+        # queued -> running -> saved / failed / cancelled
+        self.status = "queued"
+        self.messages = []
+        self.cancel_requested = False
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in ("saved", "failed", "cancelled")
+
+
+class ExportManager:
+    """Writes exports on a worker pool so the Tk main loop stays responsive.
+
+    submit() queues one job per format, and formats of the same batch are
+    written in parallel. Finished jobs are posted to a queue which the UI
+    drains from its main loop with poll(). A queued job can be cancelled
+    outright; a running one can't be interrupted, so its file is deleted
+    once the writer returns.
+    """
+
+    def __init__(self, file_handler=None, max_workers=None):
+        self.file_handler = file_handler or FileHandler
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.EXPORT_MAX_WORKERS,
+            thread_name_prefix="export",
+        )
+        self.finished = Queue()
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Jobs submitted and finished since the pool was last idle
+        self.batch_total = 0
+        self.batch_done = 0
+
+    @staticmethod
+    def default_filename(file_prefix, file_format):
+        prefix = file_prefix if file_prefix else "analysis"
+        return os.path.join(
+            os.path.expanduser("~"),
+            f"{prefix}_{int(time.time())}.{EXTENSIONS.get(file_format, file_format)}",
+        )
+
+    def submit(self, content, formats, file_prefix=None):
+        """Queue content to be saved in each of the formats; returns the jobs."""
+        # Parse up front so the writers of every format share one tree
+        markdown_ir.parse(content)
+        jobs = []
+        with self._lock:
+            if not self.jobs:
+                self.batch_total = self.batch_done = 0
+            for file_format in formats:
+                job = ExportJob(
+                    next(self._ids),
+                    content,
+                    file_format,
+                    self.default_filename(file_prefix, file_format),
+                )
+                self.jobs[job.job_id] = job
+                self.batch_total += 1
+                jobs.append(job)
+
+        for job in jobs:
+            job.future = self.executor.submit(self._run, job)
+            job.future.add_done_callback(lambda future, job=job: self._done(job))
+        return jobs
+
+    def _run(self, job):
+        if job.cancel_requested:
+            job.status = "cancelled"
+            return
+        job.status = "running"
+        start = time.perf_counter()
+
+        self.file_handler.collect_messages()
+        try:
+            saved = self.file_handler.save_analysis(
+                job.content, job.file_format, filename=job.filename
+            )
+        except Exception as e:
+            saved = False
+            self.file_handler.show_error("Error", f"Failed to save file: {str(e)}")
+        job.messages = self.file_handler.collect_messages()
+
+        if job.cancel_requested:
+            if saved and os.path.exists(job.filename):
+                os.remove(job.filename)
+            job.status = "cancelled"
+        else:
+            job.status = "saved" if saved else "failed"
+        logging.getLogger("app").info(
+            f"Export {job.job_id} ({job.file_format}) {job.status} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _done(self, job):
+        if job.future.cancelled():
+            job.status = "cancelled"
+        elif not job.finished:
+            job.status = "failed"
+        self.finished.put(job)
+
+    def cancel(self, jobs=None):
+        """Cancel the given jobs, or every unfinished job."""
+        with self._lock:
+            jobs = list(self.jobs.values()) if jobs is None else jobs
+        for job in jobs:
+            job.cancel_requested = True
+            if job.future is not None:
+                job.future.cancel()
+
+    def poll(self):
+        """Return the jobs finished since the last call; call from the UI thread."""
+        done = []
+        while True:
+            try:
+                job = self.finished.get_nowait()
+            except Empty:
+                break
+            with self._lock:
+                self.jobs.pop(job.job_id, None)
+                self.batch_done += 1
+            done.append(job)
+        return done
+
+    @property
+    def active(self):
+        with self._lock:
+            return len(self.jobs)
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+
+
+class Finding:
+    """One result of a local (non-AI) check."""
+
+    __slots__ = ("rule_id", "category", "severity", "object_ref", "message")
+
+    def __init__(self, rule_id, category, severity, object_ref, message):
+        self.rule_id = rule_id
+        self.category = category
+        self.severity = severity
+        self.object_ref = object_ref
+        self.message = message
+
+    def sort_key(self):
+        return (SEVERITY_ORDER.get(self.severity, 3), self.rule_id, self.object_ref)
+
+    def __repr__(self):
+        return f"Finding({self.rule_id}, {self.object_ref})"
+
+
+def _cell(text):
+    return str(text).replace("|", "\\|").replace("\n", " ")
+
+
+def findings_to_markdown(title, findings):
+    """Render findings as a Markdown section with one table row per finding."""
+    lines = [f"## {title}", ""]
+    if not findings:
+        lines.append("_No issues found by the automated checks._")
+        return "\n".join(lines)
+
+    lines.append(
+        f"_{len(findings)} issue(s) found by automated rules evaluated locally, "
+        "without AI._"
+    )
+    lines.append("")
+    lines.append("| Severity | Rule | Object | Finding |")
+    lines.append("|---|---|---|---|")
+    for finding in sorted(findings, key=Finding.sort_key):
+        lines.append(
+            f"| {finding.severity.title()} | {finding.rule_id} | "
+            f"`{_cell(finding.object_ref)}` | {_cell(finding.message)} |"
+        )
+    return "\n".join(lines)
+
+
+def findings_to_hints(findings, limit=50):
+    """Summarise findings for the AI prompt, so it can build on them."""
+    if not findings:
+        return ""
+
+    ordered = sorted(findings, key=Finding.sort_key)
+    lines = [
+        "\nAutomated local checks already found the issues below. Don't list them "
+        "again one by one; verify them, explain their impact and focus on problems "
+        "these rules can't detect:"
+    ]
+    lines.extend(
+        f"- {finding.rule_id} {finding.object_ref}: {finding.message}"
+        for finding in ordered[:limit]
+    )
+    if len(ordered) > limit:
+        lines.append(f"- ... and {len(ordered) - limit} more")
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app import markdown_ir, settings
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+{css}
+    </style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+class HtmlRenderer:
+    """Turns analysis Markdown into the HTML page shown in the analysis tabs.
+
+    The stylesheet and page template are built once, with the fonts pointing
+    at the bundled assets/fonts instead of the network. Pages are rendered
+    from the shared Markdown tree (app/markdown_ir.py) and memoised by its
+    hash, and render_async() converts on a worker thread so the Tk main loop
+    stays responsive.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or settings.HTML_CACHE_ENTRIES
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self._template = None
+        # One worker keeps renders in submission order
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+
+    @property
+    def template(self):
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    self._template = self._build_template()
+        return self._template
+
+    @staticmethod
+    def _build_template():
+        with open(
+            os.path.join(ASSETS_DIR, "css", "analysis.css"), "r", encoding="utf-8"
+        ) as css_file:
+            css = css_file.read()
+        fonts_uri = pathlib.Path(ASSETS_DIR, "fonts").resolve().as_uri()
+        css = css.replace("../assets/fonts", fonts_uri)
+        # The page is filled in with str.replace rather than format(), as the
+        # stylesheet is full of braces
+        return PAGE_TEMPLATE.replace("{css}", css)
+
+    def render(self, markdown_text):
+        """Return the HTML page for the Markdown, converting it only once."""
+        document = markdown_ir.parse(markdown_text)
+        key = document.digest
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+
+        page = self.template.replace("{body}", markdown_ir.to_html(document))
+
+        with self._lock:
+            self._pages[key] = page
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return page
+
+    def render_async(self, markdown_text):
+        """Render on the worker thread; returns a Future with the HTML page."""
+        return self.executor.submit(self.render, markdown_text)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
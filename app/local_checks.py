@@ -0,0 +1,52 @@
+import logging
+import time
+
+from app.dax_rules import DaxScanner
+from app.findings import findings_to_hints, findings_to_markdown
+from app.model_rules import ModelRuleEngine
+
+# Finding categories shown next to each task's AI report, and the section title
+TASK_CHECKS = {
+    "model": (("model",), "Automated Model Checks"),
+    "dax": (("dax",), "Automated DAX Checks"),
+    "performance": (("dax", "performance"), "Automated Performance Checks"),
+    "missing": (("missing",), "Automated Completeness Checks"),
+}
+
+
+class LocalChecker:
+    """Runs the local rule engines over a parsed model, without the AI."""
+
+    def __init__(self, dax_scanner=None, model_rules=None):
+        self.dax_scanner = dax_scanner or DaxScanner()
+        self.model_rules = model_rules or ModelRuleEngine()
+
+    def run(self, semantic_model):
+        """Return every finding for the model."""
+        started = time.perf_counter()
+        findings = self.dax_scanner.scan_model(semantic_model)
+        findings.extend(self.model_rules.run(semantic_model))
+        logging.getLogger("app").info(
+            f"Local checks: {len(findings)} finding(s) in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return findings
+
+    @staticmethod
+    def task_findings(findings, task_name):
+        categories = TASK_CHECKS[task_name][0] if task_name in TASK_CHECKS else ()
+        return [finding for finding in findings if finding.category in categories]
+
+    @staticmethod
+    def task_section(findings, task_name):
+        """Markdown section for a task, or None if the task has no local checks."""
+        if task_name not in TASK_CHECKS:
+            return None
+        return findings_to_markdown(
+            TASK_CHECKS[task_name][1], LocalChecker.task_findings(findings, task_name)
+        )
+
+    @staticmethod
+    def task_hints(findings, task_name):
+        """Prompt text pointing the AI at findings it doesn't need to repeat."""
+        return findings_to_hints(LocalChecker.task_findings(findings, task_name))
@@ -0,0 +1,549 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+
+from app import settings
+
+# Inline span flags
+BOLD = 1
+ITALIC = 2
+CODE = 4
+BREAK = 8
+# Width of horizontal rules in plain text
+RULE_WIDTH = 40
+
+FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})[ \t]*([^`\s]*)")
+HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+LIST_ITEM = re.compile(r"^( *)([-*+]|(\d{1,9})[.)])(?:([ \t]+)(.*)|$)")
+QUOTE = re.compile(r"^ {0,3}> ?(.*)")
+TABLE_DELIMITER = re.compile(r"^ *\|? *:?-+:? *(?:\| *:?-+:? *)*\|? *$")
+CELL_SEPARATOR = re.compile(r"(?<!\\)\|")
+INLINE = re.compile(
+    r"(?P<escape>\\[\\`*_{}\[\]()#+\-.!|>~<])"
+    r"|(?P<code>(?P<ticks>`+)(?P<code_text>.+?)(?<!`)(?P=ticks)(?!`))"
+    r"|(?P<br><br\s*/?>)"
+    r"|<(?P<url>https?://[^>\s]+)>"
+    r"|\[(?P<label>(?:[^\[\]]|\[[^\]]*\])*)\]"
+    r"\((?P<href><[^>]*>|[^)\s]*)(?:\s+\"[^\"]*\")?\)"
+    r"|\*\*\*(?=\S)(?P<both>.+?)(?<=\S)\*\*\*"
+    r"|\*\*(?=\S)(?P<bold>.+?)(?<=\S)\*\*"
+    r"|\*(?=[^\s*])(?P<italic>.+?)(?<=[^\s*])\*",
+    re.S,
+)
+
+
+class Heading:
+    __slots__ = ("level", "spans")
+    kind = "heading"
+
+    def __init__(self, level, spans):
+        self.level = level
+        self.spans = spans
+
+
+class Paragraph:
+    __slots__ = ("spans",)
+    kind = "paragraph"
+
+    def __init__(self, spans):
+        self.spans = spans
+
+
+class CodeBlock:
+    __slots__ = ("language", "text")
+    kind = "code"
+
+    def __init__(self, language, text):
+        self.language = language
+        self.text = text
+
+
+class ListBlock:
+    """items holds the blocks of each item; start is the first number."""
+
+    __slots__ = ("ordered", "start", "items")
+    kind = "list"
+
+    def __init__(self, ordered, start, items):
+        self.ordered = ordered
+        self.start = start
+        self.items = items
+
+
+class Table:
+    """header and rows hold the spans of each cell; aligns is per column."""
+
+    __slots__ = ("aligns", "header", "rows")
+    kind = "table"
+
+    def __init__(self, aligns, header, rows):
+        self.aligns = aligns
+        self.header = header
+        self.rows = rows
+
+
+class BlockQuote:
+    __slots__ = ("blocks",)
+    kind = "quote"
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+
+class Rule:
+    __slots__ = ()
+    kind = "rule"
+
+
+class MarkdownDocument:
+    """Block tree of one Markdown text.
+
+    Blocks are the classes above; the inline content of headings,
+    paragraphs and table cells is a list of (text, flags, href) spans, with
+    flags a combination of BOLD, ITALIC and CODE, or BREAK for a line break.
+    """
+
+    __slots__ = ("digest", "blocks")
+
+    def __init__(self, digest, blocks):
+        self.digest = digest
+        self.blocks = blocks
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip(" "))
+
+
+def _starts_block(line):
+    return bool(
+        FENCE.match(line)
+        or HEADING.match(line)
+        or RULE.match(line)
+        or QUOTE.match(line)
+        or LIST_ITEM.match(line)
+    )
+
+
+def _is_table(lines, i):
+    return (
+        "|" in lines[i]
+        and i + 1 < len(lines)
+        and "|" in lines[i + 1]
+        and TABLE_DELIMITER.match(lines[i + 1]) is not None
+    )
+
+
+def _split_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in CELL_SEPARATOR.split(line)]
+
+
+def _alignment(cell):
+    if cell.startswith(":") and cell.endswith(":"):
+        return "center"
+    if cell.endswith(":"):
+        return "right"
+    if cell.startswith(":"):
+        return "left"
+    return None
+
+
+def parse_inline(text, flags=0, href=None):
+    """Parse inline Markdown into (text, flags, href) spans."""
+    spans = []
+
+    def add(value, value_flags=flags, value_href=href):
+        if not value:
+            return
+        if spans and spans[-1][1:] == (value_flags, value_href):
+            spans[-1] = (spans[-1][0] + value, value_flags, value_href)
+        else:
+            spans.append((value, value_flags, value_href))
+
+    def add_text(value):
+        lines = value.split("\n")
+        add(lines[0])
+        for line in lines[1:]:
+            spans.append(("\n", BREAK, None))
+            add(line)
+
+    def extend(nested):
+        for span in nested:
+            if span[1] & BREAK:
+                spans.append(span)
+            else:
+                add(*span)
+
+    position = 0
+    for match in INLINE.finditer(text):
+        add_text(text[position : match.start()])
+        position = match.end()
+        group = match.lastgroup
+        if group == "escape":
+            add(match.group(0)[1])
+        elif group == "code":
+            code = match.group("code_text").replace("\n", " ")
+            if code.startswith(" ") and code.endswith(" ") and code.strip():
+                code = code[1:-1]
+            add(code, flags | CODE)
+        elif group == "br":
+            spans.append(("\n", BREAK, None))
+        elif group == "url":
+            add(match.group("url"), flags, match.group("url"))
+        elif group == "href":
+            link = match.group("href").strip("<>")
+            extend(parse_inline(match.group("label"), flags, link))
+        else:
+            extra = {"both": BOLD | ITALIC, "bold": BOLD, "italic": ITALIC}[group]
+            extend(parse_inline(match.group(group), flags | extra, href))
+    add_text(text[position:])
+    return spans
+
+
+def _parse_list(lines, i):
+    first = LIST_ITEM.match(lines[i])
+    indent = len(first.group(1))
+    ordered = first.group(3) is not None
+    start = int(first.group(3)) if ordered else 1
+    items = []
+
+    while True:
+        match = LIST_ITEM.match(lines[i])
+        spacing = match.group(4) or " "
+        content_indent = len(match.group(1)) + len(match.group(2))
+        content_indent += len(spacing) if len(spacing) <= 4 else 1
+        body = [match.group(5) or ""]
+        i += 1
+
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                j = i
+                while j < len(lines) and not lines[j].strip():
+                    j += 1
+                if j < len(lines) and _indent(lines[j]) > indent:
+                    body.extend([""] * (j - i))
+                    i = j
+                    continue
+                if j < len(lines) and LIST_ITEM.match(lines[j]):
+                    i = j
+                break
+            line_indent = _indent(line)
+            if line_indent <= indent and (LIST_ITEM.match(line) or RULE.match(line)):
+                break
+            # Anything indented past the marker belongs to the item, so
+            # nested lists indented by two or three spaces nest as intended
+            if line_indent > indent:
+                body.append(line[min(line_indent, content_indent) :])
+            elif body[-1].strip() and not _starts_block(line):
+                body.append(line.strip())
+            else:
+                break
+            i += 1
+        items.append(_parse_blocks(body))
+
+        if i >= len(lines):
+            break
+        sibling = LIST_ITEM.match(lines[i])
+        if (
+            not sibling
+            or RULE.match(lines[i])
+            or _indent(lines[i]) > indent
+            or (sibling.group(3) is not None) != ordered
+        ):
+            break
+    return ListBlock(ordered, start, items), i
+
+
+def _parse_blocks(lines):
+    blocks = []
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            text = "\n".join(line.strip() for line in paragraph)
+            blocks.append(Paragraph(parse_inline(text)))
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            flush()
+            i += 1
+            continue
+
+        fence = FENCE.match(line)
+        if fence:
+            flush()
+            indent, marker = len(fence.group(1)), fence.group(2)
+            code = []
+            i += 1
+            while i < len(lines):
+                stripped = lines[i].strip()
+                if stripped.startswith(marker) and not stripped.strip(marker[0]):
+                    break
+                code.append(lines[i][min(indent, _indent(lines[i])) :])
+                i += 1
+            i += 1
+            blocks.append(CodeBlock(fence.group(3), "\n".join(code)))
+            continue
+
+        if paragraph and SETEXT_UNDERLINE.match(line):
+            level = 1 if line.strip()[0] == "=" else 2
+            text = " ".join(line.strip() for line in paragraph)
+            blocks.append(Heading(level, parse_inline(text)))
+            paragraph.clear()
+            i += 1
+            continue
+
+        heading = HEADING.match(line)
+        if heading:
+            flush()
+            blocks.append(
+                Heading(len(heading.group(1)), parse_inline(heading.group(2) or ""))
+            )
+            i += 1
+            continue
+
+        if RULE.match(line):
+            flush()
+            blocks.append(Rule())
+            i += 1
+            continue
+
+        if _is_table(lines, i):
+            flush()
+            header = _split_row(line)
+            aligns = [_alignment(cell) for cell in _split_row(lines[i + 1])]
+            aligns = (aligns + [None] * len(header))[: len(header)]
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+                cells = (_split_row(lines[i]) + [""] * len(header))[: len(header)]
+                rows.append([parse_inline(cell) for cell in cells])
+                i += 1
+            blocks.append(Table(aligns, [parse_inline(c) for c in header], rows))
+            continue
+
+        if QUOTE.match(line):
+            flush()
+            quoted = []
+            while i < len(lines) and QUOTE.match(lines[i]):
+                quoted.append(QUOTE.match(lines[i]).group(1))
+                i += 1
+            blocks.append(BlockQuote(_parse_blocks(quoted)))
+            continue
+
+        if LIST_ITEM.match(line):
+            # Lists may start right below a paragraph line (cuddled lists)
+            flush()
+            block, i = _parse_list(lines, i)
+            blocks.append(block)
+            continue
+
+        paragraph.append(line)
+        i += 1
+
+    flush()
+    return blocks
+
+
+class MarkdownCache:
+    """Parsed documents keyed by a hash of their Markdown, least recently
+    used evicted first, so a report exported in several formats and shown
+    in the viewer is parsed once."""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or settings.MARKDOWN_CACHE_ENTRIES
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, text):
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            document = self._documents.get(digest)
+            if document is not None:
+                self._documents.move_to_end(digest)
+                return document
+
+        lines = text.expandtabs(4).replace("\r\n", "\n").split("\n")
+        document = MarkdownDocument(digest, _parse_blocks(lines))
+
+        with self._lock:
+            self._documents[digest] = document
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+
+_cache = MarkdownCache()
+
+
+def parse(text):
+    """Return the MarkdownDocument for the text, parsing it only once."""
+    return _cache.parse(text)
+
+
+def clear_cache():
+    """Drop every parsed document, e.g. to benchmark cold parses."""
+    _cache.clear()
+
+
+def plain_text(spans):
+    return "".join(text for text, _flags, _href in spans)
+
+
+def spans_to_html(spans):
+    parts = []
+    for text, flags, href in spans:
+        if flags & BREAK:
+            parts.append("<br />\n")
+            continue
+        part = html.escape(text, quote=False)
+        if flags & CODE:
+            part = f"<code>{part}</code>"
+        if flags & ITALIC:
+            part = f"<em>{part}</em>"
+        if flags & BOLD:
+            part = f"<strong>{part}</strong>"
+        if href:
+            part = f'<a href="{html.escape(href)}">{part}</a>'
+        parts.append(part)
+    return "".join(parts)
+
+
+def _list_item_html(blocks):
+    # Tight items keep their first paragraph inline, as markdown2 did
+    if blocks and blocks[0].kind == "paragraph":
+        return spans_to_html(blocks[0].spans) + "".join(
+            "\n" + _block_html(block) for block in blocks[1:]
+        )
+    return "".join(_block_html(block) for block in blocks)
+
+
+def _cell_html(tag, spans, align):
+    style = f' style="text-align:{align};"' if align else ""
+    return f"  <{tag}{style}>{spans_to_html(spans)}</{tag}>\n"
+
+
+def _block_html(block):
+    kind = block.kind
+    if kind == "heading":
+        return f"<h{block.level}>{spans_to_html(block.spans)}</h{block.level}>\n"
+    if kind == "paragraph":
+        return f"<p>{spans_to_html(block.spans)}</p>\n"
+    if kind == "code":
+        language = f' class="language-{block.language}"' if block.language else ""
+        code = html.escape(block.text, quote=False)
+        return f"<pre><code{language}>{code}\n</code></pre>\n"
+    if kind == "list":
+        tag = "ol" if block.ordered else "ul"
+        start = f' start="{block.start}"' if block.ordered and block.start != 1 else ""
+        items = "".join(f"<li>{_list_item_html(item)}</li>\n" for item in block.items)
+        return f"<{tag}{start}>\n{items}</{tag}>\n"
+    if kind == "table":
+        header = "".join(
+            _cell_html("th", cell, align)
+            for cell, align in zip(block.header, block.aligns)
+        )
+        rows = "".join(
+            "<tr>\n"
+            + "".join(
+                _cell_html("td", cell, align) for cell, align in zip(row, block.aligns)
+            )
+            + "</tr>\n"
+            for row in block.rows
+        )
+        return (
+            f"<table>\n<thead>\n<tr>\n{header}</tr>\n</thead>\n"
+            f"<tbody>\n{rows}</tbody>\n</table>\n"
+        )
+    if kind == "quote":
+        inner = "".join(_block_html(child) for child in block.blocks)
+        return f"<blockquote>\n{inner}</blockquote>\n"
+    return "<hr />\n"
+
+
+def to_html(document):
+    """Render a MarkdownDocument as an HTML fragment."""
+    return "\n".join(_block_html(block) for block in document.blocks)
+
+
+def _spans_text(spans):
+    parts = []
+    for index, (text, _flags, href) in enumerate(spans):
+        parts.append(text)
+        # Links keep their address after the last span of the link text
+        following = spans[index + 1][2] if index + 1 < len(spans) else None
+        if href and following != href and text != href:
+            parts.append(f" ({href})")
+    return "".join(parts)
+
+
+def _text_lines(block):
+    kind = block.kind
+    if kind == "heading":
+        text = _spans_text(block.spans)
+        if block.level <= 2:
+            return [text, ("=" if block.level == 1 else "-") * len(text)]
+        return [text]
+    if kind == "paragraph":
+        return _spans_text(block.spans).split("\n")
+    if kind == "code":
+        return ["    " + line for line in block.text.split("\n")]
+    if kind == "list":
+        lines = []
+        for number, item in enumerate(block.items, block.start):
+            marker = f"{number}. " if block.ordered else "- "
+            item_lines = []
+            for child in item:
+                if item_lines and child.kind != "list":
+                    item_lines.append("")
+                item_lines.extend(_text_lines(child))
+            item_lines = item_lines or [""]
+            lines.append(marker + item_lines[0])
+            lines.extend(
+                " " * len(marker) + line if line else "" for line in item_lines[1:]
+            )
+        return lines
+    if kind == "table":
+        rows = [[_spans_text(cell) for cell in block.header]]
+        rows += [[_spans_text(cell) for cell in row] for row in block.rows]
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = [
+            " | ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip()
+            for row in rows
+        ]
+        lines.insert(1, "-+-".join("-" * w for w in widths))
+        return lines
+    if kind == "quote":
+        return ["> " + line if line else ">" for line in _blocks_text(block.blocks)]
+    return ["-" * RULE_WIDTH]
+
+
+def _blocks_text(blocks):
+    lines = []
+    for block in blocks:
+        if lines:
+            lines.append("")
+        lines.extend(_text_lines(block))
+    return lines
+
+
+def to_text(document):
+    """Render a MarkdownDocument as plain text, without Markdown markup."""
+    text = "\n".join(_blocks_text(document.blocks))
+    return re.sub(r"[ \t]+\n", "\n", text).strip("\n") + "\n"
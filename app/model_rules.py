@@ -0,0 +1,325 @@
+from app.dax_rules import Call, parse, tokenize
+from app.findings import Finding
+
+AUTO_DATE_TABLE_PREFIXES = ("LocalDateTable_", "DateTableTemplate_")
+
+FLOAT_DATA_TYPES = frozenset({"double", "decimal"})
+
+# Functions that make a calculated column's value an aggregate over other rows
+AGGREGATIONS = frozenset(
+    {
+        "SUM",
+        "SUMX",
+        "AVERAGE",
+        "AVERAGEX",
+        "MIN",
+        "MINX",
+        "MAX",
+        "MAXX",
+        "COUNT",
+        "COUNTA",
+        "COUNTX",
+        "COUNTROWS",
+        "COUNTBLANK",
+        "DISTINCTCOUNT",
+        "CALCULATE",
+        "TOTALYTD",
+        "TOTALQTD",
+        "TOTALMTD",
+    }
+)
+
+# Object kinds a rule can apply to, in evaluation order
+SCOPES = ("model", "table", "column", "measure", "relationship")
+
+
+class ModelRule:
+    __slots__ = ("rule_id", "category", "severity", "scope", "title", "check")
+
+    def __init__(self, rule_id, category, severity, scope, title, check):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown rule scope: {scope}")
+        self.rule_id = rule_id
+        self.category = category
+        self.severity = severity
+        self.scope = scope
+        self.title = title
+        # check(obj, index) -> message, or None when the object passes
+        self.check = check
+
+
+class ModelIndex:
+    """Lookups the rules share, built once per model before the pass."""
+
+    __slots__ = ("model", "key_columns", "foreign_keys", "related_tables")
+
+    def __init__(self, model):
+        self.model = model
+        self.key_columns = set()
+        self.foreign_keys = set()
+        self.related_tables = set()
+        for relationship in model.relationships:
+            from_key = (relationship.from_table, relationship.from_column)
+            to_key = (relationship.to_table, relationship.to_column)
+            self.key_columns.update((from_key, to_key))
+            if relationship.from_cardinality == "many":
+                self.foreign_keys.add(from_key)
+            self.related_tables.update((relationship.from_table, relationship.to_table))
+
+
+def is_auto_date_table(table):
+    return table.name.startswith(AUTO_DATE_TABLE_PREFIXES)
+
+
+def _auto_date_tables(model, index):
+    names = [table.name for table in model.tables if is_auto_date_table(table)]
+    if names:
+        return (
+            f"{len(names)} auto date/time table(s) such as '{names[0]}'; turn off "
+            "Auto date/time and use one shared date table to cut model size"
+        )
+
+
+def _unrelated_table(table, index):
+    if (
+        len(index.model.tables) > 1
+        and table.name not in index.related_tables
+        and table.columns
+        and not table.is_calculation_group
+        and not is_auto_date_table(table)
+    ):
+        return "Table has no relationships to the rest of the model"
+
+
+def _missing_descriptions(table, index):
+    if table.is_hidden or is_auto_date_table(table):
+        return None
+    missing = [
+        item.name
+        for item in (*table.columns, *table.measures)
+        if not item.is_hidden and not item.description
+    ]
+    if not table.description:
+        missing.insert(0, "the table itself")
+    if missing:
+        return (
+            f"{len(missing)} visible object(s) without a description, "
+            f"e.g. {', '.join(missing[:3])}"
+        )
+
+
+def _calculated_column_aggregate(column, index):
+    if not column.is_calculated or not column.expression:
+        return None
+    tree = parse(tokenize(column.expression))
+    aggregated, row_context = _aggregation_usage(tree, index.model)
+    if aggregated and not row_context:
+        return (
+            "Calculated column only aggregates other rows; a measure computes "
+            "this at query time without storing a value per row"
+        )
+
+
+def _aggregation_usage(nodes, model, inside=False):
+    """(uses aggregations, references a column outside aggregations)."""
+    aggregated = row_context = False
+    for node in nodes:
+        if isinstance(node, Call):
+            nested = inside or node.name in AGGREGATIONS
+            aggregated = aggregated or node.name in AGGREGATIONS
+            for arg in node.args:
+                arg_aggregated, arg_row = _aggregation_usage(arg, model, nested)
+                aggregated = aggregated or arg_aggregated
+                row_context = row_context or arg_row
+        elif node.kind == "column":
+            if model.measure(node.bracket_name) is not None:
+                # Measure references aggregate through context transition
+                aggregated = True
+            elif not inside:
+                row_context = True
+    return aggregated, row_context
+
+
+def _unhidden_foreign_key(column, index):
+    if not column.is_hidden and (column.table, column.name) in index.foreign_keys:
+        return "Foreign key column is visible; hide it so users filter by the dimension"
+
+
+def _float_key(column, index):
+    if column.data_type in FLOAT_DATA_TYPES and (
+        column.is_key or (column.table, column.name) in index.key_columns
+    ):
+        return (
+            f"Key column has data type {column.data_type}; use whole numbers for "
+            "relationship keys to compress better and match exactly"
+        )
+
+
+def _summarized_key(column, index):
+    if (
+        column.summarize_by not in (None, "none")
+        and (column.table, column.name) in index.key_columns
+    ):
+        return (
+            f"Key column summarizes by {column.summarize_by}; set Summarize By to "
+            "None so it isn't added up in visuals"
+        )
+
+
+def _bidirectional_relationship(relationship, index):
+    if relationship.is_bidirectional:
+        return (
+            "Bidirectional cross-filtering widens every query and can make "
+            "filter paths ambiguous; prefer single direction"
+        )
+
+
+def _many_to_many_relationship(relationship, index):
+    if relationship.from_cardinality == relationship.to_cardinality == "many":
+        return "Many-to-many relationship; consider a bridge table"
+
+
+def _relationship_ref(relationship):
+    return (
+        f"{relationship.from_table}[{relationship.from_column}] -> "
+        f"{relationship.to_table}[{relationship.to_column}]"
+    )
+
+
+MODEL_RULES = (
+    ModelRule(
+        "MDL001",
+        "performance",
+        "warning",
+        "relationship",
+        "Bidirectional relationship",
+        _bidirectional_relationship,
+    ),
+    ModelRule(
+        "MDL002",
+        "performance",
+        "warning",
+        "column",
+        "Calculated column that should be a measure",
+        _calculated_column_aggregate,
+    ),
+    ModelRule(
+        "MDL003",
+        "model",
+        "warning",
+        "column",
+        "Visible foreign key",
+        _unhidden_foreign_key,
+    ),
+    ModelRule(
+        "MDL004",
+        "missing",
+        "info",
+        "table",
+        "Missing descriptions",
+        _missing_descriptions,
+    ),
+    ModelRule(
+        "MDL005",
+        "performance",
+        "warning",
+        "model",
+        "Auto date/time tables",
+        _auto_date_tables,
+    ),
+    ModelRule(
+        "MDL006",
+        "performance",
+        "warning",
+        "column",
+        "Floating-point key column",
+        _float_key,
+    ),
+    ModelRule(
+        "MDL007",
+        "missing",
+        "warning",
+        "table",
+        "Table without relationships",
+        _unrelated_table,
+    ),
+    ModelRule(
+        "MDL008",
+        "model",
+        "info",
+        "relationship",
+        "Many-to-many relationship",
+        _many_to_many_relationship,
+    ),
+    ModelRule(
+        "MDL009",
+        "model",
+        "info",
+        "column",
+        "Key column summarized",
+        _summarized_key,
+    ),
+)
+
+
+class ModelRuleEngine:
+    """Evaluates best-practice rules over a SemanticModel in a single pass.
+
+    Rules are grouped by scope once, when the engine is created, so each
+    object is visited once and only checked against the rules for its kind.
+    """
+
+    def __init__(self, rules=None):
+        rules = MODEL_RULES if rules is None else rules
+        self.rules = {
+            scope: tuple(rule for rule in rules if rule.scope == scope)
+            for scope in SCOPES
+        }
+
+    def run(self, model):
+        index = ModelIndex(model)
+        findings = []
+        self._apply("model", model, model.name or "Model", index, findings)
+
+        column_rules = self.rules["column"]
+        measure_rules = self.rules["measure"]
+        for table in model.tables:
+            self._apply("table", table, f"'{table.name}'", index, findings)
+            if column_rules:
+                for column in table.columns:
+                    self._apply(
+                        "column",
+                        column,
+                        f"{table.name}[{column.name}]",
+                        index,
+                        findings,
+                    )
+            if measure_rules:
+                for measure in table.measures:
+                    self._apply(
+                        "measure",
+                        measure,
+                        f"{table.name}[{measure.name}]",
+                        index,
+                        findings,
+                    )
+
+        for relationship in model.relationships:
+            self._apply(
+                "relationship",
+                relationship,
+                _relationship_ref(relationship),
+                index,
+                findings,
+            )
+        return findings
+
+    def _apply(self, scope, obj, object_ref, index, findings):
+        for rule in self.rules[scope]:
+            message = rule.check(obj, index)
+            if message:
+                findings.append(
+                    Finding(
+                        rule.rule_id, rule.category, rule.severity, object_ref, message
+                    )
+                )
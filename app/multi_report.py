@@ -0,0 +1,49 @@
+import re
+
+REPORT_START = "<<<REPORT:{name}>>>"
+REPORT_END = "<<<END:{name}>>>"
+
+MULTI_REPORT_TASK = (
+    "You will write {count} separate reports about the same Power BI model, one "
+    "for each task below. Write them in the order given. Start each report with "
+    "a line containing only its start marker and finish it with a line "
+    "containing only its end marker, exactly as shown. Write nothing outside "
+    "the markers, and don't refer to the other reports.\n"
+)
+
+MARKER_PATTERN = re.compile(r"^[ \t]*<<<(REPORT|END):([A-Za-z0-9_]+)>>>[ \t]*$", re.M)
+
+
+def build_task(tasks, format_task=""):
+    """Combine {task_name: instructions} into one system prompt."""
+    parts = [MULTI_REPORT_TASK.format(count=len(tasks))]
+    for name, task in tasks.items():
+        parts.append(
+            f"\n{REPORT_START.format(name=name)}\nTask: {task.strip()}\n"
+            f"{REPORT_END.format(name=name)}\n"
+        )
+    parts.append(format_task)
+    return "".join(parts)
+
+
+def split_reports(text):
+    """Split a multi-report response into {task_name: (markdown, complete)}.
+
+    A report is complete when its end marker was received; a report cut off
+    by the response length, or still streaming, is returned as incomplete.
+    """
+    reports = {}
+    current, start = None, 0
+    for match in MARKER_PATTERN.finditer(text):
+        kind, name = match.groups()
+        if kind == "REPORT":
+            if current is not None:
+                # A new report started without closing the previous one
+                reports[current] = (text[start : match.start()].strip(), False)
+            current, start = name, match.end()
+        elif name == current:
+            reports[current] = (text[start : match.start()].strip(), True)
+            current = None
+    if current is not None:
+        reports[current] = (text[start:].strip(), False)
+    return reports
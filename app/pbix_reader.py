@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import zipfile
+
+from app import settings
+from app.bim_model import SemanticModel
+from app.bim_pruner import BimPruner
+from app.bim_reader import BimStreamReader, JsonTextStream
+
+MODEL_MEMBER = "DataModelSchema"
+LAYOUT_MEMBER = "Report/Layout"
+
+
+def _loads(text, default):
+    """Visual configs are JSON documents stored as strings inside the layout."""
+    if not isinstance(text, str):
+        return text if text is not None else default
+    try:
+        return json.loads(text)
+    except ValueError:
+        return default
+
+
+def summarize_visual(container):
+    """Reduce a visual container to its type, title and fields."""
+    config = _loads(container.get("config"), {})
+    visual = config.get("singleVisual") or {}
+    summary = {"type": visual.get("visualType")}
+    if not summary["type"] and "singleVisualGroup" in config:
+        summary["type"] = "group"
+        summary["title"] = config["singleVisualGroup"].get("displayName")
+
+    try:
+        title = visual["vcObjects"]["title"][0]["properties"]["text"]["expr"]
+        summary["title"] = title["Literal"]["Value"].strip("'")
+    except (KeyError, IndexError, TypeError):
+        pass
+
+    fields = [
+        projection.get("queryRef")
+        for projections in (visual.get("projections") or {}).values()
+        for projection in projections
+        if projection.get("queryRef")
+    ]
+    if fields:
+        summary["fields"] = list(dict.fromkeys(fields))
+    if _loads(container.get("filters"), []):
+        summary["hasFilters"] = True
+    return {key: value for key, value in summary.items() if value}
+
+
+class PbixReader:
+    """Reads the model and report layout out of .pbix / .pbit archives.
+
+    Both members are UTF-16 JSON and are streamed out of the zip without
+    decoding them whole: DataModelSchema goes through BimStreamReader, and
+    the layout is summarised page by page into the pages and visuals of
+    the report, cut off at whole visuals once the character budget is used.
+    .pbix files usually hold the model only in compressed form, in which
+    case just the report layout is available.
+    """
+
+    def __init__(self, pruner=None, max_layout_chars=None):
+        self.pruner = pruner or BimPruner()
+        self.max_layout_chars = (
+            max_layout_chars
+            if max_layout_chars is not None
+            else settings.REPORT_LAYOUT_MAX_CHARS
+        )
+
+    def read(self, file_path, prune=True):
+        """Return (semantic_model, content, prune_report).
+
+        content is TMSL JSON with the report summary under "report". The
+        model has no tables when the archive holds only the report, and the
+        prune report is None then.
+        """
+        name = os.path.basename(file_path)
+        semantic_model = text = report = None
+        with zipfile.ZipFile(file_path) as archive:
+            members = set(archive.namelist())
+            if MODEL_MEMBER in members:
+                pruner = self.pruner if prune else BimPruner(properties=(), prefixes=())
+                with archive.open(MODEL_MEMBER) as member:
+                    semantic_model, text, report = BimStreamReader(pruner).read_stream(
+                        member, f"{name}/{MODEL_MEMBER}"
+                    )
+            else:
+                logging.getLogger("app").warning(
+                    f"{name} has no {MODEL_MEMBER}; the model of a .pbix is stored "
+                    "compressed, save it as a .pbit template to analyze the model"
+                )
+
+            layout = None
+            if LAYOUT_MEMBER in members:
+                with archive.open(LAYOUT_MEMBER) as member:
+                    layout = self.read_layout(member)
+
+        if text is None and layout is None:
+            raise ValueError(f"No model or report layout found in {name}")
+        if semantic_model is None:
+            # A report without its model still needs the layout compared
+            # between runs, so it gets an empty model to carry it
+            semantic_model = SemanticModel(name=os.path.splitext(name)[0])
+        # Kept with the model for task slicing and incremental analysis
+        semantic_model.report = layout
+
+        if layout is None:
+            content = text
+        elif text is None:
+            content = json.dumps(
+                {"name": os.path.splitext(name)[0], "report": layout},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        else:
+            content = (
+                text[:-1]
+                + ',"report":'
+                + json.dumps(layout, ensure_ascii=False, separators=(",", ":"))
+                + "}"
+            )
+        return semantic_model, content, report
+
+    def read_layout(self, file):
+        """Summarise a Report/Layout member into pages and their visuals."""
+        stream = JsonTextStream(file, settings.BIM_READ_CHUNK_SIZE)
+        pages = []
+        size = 0
+        omitted = 0
+        for key in stream.keys():
+            if key != "sections" or stream.peek() != "[":
+                stream.value()
+                continue
+
+            for section in stream.items():
+                page = {"name": section.get("displayName") or section.get("name")}
+                visuals = []
+                for container in section.get("visualContainers", []):
+                    visual = summarize_visual(container)
+                    visual_size = len(json.dumps(visual, ensure_ascii=False))
+                    if omitted or size + visual_size > self.max_layout_chars:
+                        omitted += 1
+                        continue
+                    visuals.append(visual)
+                    size += visual_size
+                if visuals:
+                    page["visuals"] = visuals
+                pages.append(page)
+
+        layout = {"pages": pages}
+        if omitted:
+            layout["omittedVisuals"] = omitted
+            logging.getLogger("app").info(
+                f"Report layout over {self.max_layout_chars} characters, "
+                f"{omitted} visuals left out"
+            )
+        return layout
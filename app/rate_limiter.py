@@ -0,0 +1,178 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import openai
+
+from app import settings
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        # Requests bigger than the whole budget only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Keeps requests under per-model requests- and tokens-per-minute budgets.
+
+    acquire() blocks the calling worker until both budgets have room, so
+    concurrent tasks queue up instead of tripping the API's rate limits.
+    """
+
+    def __init__(self, limits=None):
+        # model -> (requests per minute, tokens per minute)
+        self.limits = settings.RATE_LIMITS if limits is None else limits
+        self._condition = threading.Condition()
+        self._buckets = {}
+        self._paused_until = {}
+
+    def acquire(self, model, tokens):
+        with self._condition:
+            requests_bucket, tokens_bucket = self._get_buckets(model)
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until.get(model, 0.0) - now,
+                    requests_bucket.wait_time(1, now),
+                    tokens_bucket.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    requests_bucket.take(1)
+                    tokens_bucket.take(tokens)
+                    return
+                self._condition.wait(wait)
+
+    def pause(self, model, seconds):
+        """Hold back every request for a model, e.g. after a 429 with Retry-After."""
+        with self._condition:
+            until = time.monotonic() + seconds
+            self._paused_until[model] = max(self._paused_until.get(model, 0.0), until)
+            self._condition.notify_all()
+
+    def _get_buckets(self, model):
+        if model not in self._buckets:
+            requests_per_minute, tokens_per_minute = self.limits.get(
+                model, self.limits.get("default", (500, 200000))
+            )
+            self._buckets[model] = (
+                TokenBucket(requests_per_minute),
+                TokenBucket(tokens_per_minute),
+            )
+        return self._buckets[model]
+
+
+class RequestScheduler:
+    """Runs API requests under the rate limiter, retrying transient failures.
+
+    Rate limits (429), server errors (5xx), timeouts and connection errors are
+    retried with full-jitter exponential backoff, honouring Retry-After.
+    """
+
+    RETRYABLE_ERRORS = (
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+    )
+
+    def __init__(
+        self, rate_limiter=None, max_retries=None, base_delay=None, max_concurrent=None
+    ):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Optional global cap on requests in flight, shared by every caller
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        )
+        self.max_retries = (
+            settings.API_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.base_delay = (
+            settings.API_RETRY_BASE_DELAY if base_delay is None else base_delay
+        )
+        self.max_delay = 60.0
+
+    def run(self, model, tokens, request):
+        """Call request() once budget allows, retrying transient errors."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(model, tokens)
+            try:
+                if self._slots is None:
+                    return request()
+                with self._slots:
+                    return request()
+            except self.RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = random.uniform(
+                        0, min(self.max_delay, self.base_delay * 2**attempt)
+                    )
+
+                attempt += 1
+                logging.getLogger("app").warning(
+                    f"{type(e).__name__} from {model}, retry {attempt}/"
+                    f"{self.max_retries} in {delay:.1f} s"
+                )
+                if isinstance(e, openai.RateLimitError):
+                    # The whole model is over its limit, so hold back every
+                    # queued request; acquire() waits out the pause
+                    self.rate_limiter.pause(model, delay)
+                else:
+                    time.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(error):
+        # Exhausted quota is reported as a 429 too, but waiting won't fix it
+        return getattr(error, "code", None) != "insufficient_quota"
+
+    @staticmethod
+    def _retry_after(error):
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+
+        headers = response.headers
+        value = headers.get("retry-after-ms")
+        if value:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0.0)
@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from app import settings
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of AI responses with LRU eviction.
+
+    Entries are stored as one Markdown file per key. Recency is tracked through
+    the file modification time, so the LRU order survives restarts.
+    """
+
+    FILE_SUFFIX = ".md"
+
+    def __init__(self, cache_dir=None, max_bytes=None, enabled=None):
+        self.cache_dir = cache_dir or settings.RESPONSE_CACHE_DIR
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.RESPONSE_CACHE_MAX_BYTES
+        )
+        self.enabled = settings.RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._index = None  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+
+    @staticmethod
+    def content_hash(content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(content_hash, task, format_suffix, model):
+        """Build a cache key from a content hash and the prompt that produced it."""
+        digest = hashlib.sha256()
+        for part in (content_hash, task, format_suffix, model):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    value = file.read()
+                os.utime(path)
+            except OSError:
+                self._forget(key)
+                return None
+
+            self._index.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if not self.enabled or not value:
+            return
+
+        data = value.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._load_index()
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.getLogger("app").warning(f"Failed to write cache entry: {e}")
+                return
+
+            self._forget(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._load_index()
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                self._remove(key)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.FILE_SUFFIX):
+                stat = entry.stat()
+                key = entry.name[: -len(self.FILE_SUFFIX)]
+                entries.append((stat.st_mtime, key, stat.st_size))
+
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            self._remove(key)
+
+    def _forget(self, key):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _remove(self, key):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.getLogger("app").warning(f"Failed to remove cache entry: {e}")
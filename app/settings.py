@@ -0,0 +1,121 @@
+import os
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name):
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Analysis execution
+CONCURRENT_ANALYSIS = _env_bool("ANALYSIS_CONCURRENT", True)
+ANALYSIS_MAX_WORKERS = _env_int("ANALYSIS_MAX_WORKERS", 4)
+
+# Response cache
+RESPONSE_CACHE_ENABLED = _env_bool("RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_DIR = os.getenv(
+    "RESPONSE_CACHE_DIR", os.path.join(os.getcwd(), "storage", "cache", "responses")
+)
+RESPONSE_CACHE_MAX_BYTES = _env_int("RESPONSE_CACHE_MAX_BYTES", 100 * 1024 * 1024)
+
+# .bim pruning
+BIM_PRUNE_ENABLED = _env_bool("BIM_PRUNE_ENABLED", True)
+# Comma-separated property names; unset keeps the defaults in app/bim_pruner.py
+BIM_PRUNE_PROPERTIES = _env_list("BIM_PRUNE_PROPERTIES")
+
+# Send each task only the slice of the model it needs (see app/task_context.py)
+TASK_CONTEXT_SLICING = _env_bool("TASK_CONTEXT_SLICING", True)
+
+# Map-reduce chunking for models over the prompt token budget
+CHUNKING_ENABLED = _env_bool("CHUNKING_ENABLED", True)
+CHUNK_TOKEN_BUDGET = _env_int("CHUNK_TOKEN_BUDGET", 60000)
+
+# Stream responses into the analysis tabs as they are generated
+STREAMING_ENABLED = _env_bool("STREAMING_ENABLED", True)
+STREAM_RENDER_INTERVAL_MS = _env_int("STREAM_RENDER_INTERVAL_MS", 300)
+
+# Shared HTTP connection pool for the OpenAI client
+HTTP_MAX_CONNECTIONS = _env_int("HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)
+HTTP_KEEPALIVE_EXPIRY = _env_int("HTTP_KEEPALIVE_EXPIRY", 120)
+HTTP_TIMEOUT = _env_int("HTTP_TIMEOUT", 600)
+
+# Per-model (requests per minute, tokens per minute) budgets, overridable as
+# RATE_LIMITS="gpt-4o=500:30000,o1=500:30000"
+RATE_LIMITS = {
+    "default": (500, 200000),
+    "gpt-4o-mini": (500, 200000),
+    "gpt-4o": (500, 30000),
+    "o3-mini": (500, 200000),
+    "o1": (500, 30000),
+}
+for _entry in _env_list("RATE_LIMITS") or []:
+    try:
+        _model, _limits = _entry.split("=")
+        _rpm, _tpm = _limits.split(":")
+        RATE_LIMITS[_model.strip()] = (int(_rpm), int(_tpm))
+    except ValueError:
+        pass
+# Completion tokens reserved against the tokens-per-minute budget per request
+RATE_LIMIT_OUTPUT_TOKENS = _env_int("RATE_LIMIT_OUTPUT_TOKENS", 4000)
+API_MAX_RETRIES = _env_int("API_MAX_RETRIES", 5)
+API_RETRY_BASE_DELAY = _env_float("API_RETRY_BASE_DELAY", 1.0)
+
+# Local rule engines (app/local_checks.py) run before the AI requests
+LOCAL_CHECKS_ENABLED = _env_bool("LOCAL_CHECKS_ENABLED", True)
+# Comma-separated tasks answered by the local checks alone, skipping the AI
+LOCAL_ONLY_TASKS = _env_list("LOCAL_ONLY_TASKS") or []
+
+# Re-run only the tasks whose part of the model changed since the last run
+INCREMENTAL_ANALYSIS = _env_bool("INCREMENTAL_ANALYSIS", True)
+
+# Ask for all reports in one request instead of one request per task
+MULTI_REPORT_ENABLED = _env_bool("MULTI_REPORT_ENABLED", False)
+
+# Bytes read at a time when streaming .bim files into the parsed model
+BIM_READ_CHUNK_SIZE = _env_int("BIM_READ_CHUNK_SIZE", 1024 * 1024)
+
+# Characters of .pbix / .pbit report layout summary sent for analysis; the
+# summary is cut off at whole visuals
+REPORT_LAYOUT_MAX_CHARS = _env_int("REPORT_LAYOUT_MAX_CHARS", 100000)
+
+# Rendered HTML pages kept in memory, keyed by a hash of their Markdown
+HTML_CACHE_ENTRIES = _env_int("HTML_CACHE_ENTRIES", 64)
+
+# PDF export engine: "xhtml2pdf" (HTML and CSS layout) or "fpdf2" (draws the
+# Markdown directly, much faster for long reports)
+PDF_ENGINE = os.getenv("PDF_ENGINE", "xhtml2pdf").strip().lower()
+
+# Export jobs written at the same time, e.g. by "Download All" in every format
+EXPORT_MAX_WORKERS = _env_int("EXPORT_MAX_WORKERS", 3)
+
+# Parsed Markdown documents kept in memory, shared by the viewer and exporters
+MARKDOWN_CACHE_ENTRIES = _env_int("MARKDOWN_CACHE_ENTRIES", 32)
+
+# Per-run timings and token usage, written as JSON files to TELEMETRY_DIR
+TELEMETRY_ENABLED = _env_bool("TELEMETRY_ENABLED", True)
+TELEMETRY_DIR = os.getenv(
+    "TELEMETRY_DIR", os.path.join(os.getcwd(), "storage", "telemetry")
+)
@@ -0,0 +1,185 @@
+import json
+
+from app.bim_model import Table
+
+ALL_FIELDS = "*"
+
+# Which parts of the parsed model each analysis task receives. A selector of
+# None sends the whole (pruned) file. Otherwise each section maps to the TMSL
+# property names to keep, or ALL_FIELDS. "calculated_columns" selects only
+# calculated columns; "tables" keeps table-level properties for every table,
+# while without it only tables contributing selected objects are included.
+# "report" adds the report layout summary of .pbix / .pbit files.
+TASK_CONTEXT = {
+    "general": None,
+    "model": {
+        "scope": "Tables, columns, relationships and hierarchies of the model",
+        "tables": ("name", "description", "dataCategory", "isHidden"),
+        "columns": (
+            "name",
+            "dataType",
+            "type",
+            "isKey",
+            "isHidden",
+            "sortByColumn",
+            "summarizeBy",
+            "dataCategory",
+        ),
+        "hierarchies": ALL_FIELDS,
+        "relationships": ALL_FIELDS,
+    },
+    "dax": {
+        "scope": "Measures and calculated columns of the model",
+        "calculated_columns": ("name", "dataType", "expression"),
+        "measures": ("name", "expression", "displayFolder"),
+        "calculated_tables": ALL_FIELDS,
+    },
+    "dictionary": {
+        "scope": "Names, data types and descriptions of the model objects",
+        "tables": ("name", "description", "isHidden"),
+        "columns": ("name", "dataType", "type", "description", "expression"),
+        "measures": ("name", "description", "expression", "displayFolder"),
+    },
+    "performance": {
+        "scope": "Columns, calculations, relationships and storage modes of the model",
+        "tables": ("name",),
+        "columns": (
+            "name",
+            "dataType",
+            "type",
+            "expression",
+            "isKey",
+            "summarizeBy",
+        ),
+        "measures": ("name", "expression"),
+        "partitions": ("name", "mode", "source"),
+        "relationships": ALL_FIELDS,
+    },
+    "missing": {
+        "scope": "Tables, columns, measures and relationships of the model",
+        "tables": ("name", "description", "isHidden"),
+        "columns": ("name", "dataType", "type", "isHidden", "isKey"),
+        "measures": ("name", "expression"),
+        "relationships": ALL_FIELDS,
+    },
+    "report_ideas": {
+        "scope": "Business-facing tables, fields, measures and hierarchies",
+        "tables": ("name", "description"),
+        "columns": ("name", "dataType", "description", "dataCategory"),
+        "measures": ("name", "description", "displayFolder"),
+        "hierarchies": ("name", "levels"),
+        "report": ALL_FIELDS,
+    },
+    "analysis_ideas": {
+        "scope": "Business-facing tables, fields, measures and relationships",
+        "tables": ("name", "description"),
+        "columns": ("name", "dataType", "description", "dataCategory"),
+        "measures": ("name", "description", "expression"),
+        "relationships": ("fromTable", "fromColumn", "toTable", "toColumn"),
+        "report": ALL_FIELDS,
+    },
+}
+
+
+def _pick(data, fields):
+    if fields == ALL_FIELDS:
+        return dict(data)
+    return {field: data[field] for field in fields if field in data}
+
+
+class ContextSlicer:
+    """Renders per-task slices of a SemanticModel as compact JSON."""
+
+    def __init__(self, model, selectors=None):
+        self.model = model
+        self.selectors = TASK_CONTEXT if selectors is None else selectors
+        self._dicts = {}
+
+    def render(self, task_name):
+        """Return the JSON slice for a task, or None when it needs the full file."""
+        selector = self.selectors.get(task_name)
+        if selector is None:
+            return None
+        return json.dumps(
+            self.select(selector), ensure_ascii=False, separators=(",", ":")
+        )
+
+    def select(self, selector):
+        model = self.model
+        result = {}
+        if selector.get("scope"):
+            result["scope"] = selector["scope"]
+        result["name"] = model.name
+
+        tables = []
+        for table in model.tables:
+            entry = self._select_table(table, selector)
+            if entry is not None:
+                tables.append(entry)
+        if tables:
+            result["tables"] = tables
+
+        for section, objects in (
+            ("relationships", model.relationships),
+            ("roles", model.roles),
+            ("perspectives", model.perspectives),
+        ):
+            fields = selector.get(section)
+            if fields and objects:
+                result[section] = [self._pick(item, fields) for item in objects]
+
+        if selector.get("report") and model.report is not None:
+            result["report"] = model.report
+        return result
+
+    def _select_table(self, table, selector):
+        children = {}
+
+        columns = selector.get("columns")
+        calculated_columns = selector.get("calculated_columns")
+        if columns:
+            children["columns"] = [self._pick(c, columns) for c in table.columns]
+        elif calculated_columns:
+            children["columns"] = [
+                self._pick(c, calculated_columns)
+                for c in table.columns
+                if c.is_calculated
+            ]
+
+        for section, objects in (
+            ("measures", table.measures),
+            ("hierarchies", table.hierarchies),
+            ("partitions", table.partitions),
+        ):
+            fields = selector.get(section)
+            if fields:
+                children[section] = [self._pick(item, fields) for item in objects]
+
+        calculated_tables = selector.get("calculated_tables")
+        if calculated_tables and "partitions" not in children:
+            children["partitions"] = [
+                self._pick(p, calculated_tables)
+                for p in table.partitions
+                if p.source_type == "calculated"
+            ]
+
+        children = {key: value for key, value in children.items() if value}
+        table_fields = selector.get("tables")
+        if not children and not table_fields:
+            return None
+
+        entry = self._pick(table, table_fields or ("name",))
+        entry.update(children)
+        return entry
+
+    def _pick(self, item, fields):
+        # to_dict() is shared across the tasks, so serialise each object once
+        key = id(item)
+        data = self._dicts.get(key)
+        if data is None:
+            if isinstance(item, Table):
+                data = item.to_dict(include_children=False)
+            else:
+                data = item.to_dict()
+            self._dicts[key] = data
+        return _pick(data, fields)
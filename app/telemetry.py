@@ -0,0 +1,345 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app import settings
+
+# Source of a request made for several tasks at once, e.g. the multi-report
+# request; kept apart from the tasks so they aren't counted twice
+BATCH = "batch"
+
+
+class RequestRecord:
+    """Timings and usage of one chat completion request."""
+
+    __slots__ = (
+        "task",
+        "model",
+        "streamed",
+        "bytes_sent",
+        "queued_at",
+        "sent_at",
+        "first_token_at",
+        "finished_at",
+        "attempts",
+        "prompt_tokens",
+        "completion_tokens",
+        "cached_tokens",
+        "status",
+    )
+
+    def __init__(self, task, model, streamed, bytes_sent, queued_at):
+        self.task = task
+        self.model = model
+        self.streamed = streamed
+        self.bytes_sent = bytes_sent
+        self.queued_at = queued_at
+        self.sent_at = None
+        self.first_token_at = None
+        self.finished_at = None
+        self.attempts = 0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.cached_tokens = None
+        self.status = "ok"
+
+    def start_attempt(self):
+        self.attempts += 1
+        self.sent_at = time.perf_counter()
+        self.first_token_at = None
+
+    def first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def set_usage(self, usage):
+        if usage is None:
+            return
+        self.prompt_tokens = usage.prompt_tokens
+        self.completion_tokens = usage.completion_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    @property
+    def queue_wait(self):
+        """Seconds from being queued to sending the last attempt: pool,
+        rate limiter and concurrency cap waits, and any retries."""
+        return (self.sent_at or self.finished_at) - self.queued_at
+
+    @property
+    def latency(self):
+        return self.finished_at - self.sent_at if self.sent_at else None
+
+    @property
+    def ttft(self):
+        return self.first_token_at - self.sent_at if self.first_token_at else None
+
+    def to_dict(self):
+        return {
+            "task": self.task,
+            "model": self.model,
+            "status": self.status,
+            "streamed": self.streamed,
+            "attempts": self.attempts,
+            "queue_wait_s": _round(self.queue_wait),
+            "latency_s": _round(self.latency),
+            "ttft_s": _round(self.ttft),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+class TaskContext:
+    """The run and task that requests made in the current context belong to."""
+
+    __slots__ = ("run", "task", "queued_at", "status")
+
+    def __init__(self, run, task, queued_at=None):
+        self.run = run
+        self.task = task
+        # Set when the work was queued on a pool, taken by its first request
+        self.queued_at = queued_at
+        self.status = "ok"
+
+
+_context = contextvars.ContextVar("telemetry_task", default=None)
+
+
+def current():
+    return _context.get()
+
+
+def take_queued_at():
+    """When the current work was queued on a pool, once; None otherwise."""
+    context = _context.get()
+    if context is None or context.queued_at is None:
+        return None
+    queued_at, context.queued_at = context.queued_at, None
+    return queued_at
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit() that keeps the current task and times the pool wait."""
+    context = contextvars.copy_context()
+    return executor.submit(
+        context.run, _run_queued, time.perf_counter(), fn, args, kwargs
+    )
+
+
+def _run_queued(queued_at, fn, args, kwargs):
+    parent = _context.get()
+    _context.set(TaskContext(parent and parent.run, parent and parent.task, queued_at))
+    return fn(*args, **kwargs)
+
+
+@contextmanager
+def task(run, name, source="ai"):
+    """Attribute the requests made inside the block to a task of the run.
+
+    source is BATCH for a request answering several tasks.
+    """
+    queued_at = take_queued_at()
+    started = time.perf_counter()
+    context = TaskContext(run, name)
+    token = _context.set(context)
+    try:
+        yield context
+    finally:
+        _context.reset(token)
+        if run is not None:
+            run.add_task(
+                name,
+                source,
+                status=context.status,
+                queue_wait=started - queued_at if queued_at else 0.0,
+                duration=time.perf_counter() - started,
+            )
+
+
+def record_request(record):
+    """Log a finished request and add it to the current run, if any."""
+    logging.getLogger("app").info(
+        f"Request telemetry {json.dumps(record.to_dict(), sort_keys=True)}"
+    )
+    context = _context.get()
+    if context is not None and context.run is not None:
+        context.run.add_request(record)
+
+
+class TelemetryRun:
+    """Where the time and tokens of one process_file run went.
+
+    Tasks answered without a request (response cache, incremental reuse,
+    local checks) are recorded with their source so the summary shows
+    them too. finish() logs the summary and writes it, with every request,
+    to a JSON file in TELEMETRY_DIR.
+    """
+
+    def __init__(self, file_path, model, directory=None, enabled=None):
+        self.file_path = file_path
+        self.model = model
+        self.directory = directory or settings.TELEMETRY_DIR
+        self.enabled = settings.TELEMETRY_ENABLED if enabled is None else enabled
+        self.created = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.started = time.perf_counter()
+        self.prepare_seconds = 0.0
+        self.duration = None
+        self.tasks = {}
+        self.requests = []
+        self.path = None
+        self._lock = threading.Lock()
+
+    def prepared(self):
+        """Mark the end of reading, parsing and local checks."""
+        self.prepare_seconds = time.perf_counter() - self.started
+
+    def add_task(self, name, source, status="ok", queue_wait=0.0, duration=0.0):
+        with self._lock:
+            self.tasks[name] = {
+                "source": source,
+                "status": status,
+                "queue_wait_s": round(queue_wait, 3),
+                "duration_s": round(duration, 3),
+            }
+
+    def add_request(self, record):
+        with self._lock:
+            self.requests.append(record)
+
+    def summary(self):
+        with self._lock:
+            requests = list(self.requests)
+            tasks = {name: dict(task) for name, task in self.tasks.items()}
+
+        def total(values):
+            return sum(value for value in values if value is not None)
+
+        batches = {
+            name: tasks.pop(name)
+            for name, entry in list(tasks.items())
+            if entry["source"] == BATCH
+        }
+        for name, entry in (*tasks.items(), *batches.items()):
+            own = [record for record in requests if record.task == name]
+            entry.update(
+                requests=len(own),
+                prompt_tokens=total(record.prompt_tokens for record in own),
+                completion_tokens=total(record.completion_tokens for record in own),
+                cached_tokens=total(record.cached_tokens for record in own),
+                bytes_sent=total(record.bytes_sent for record in own),
+            )
+        first_tokens = [record.ttft for record in requests if record.ttft is not None]
+        duration = (
+            self.duration
+            if self.duration is not None
+            else time.perf_counter() - self.started
+        )
+        return {
+            "file": self.file_path,
+            "model": self.model,
+            "created": self.created,
+            "duration_s": round(duration, 3),
+            "prepare_s": round(self.prepare_seconds, 3),
+            "requests": len(requests),
+            "failed_requests": sum(record.status != "ok" for record in requests),
+            "retries": total(max(record.attempts - 1, 0) for record in requests),
+            "queue_wait_s": round(total(record.queue_wait for record in requests), 3),
+            "latency_s": round(total(record.latency for record in requests), 3),
+            "mean_ttft_s": (
+                round(sum(first_tokens) / len(first_tokens), 3)
+                if first_tokens
+                else None
+            ),
+            "prompt_tokens": total(record.prompt_tokens for record in requests),
+            "completion_tokens": total(record.completion_tokens for record in requests),
+            "cached_tokens": total(record.cached_tokens for record in requests),
+            "bytes_sent": total(record.bytes_sent for record in requests),
+            "tasks": tasks,
+            "batches": batches,
+        }
+
+    def summary_text(self):
+        """Two compact lines for the analysis view."""
+        summary = self.summary()
+        reused = {}
+        for task in summary["tasks"].values():
+            if task["source"] != "ai":
+                reused[task["source"]] = reused.get(task["source"], 0) + 1
+        first_line = (
+            f"{summary['duration_s']:.1f} s total, {summary['prepare_s']:.1f} s "
+            f"reading · {summary['requests']} requests"
+        )
+        if summary["retries"]:
+            first_line += f" ({summary['retries']} retries)"
+        first_line += (
+            f" · queued {summary['queue_wait_s']:.1f} s · "
+            f"in flight {summary['latency_s']:.1f} s"
+        )
+        if summary["mean_ttft_s"] is not None:
+            first_line += f" · first token {summary['mean_ttft_s']:.1f} s avg"
+        if reused:
+            first_line += " · " + ", ".join(
+                f"{count} from {source}" for source, count in sorted(reused.items())
+            )
+
+        slowest = sorted(
+            (
+                (task["duration_s"], name)
+                for name, task in summary["tasks"].items()
+                if task["source"] == "ai"
+            ),
+            reverse=True,
+        )[:3]
+        second_line = (
+            f"Tokens: {summary['prompt_tokens']:,} in "
+            f"({summary['cached_tokens']:,} cached), "
+            f"{summary['completion_tokens']:,} out · "
+            f"{summary['bytes_sent'] / 1024:,.0f} KB sent"
+        )
+        if slowest:
+            second_line += " · slowest: " + ", ".join(
+                f"{name.replace('_', ' ')} {seconds:.1f} s" for seconds, name in slowest
+            )
+        return f"{first_line}\n{second_line}"
+
+    def finish(self):
+        """Log the summary and write the run file; returns its path."""
+        self.duration = time.perf_counter() - self.started
+        summary = self.summary()
+        logging.getLogger("app").info(
+            "Run telemetry "
+            + json.dumps(
+                {key: value for key, value in summary.items() if key != "tasks"},
+                sort_keys=True,
+            )
+        )
+        if not self.enabled:
+            return None
+
+        summary["request_log"] = [record.to_dict() for record in self.requests]
+        name = os.path.splitext(os.path.basename(self.file_path))[0]
+        # Runs of the same file can finish within a second of each other
+        path = os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:8]}.json",
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            logging.getLogger("app").warning(f"Could not write telemetry: {e}")
+            return None
+        self.path = path
+        return path
@@ -0,0 +1,8 @@
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate LLM tokens in text (~4 characters per token for JSON and English)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
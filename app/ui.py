@@ -2,13 +2,15 @@ from threading import Thread
 from queue import Queue, Empty
 import logging
 import os
-import markdown2
 import customtkinter as ctk
 from PIL import Image
 from tkinter import BooleanVar, messagebox, StringVar
 from tkinterweb import HtmlFrame
 from tkinterdnd2 import TkinterDnD, DND_FILES
+from app import settings
 from app.controller import Controller
+from app.export_jobs import ExportManager
+from app.html_renderer import HtmlRenderer
 
 
 COLORS = {
@@ -36,12 +38,19 @@ class GUI:
         self.root = None
         self.controller = controller or Controller()
         self.current_model = None
+        self.use_cache = None
 
         # UI Elements
         self.upload_frame = None
         self.analysis_frame = None
         self.tabview = None
         self.html_frames = {}
+        self.renderer = HtmlRenderer()
+        self.pending_renders = {}
+        self.render_poll_scheduled = False
+        self.exports = ExportManager(self.controller.file_handler)
+        self.export_results = []
+        self.export_poll_scheduled = False
 
         # State variables
         self.analysis_shown = None
@@ -141,6 +150,18 @@ class GUI:
         )
         model_selector.pack(side="left")
 
+        self.use_cache = BooleanVar(value=True)
+
+        ctk.CTkCheckBox(
+            model_frame,
+            text="Use cached results",
+            variable=self.use_cache,
+            font=(self.poppins_font.actual("family"), 12),
+            text_color=COLORS["black"],
+            fg_color=COLORS["primary"],
+            hover_color=COLORS["helper"],
+        ).pack(side="left", padx=(10, 0))
+
         # Create a container frame for centered elements
         center_frame = ctk.CTkFrame(
             self.upload_frame, fg_color="transparent", corner_radius=0
@@ -149,7 +170,7 @@ class GUI:
 
         ctk.CTkLabel(
             center_frame,
-            text="Drag and drop your .bim file here or use the button below:",
+            text="Drag and drop your .bim, .pbit or .pbix file here or use the button below:",
             text_color=COLORS["black"],
             fg_color="transparent",
             font=self.poppins_font,
@@ -223,6 +244,35 @@ class GUI:
         )
         download_frame.pack(side="right", padx=(0, 10))
 
+        # Export progress, shown while export jobs are running
+        self.export_frame = ctk.CTkFrame(
+            header, fg_color=COLORS["primary-dark"], corner_radius=0
+        )
+        self.export_label = ctk.CTkLabel(
+            self.export_frame,
+            text="",
+            text_color=COLORS["secondary"],
+            font=(self.poppins_font.actual("family"), 12),
+        )
+        self.export_label.pack(side="left", padx=(0, 5))
+        self.export_progress = ctk.CTkProgressBar(
+            self.export_frame,
+            width=120,
+            mode="indeterminate",
+            progress_color=COLORS["primary"],
+        )
+        self.export_progress.pack(side="left", padx=(0, 5))
+        ctk.CTkButton(
+            self.export_frame,
+            text="Cancel",
+            width=60,
+            command=self._cancel_exports,
+            font=(self.poppins_font.actual("family"), 12, "bold"),
+            fg_color=COLORS["warning"],
+            text_color=COLORS["white"],
+            hover_color=COLORS["helper"],
+        ).pack(side="left")
+
         self.download_button = ctk.CTkButton(
             download_frame,
             text="Download",
@@ -249,6 +299,19 @@ class GUI:
 
         header.pack(fill="x", pady=(0, 10))
 
+        # Where the time and tokens of the last run went, shown once it's done
+        self.telemetry_label = ctk.CTkLabel(
+            self.analysis_frame,
+            text="",
+            text_color=COLORS["secondary"],
+            font=(self.poppins_font.actual("family"), 11),
+            fg_color=COLORS["dark-card"],
+            justify="left",
+            anchor="w",
+            padx=8,
+            pady=4,
+        )
+
         self._setup_tabs(self.analysis_frame)
 
     def _on_model_change(self, new_model: str):
@@ -324,64 +387,35 @@ class GUI:
         if not analysis:
             return
 
-        css_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), "assets", "css", "analysis.css"
-        )
-
-        # with open(css_path, "r", encoding="utf-8") as css_file:
-        #     custom_css = f"<style>{css_file.read()}</style>"
-
-        # html_body = markdown2.markdown(
-        #     analysis, extras=["fenced-code-blocks", "tables", "break-on-newline"]
-        # )
-        # html_content = custom_css + "<body>" + html_body + "</body>"
-
-        # widget.load_html(html_content)
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <link rel="preconnect" href="https://fonts.googleapis.com">
-            <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-            <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800&display=swap" rel="stylesheet">
-            <style>
-                {open(css_path, "r", encoding="utf-8").read()}
-            </style>
-            <script>
-            // Force wait for fonts to load
-            document.addEventListener('DOMContentLoaded', function() {{
-                setTimeout(function() {{
-                    document.body.style.opacity = '1';
-                }}, 200);
-            }});
-        </script>
-        </head>
-        <body>
-            {
-            markdown2.markdown(
-                analysis,
-                extras=[
-                    "fenced-code-blocks",
-                    "tables",
-                    "break-on-newline",
-                    "code-friendly",
-                    "numbering",
-                    "cuddled-lists",
-                    "code-color",
-                ],
-            )
-        }
-        </body>
-        </html>
-        """
+        # Markdown is converted on the renderer's worker thread; a newer
+        # render for the same tab replaces one still in progress
+        self.pending_renders[widget] = self.renderer.render_async(analysis)
+        if not self.render_poll_scheduled:
+            self.render_poll_scheduled = True
+            self.root.after(20, self._load_rendered_pages)
+
+    def _load_rendered_pages(self):
+        """Load finished renders into their tabs, on the Tk main thread."""
+        self.render_poll_scheduled = False
+        for widget, future in list(self.pending_renders.items()):
+            if not future.done():
+                continue
+            del self.pending_renders[widget]
+            try:
+                widget.load_html(future.result())
+            except Exception as e:
+                logging.getLogger("app").error(f"Failed to render analysis: {e}")
 
-        widget.load_html(html_content)
+        if self.pending_renders:
+            self.render_poll_scheduled = True
+            self.root.after(20, self._load_rendered_pages)
 
     def reset_interface(self):
         # Clear and hide analysis section
+        self.pending_renders.clear()
         for html_frame in self.html_frames.values():
             html_frame.load_html("")
+        self.telemetry_label.pack_forget()
         self.analysis_frame.pack_forget()
 
         # Show upload section again
@@ -398,23 +432,33 @@ class GUI:
 
         for html_frame in self.html_frames.values():
             html_frame.load_html("<p>Analyzing file... Please wait...</p>")
+        self.telemetry_label.pack_forget()
         self.root.update()
 
         self.result_queue = Queue()
         analysis_thread = Thread(
-            target=self._run_analysis, args=(file_path, self.result_queue), daemon=True
+            target=self._run_analysis,
+            args=(file_path, self.result_queue, not self.use_cache.get()),
+            daemon=True,
         )
         analysis_thread.start()
 
         # Store the analysis results for later use (e.g., downloading)
         self.analysis_results = {}
+        self.partial_results = {}
+        self.partial_render_scheduled = False
 
         self._check_results()
 
-    def _run_analysis(self, file_path, queue):
-        """Run analysis in a separate thread"""
+    def _run_analysis(self, file_path, queue, refresh_cache=False):
+        """Run analysis in a separate thread; results arrive in completion order"""
         task_generator = self.controller.process_file(
-            file_path, self.current_model.get()
+            file_path,
+            self.current_model.get(),
+            refresh_cache=refresh_cache,
+            on_progress=lambda task_name, text: queue.put(
+                ("partial", (task_name, text))
+            ),
         )
         if task_generator:
             try:
@@ -440,6 +484,19 @@ class GUI:
 
                 self.root.after(10, self._check_results)
 
+            elif message_type == "partial":
+                task_name, partial_result = data
+                if task_name not in self.analysis_results:
+                    self.partial_results[task_name] = partial_result
+                    if not self.partial_render_scheduled:
+                        self.partial_render_scheduled = True
+                        self.root.after(
+                            settings.STREAM_RENDER_INTERVAL_MS,
+                            self._render_partial_results,
+                        )
+
+                self.root.after(10, self._check_results)
+
             elif message_type == "error":
                 error_message = f"Analysis error: {data}"
                 logging.getLogger("app").error(error_message)
@@ -460,6 +517,7 @@ class GUI:
 
             elif message_type == "done":
                 self._check_all_tabs_ready()
+                self._show_telemetry()
 
         except Empty:
             self.root.after(100, self._check_results)
@@ -475,6 +533,24 @@ class GUI:
             for html_frame in self.html_frames.values():
                 html_frame.load_html(error_html)
 
+    def _show_telemetry(self):
+        """Show the timing and token summary of the run that just finished."""
+        run = self.controller.last_telemetry
+        if run is None or run.duration is None:
+            return
+        self.telemetry_label.configure(text=run.summary_text())
+        self.telemetry_label.pack(fill="x", pady=(0, 10), before=self.tabview)
+
+    def _render_partial_results(self):
+        """Re-render tabs with streamed content; throttled to limit HTML reloads."""
+        self.partial_render_scheduled = False
+        pending, self.partial_results = self.partial_results, {}
+
+        for task_name, partial_result in pending.items():
+            if task_name in self.analysis_results or task_name not in self.html_frames:
+                continue
+            self.display_analysis(partial_result, self.html_frames[task_name])
+
     def _check_all_tabs_ready(self):
         """Check if all tabs have content and show the download button if they do."""
         if not hasattr(self, "analysis_results"):
@@ -554,19 +630,14 @@ class GUI:
         content = self.analysis_results[task_name]
         file_prefix = current_tab.strip().replace(" ", "_").lower()
 
-        try:
-            self.controller.file_handler.save_analysis(
-                content, file_format, file_prefix
-            )
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        self._start_export(content, [file_format], file_prefix)
 
     def _show_download_all_options(self):
         """Show dropdown menu with file format options for downloading all tabs."""
 
         download_menu = ctk.CTkToplevel(self.root)
         download_menu.title("Choose Format")
-        download_menu.geometry("200x170")
+        download_menu.geometry("200x215")
         download_menu.resizable(False, False)
         download_menu.attributes("-topmost", True)
 
@@ -583,7 +654,12 @@ class GUI:
             font=(self.poppins_font.actual("family"), 14),
         ).pack(pady=(10, 5))
 
-        formats = [("PDF", "pdf"), ("Text File", "txt"), ("Word Document", "doc")]
+        formats = [
+            ("PDF", "pdf"),
+            ("Text File", "txt"),
+            ("Word Document", "doc"),
+            ("All Formats", "all"),
+        ]
 
         for label, format_type in formats:
             ctk.CTkButton(
@@ -599,7 +675,10 @@ class GUI:
             ).pack(fill="x", padx=10, pady=5)
 
     def _download_all_analyses(self, file_format, menu=None):
-        """Download all analyses combined into a single file."""
+        """Download all analyses combined into a single file per format.
+
+        "all" writes every format, in parallel.
+        """
         if menu:
             menu.destroy()
 
@@ -607,28 +686,64 @@ class GUI:
             messagebox.showerror("Error", "No analysis content available for download")
             return
 
-        combined_content = ""
-
-        task_display_names = {}
-        for task_name in self.controller.analysis_tasks().keys():
-            display_name = task_name.replace("_", " ").title()
-            task_display_names[task_name] = display_name
-
-        for task_name, display_name in task_display_names.items():
-            if task_name in self.analysis_results:
-                current_result = self.analysis_results[task_name]
+        combined_content = self.controller.combine_analyses(self.analysis_results)
+        formats = ["pdf", "txt", "doc"] if file_format == "all" else [file_format]
+
+        self._start_export(combined_content, formats, "all_analyses")
+
+    def _start_export(self, content, formats, file_prefix):
+        """Write the content on the export workers and show their progress."""
+        self.exports.submit(content, formats, file_prefix)
+        if not self.export_frame.winfo_ismapped():
+            self.export_frame.pack(side="right", padx=(0, 10))
+            self.export_progress.start()
+        self._update_export_progress()
+        if not self.export_poll_scheduled:
+            self.export_poll_scheduled = True
+            self.root.after(100, self._check_exports)
+
+    def _update_export_progress(self):
+        total = self.exports.batch_total
+        self.export_label.configure(
+            text=f"Exporting {min(self.exports.batch_done + 1, total)} of {total}..."
+        )
 
-                if not current_result.startswith("#"):
-                    combined_content += f"# {display_name}\n\n"
-                combined_content += current_result
-                combined_content += "\n\n\n---\n\n\n"
+    def _check_exports(self):
+        """Collect finished export jobs; report them once the batch is done."""
+        self.export_poll_scheduled = False
+        self.export_results.extend(self.exports.poll())
 
-        if combined_content.endswith("\n\n\n---\n\n\n"):
-            combined_content = combined_content[:-9]
+        if self.exports.active:
+            self._update_export_progress()
+            self.export_poll_scheduled = True
+            self.root.after(100, self._check_exports)
+            return
 
-        try:
-            self.controller.file_handler.save_analysis(
-                combined_content, file_format, "all_analyses"
-            )
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        self.export_progress.stop()
+        self.export_frame.pack_forget()
+        jobs, self.export_results = self.export_results, []
+
+        saved = [job.filename for job in jobs if job.status == "saved"]
+        errors = []
+        for job in jobs:
+            if job.status == "failed":
+                messages = [
+                    message
+                    for level, _title, message in job.messages
+                    if level == "error"
+                ]
+                errors.extend(messages or [f"Failed to save {job.file_format} file"])
+        cancelled = sum(job.status == "cancelled" for job in jobs)
+
+        if errors:
+            messagebox.showerror("Error", "\n\n".join(errors))
+        if saved:
+            files = "\n".join(saved)
+            label = "File" if len(saved) == 1 else "Files"
+            messagebox.showinfo("Success", f"{label} saved to\n{files}")
+        elif cancelled and not errors:
+            messagebox.showinfo("Cancelled", "Export cancelled")
+
+    def _cancel_exports(self):
+        self.exports.cancel()
+        self.export_label.configure(text="Cancelling...")
@@ -0,0 +1,65 @@
+"""Compare the old and new Word export on large reports.
+
+Usage: python benchmarks/docx_export.py [--scale N ...] [--repeat N]
+
+The example reports in assets/examples are repeated and padded with a
+wide table and long DAX code blocks, the parts of an analysis that are
+slowest to convert, to build inputs of a few thousand lines and up. Each
+input is exported with the previous converter (docx_legacy.py) and with
+FileHandler.save_as_doc.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.file_handler import FileHandler  # noqa: E402
+from docx_legacy import save_as_doc as legacy_save_as_doc  # noqa: E402
+from inputs import build_report  # noqa: E402
+
+CONVERTERS = (("old", legacy_save_as_doc), ("new", FileHandler.save_as_doc))
+
+
+def time_export(convert, content, filename, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if not convert(content, filename):
+            raise RuntimeError(f"Word export failed on {os.path.basename(filename)}")
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    FileHandler.interactive = False
+    out_dir = tempfile.mkdtemp(prefix="docx_bench_")
+    print(
+        f"{'scale':>5} {'lines':>7} {'old':>8} {'new':>8} {'speed-up':>9} "
+        f"{'lines/s':>9} {'size':>11}"
+    )
+    for scale in args.scale:
+        content = build_report(scale)
+        best = {}
+        for name, convert in CONVERTERS:
+            filename = os.path.join(out_dir, f"report_{scale}.{name}.docx")
+            best[name] = time_export(convert, content, filename, args.repeat)
+        lines = content.count("\n") + 1
+        print(
+            f"{scale:>5} {lines:>7,} {best['old']:>7.3f}s {best['new']:>7.3f}s "
+            f"{best['old'] / best['new']:>8.1f}x {lines / best['new']:>9,.0f} "
+            f"{os.path.getsize(filename):>10,}B"
+        )
+
+
+if __name__ == "__main__":
+    main()
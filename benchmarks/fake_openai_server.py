@@ -0,0 +1,375 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Usage:
+    python benchmarks/fake_openai_server.py [--port 8765] [--latency lognormal:0.8,0.4]
+        [--tokens-per-second 80] [--rate-limit-rate 0.1] [--error-rate 0.02]
+        [--max-concurrency 8] [--seed 1] [--response FILE ...]
+
+then start the app or cli.py with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=local
+
+Every request is answered with one of the canned Markdown responses
+(assets/examples/chat_response.md by default), streamed or not, after a
+time to first token drawn from --latency and at --tokens-per-second.
+Requests can fail with 429 (with Retry-After) or 500 at the given rates,
+and with 429 whenever more than --max-concurrency are in flight. Random
+choices come from --seed, so a run with the same requests in the same
+order sees the same latencies and errors. A repeated prompt reports its
+tokens as cached in the usage, like the API's prompt caching.
+GET /stats returns the request counters.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.tokens import CHARS_PER_TOKEN, estimate_tokens  # noqa: E402
+
+DEFAULT_RESPONSE = os.path.join(ROOT, "assets", "examples", "chat_response.md")
+# Prompt caching works in blocks of this many tokens
+CACHE_BLOCK_TOKENS = 128
+
+
+def parse_distribution(spec):
+    """Turn "fixed:0.5", "uniform:0.2,1", "normal:0.8,0.2", "lognormal:-0.3,0.5"
+    or "exponential:0.8" into a function drawing seconds from a Random."""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(value) for value in args.split(",")] if args else []
+        draw = {
+            "fixed": lambda rng: values[0],
+            "uniform": lambda rng: rng.uniform(values[0], values[1]),
+            "normal": lambda rng: rng.gauss(values[0], values[1]),
+            "lognormal": lambda rng: rng.lognormvariate(values[0], values[1]),
+            "exponential": lambda rng: rng.expovariate(1 / values[0]),
+        }[kind]
+        draw(random.Random(0))
+    except (KeyError, IndexError, ValueError, ZeroDivisionError):
+        raise ValueError(f"Invalid latency distribution: {spec}")
+    return lambda rng: max(draw(rng), 0.0)
+
+
+class FakeOpenAIServer:
+    """Serves canned chat completions with injected latency and errors.
+
+    start() runs it on a background thread and returns the base URL to give
+    the openai client, so benchmarks can use it in-process.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8765,
+        responses=None,
+        latency="fixed:0",
+        tokens_per_second=0,
+        rate_limit_rate=0.0,
+        error_rate=0.0,
+        retry_after=1.0,
+        max_concurrency=0,
+        seed=1,
+    ):
+        self.responses = []
+        for path in responses or [DEFAULT_RESPONSE]:
+            with open(path, "r", encoding="utf-8") as f:
+                self.responses.append(f.read())
+        self.latency = parse_distribution(latency)
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_prompts = set()
+        self.in_flight = 0
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "streamed": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "disconnected": 0,
+            "peak_concurrency": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+        self.httpd = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="fake-openai", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def begin(self, prompt):
+        """Decide how to answer one request: (error status, plan) under the lock,
+        so the random sequence only depends on the order of the requests."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            self.stats["peak_concurrency"] = max(
+                self.stats["peak_concurrency"], self.in_flight
+            )
+            if self.max_concurrency and self.in_flight > self.max_concurrency:
+                return 429, None
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                return 429, None
+            if roll < self.rate_limit_rate + self.error_rate:
+                return 500, None
+
+            prompt_tokens = estimate_tokens(prompt)
+            cached_tokens = 0
+            if prompt in self._seen_prompts:
+                cached_tokens = prompt_tokens // CACHE_BLOCK_TOKENS * CACHE_BLOCK_TOKENS
+            self._seen_prompts.add(prompt)
+            return None, {
+                "latency": self.latency(self.random),
+                "content": self.random.choice(self.responses),
+                "prompt_tokens": prompt_tokens,
+                "cached_tokens": cached_tokens,
+            }
+
+    def end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status, message, error_type, headers=None):
+        self.send_json(
+            status,
+            {"error": {"message": message, "type": error_type, "code": None}},
+            headers,
+        )
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.fake._lock:
+                stats = dict(self.fake.stats, in_flight=self.fake.in_flight)
+            self.send_json(200, stats)
+        elif self.path.rstrip("/") == "/v1/models":
+            self.send_json(200, {"object": "list", "data": []})
+        else:
+            self.send_error_json(404, f"Unknown path {self.path}", "invalid_request")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_error_json(400, "Body is not JSON", "invalid_request_error")
+            return
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self.send_error_json(404, f"Unknown path {self.path}", "invalid_request")
+            return
+
+        prompt = "".join(
+            str(message.get("content", "")) for message in request.get("messages", [])
+        )
+        status, plan = self.fake.begin(prompt)
+        try:
+            if status == 429:
+                self.fake.count("rate_limited")
+                self.send_error_json(
+                    429,
+                    "Rate limit reached",
+                    "rate_limit_exceeded",
+                    {"Retry-After": f"{self.fake.retry_after:g}"},
+                )
+            elif status == 500:
+                self.fake.count("server_errors")
+                self.send_error_json(500, "Injected server error", "server_error")
+            else:
+                self.complete(request, plan)
+        except (BrokenPipeError, ConnectionResetError):
+            self.fake.count("disconnected")
+            self.close_connection = True
+        finally:
+            self.fake.end()
+
+    def complete(self, request, plan):
+        time.sleep(plan["latency"])
+        content = plan["content"]
+        completion_tokens = estimate_tokens(content)
+        usage = {
+            "prompt_tokens": plan["prompt_tokens"],
+            "completion_tokens": completion_tokens,
+            "total_tokens": plan["prompt_tokens"] + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": plan["cached_tokens"]},
+        }
+        response = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+        }
+
+        if request.get("stream"):
+            self.stream(request, response, content, usage)
+        else:
+            if self.fake.tokens_per_second:
+                time.sleep(completion_tokens / self.fake.tokens_per_second)
+            response.update(
+                object="chat.completion",
+                choices=[
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                usage=usage,
+            )
+            self.send_json(200, response)
+        self.fake.count("completed")
+        self.fake.count("prompt_tokens", usage["prompt_tokens"])
+        self.fake.count("completion_tokens", completion_tokens)
+
+    def stream(self, request, response, content, usage):
+        self.fake.count("streamed")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # No length known up front; the end of the stream closes the connection
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, **extra):
+            chunk = dict(response, object="chat.completion.chunk", choices=choices)
+            chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        event([{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}])
+        # Roughly one token per event, paced at the configured throughput
+        delay = 1 / self.fake.tokens_per_second if self.fake.tokens_per_second else 0
+        for start in range(0, len(content), CHARS_PER_TOKEN):
+            event(
+                [
+                    {
+                        "index": 0,
+                        "delta": {"content": content[start : start + CHARS_PER_TOKEN]},
+                        "finish_reason": None,
+                    }
+                ]
+            )
+            if delay:
+                self.wfile.flush()
+                time.sleep(delay)
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            event([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--response",
+        nargs="+",
+        metavar="FILE",
+        help="Markdown files to answer with (default assets/examples/chat_response.md)",
+    )
+    parser.add_argument(
+        "--latency",
+        default="fixed:0",
+        help="time to first token, e.g. fixed:0.5, uniform:0.2,1, normal:0.8,0.2, "
+        "lognormal:-0.3,0.5 or exponential:0.8 (seconds)",
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=0,
+        help="output speed after the first token; 0 sends at once",
+    )
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="seconds sent with a 429"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=0,
+        help="answer 429 above this many requests in flight; 0 for no limit",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        server = FakeOpenAIServer(
+            host=args.host,
+            port=args.port,
+            responses=args.response,
+            latency=args.latency,
+            tokens_per_second=args.tokens_per_second,
+            rate_limit_rate=args.rate_limit_rate,
+            error_rate=args.error_rate,
+            retry_after=args.retry_after,
+            max_concurrency=args.max_concurrency,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Serving on OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
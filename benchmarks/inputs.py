@@ -0,0 +1,51 @@
+"""Deterministic inputs for the benchmarks: TMSL models and analysis reports."""
+
+import glob
+import os
+
+import model_generator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# tables, columns per table, measures per table, report repetitions
+SIZES = {
+    "small": {"tables": 8, "columns": 12, "measures": 6, "report_scale": 1},
+    "medium": {"tables": 60, "columns": 40, "measures": 25, "report_scale": 10},
+    "huge": {"tables": 400, "columns": 120, "measures": 60, "report_scale": 50},
+}
+SEED = 1
+
+
+def write_model(path, size, encoding="utf-16"):
+    """Write the model for a size to path, always from the same seed."""
+    spec = SIZES[size]
+    return model_generator.write_model(
+        path,
+        encoding=encoding,
+        tables=spec["tables"],
+        columns=spec["columns"],
+        measures=spec["measures"],
+        seed=SEED,
+    )
+
+
+def build_report(scale):
+    """Analysis Markdown: the example reports plus a wide table and DAX code,
+    repeated scale times."""
+    parts = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "assets", "examples", "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            parts.append(f.read())
+
+    table = ["| Table | Column | Type | **Description** |", "|---|---|---|---|"]
+    table += [
+        f"| Sales{i % 7} | Column{i} | string | Description of **column {i}** |"
+        for i in range(50)
+    ]
+    code = ["```dax"] + [
+        f"Measure {i} = CALCULATE(SUM(Sales[Amount]), Sales[Key] = {i})"
+        for i in range(40)
+    ]
+    code.append("```")
+    section = "\n\n".join(parts + ["\n".join(table), "\n".join(code)])
+    return "\n\n".join([section] * scale)
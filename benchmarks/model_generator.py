@@ -0,0 +1,481 @@
+"""Seeded generator of synthetic TMSL (.bim) models for scale testing.
+
+Usage:
+    python benchmarks/model_generator.py -o model.bim [--tables 1000]
+        [--columns 20] [--measures 10] [--relationships 3] [--noise 0.5]
+        [--seed 1] [--encoding utf-16]
+
+The model is a star schema in the shape Power BI Desktop saves: dimension
+tables with keys, attributes and hierarchies, fact tables related to a
+shared Date table and to some of the dimensions, measures written with
+the DAX patterns real models use (including a few of the anti-patterns
+app/dax_rules.py looks for), import partitions with M code, shared M
+parameters and a role. --noise sets how much tooling metadata
+(annotations, extended and changed properties, timestamps) is added, for
+measuring the pruner. The same arguments and seed always produce the
+same file.
+"""
+
+import argparse
+import json
+import os
+import random
+import uuid
+
+DIMENSIONS = (
+    "Customer",
+    "Product",
+    "Store",
+    "Employee",
+    "Region",
+    "Channel",
+    "Promotion",
+    "Supplier",
+    "Account",
+    "Currency",
+    "Warehouse",
+    "Campaign",
+)
+FACTS = (
+    "Sales",
+    "Orders",
+    "Returns",
+    "Inventory",
+    "Budget",
+    "Shipments",
+    "Invoices",
+    "Payments",
+    "Forecast",
+    "Web Sessions",
+)
+ATTRIBUTES = (
+    "Name",
+    "Code",
+    "Category",
+    "Subcategory",
+    "Segment",
+    "Status",
+    "City",
+    "Country",
+    "Manager",
+    "Created Date",
+    "Sort Order",
+)
+VALUES = (
+    "Amount",
+    "Quantity",
+    "Unit Price",
+    "Cost",
+    "Discount",
+    "Tax",
+    "Freight",
+    "Margin",
+)
+FORMATS = ("#,0", "#,0.00", "0.0%", "\\$#,0.00;(\\$#,0.00);\\$#,0.00")
+# The Date table and one fact table
+MIN_TABLES = 2
+
+
+class ModelGenerator:
+    """Builds one synthetic model; every random choice comes from the seed.
+
+    tables counts every table, the Date table included, so it is at least
+    MIN_TABLES.
+    """
+
+    def __init__(
+        self, tables=10, columns=20, measures=10, relationships=3, noise=0.5, seed=1
+    ):
+        if tables < MIN_TABLES:
+            raise ValueError(
+                f"A model needs at least {MIN_TABLES} tables "
+                "(the Date table and a fact table)"
+            )
+        self.tables = tables
+        self.columns = max(columns, 3)
+        self.measures = measures
+        self.relationships = relationships
+        self.noise = noise
+        self.random = random.Random(seed)
+
+    def _tag(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def _timestamp(self):
+        day = self.random.randint(1, 28)
+        return f"2024-{self.random.randint(1, 12):02d}-{day:02d}T09:30:00.000000"
+
+    def _noisy(self, data, annotations=()):
+        """Add a lineage tag and, depending on --noise, tooling metadata."""
+        data["lineageTag"] = self._tag()
+        if self.random.random() < self.noise:
+            data["annotations"] = [
+                {"name": name, "value": value} for name, value in annotations
+            ] + [{"name": "PBI_ChangedProperties", "value": '["Name"]'}]
+        if self.random.random() < self.noise / 2:
+            data["changedProperties"] = [{"property": "Name"}]
+        if self.random.random() < self.noise / 4:
+            data["extendedProperties"] = [
+                {
+                    "type": "json",
+                    "name": "ParserState",
+                    "value": {"version": 1, "token": self._tag()},
+                }
+            ]
+        return data
+
+    @staticmethod
+    def _unique(names, count):
+        """The first count names, numbered once the vocabulary runs out."""
+        return [
+            names[i % len(names)]
+            + (f" {i // len(names) + 1}" if i >= len(names) else "")
+            for i in range(count)
+        ]
+
+    def _column(self, name, data_type, summarize_by="none", **extra):
+        column = {
+            "name": name,
+            "dataType": data_type,
+            "sourceColumn": name,
+            "summarizeBy": summarize_by,
+        }
+        if data_type in ("double", "decimal", "int64") and summarize_by != "none":
+            column["formatString"] = self.random.choice(FORMATS)
+        column.update(extra)
+        return self._noisy(column, [("SummarizationSetBy", "Automatic")])
+
+    def _partition(self, table, columns):
+        types = {"string": "text", "dateTime": "datetime", "int64": "Int64.Type"}
+        changes = ", ".join(
+            f'{{"{column["name"]}", {types.get(column["dataType"], "type number")}}}'
+            for column in columns
+        )
+        schema = "dbo" if self.random.random() < 0.8 else "stg"
+        item = table.replace(" ", "")
+        return {
+            "name": f"{table}-{self._tag()[:8]}",
+            "mode": "import",
+            "source": {
+                "type": "m",
+                "expression": [
+                    "let",
+                    "    Source = Sql.Database(ServerName, DatabaseName),",
+                    f'    {schema}_{item} = Source{{[Schema="{schema}",'
+                    f'Item="{item}"]}}[Data],',
+                    f'    #"Removed Columns" = Table.RemoveColumns({schema}_{item}, '
+                    '{"RowVersion", "LoadedAt"}),',
+                    '    #"Changed Type" = Table.TransformColumnTypes('
+                    f'#"Removed Columns", {{{changes}}})',
+                    "in",
+                    '    #"Changed Type"',
+                ],
+            },
+        }
+
+    def date_table(self):
+        columns = [
+            self._column("Date", "dateTime", isKey=True, formatString="General Date"),
+            self._column("Year", "int64"),
+            self._column("Month", "string", sortByColumn="Month Number"),
+            self._column("Month Number", "int64", isHidden=True),
+        ]
+        for name, expression in (
+            ("Year", "YEAR([Date])"),
+            ("Month", 'FORMAT([Date], "MMM")'),
+            ("Month Number", "MONTH([Date])"),
+        ):
+            column = next(c for c in columns if c["name"] == name)
+            column.pop("sourceColumn")
+            column.update(type="calculated", expression=expression)
+        return self._noisy(
+            {
+                "name": "Date",
+                "dataCategory": "Time",
+                "columns": columns,
+                "hierarchies": [
+                    {
+                        "name": "Calendar",
+                        "levels": [
+                            {"name": "Year", "ordinal": 0, "column": "Year"},
+                            {"name": "Month", "ordinal": 1, "column": "Month"},
+                            {"name": "Date", "ordinal": 2, "column": "Date"},
+                        ],
+                    }
+                ],
+                "partitions": [
+                    {
+                        "name": "Date",
+                        "mode": "import",
+                        "source": {
+                            "type": "calculated",
+                            "expression": "CALENDAR(DATE(2018, 1, 1), "
+                            "DATE(2026, 12, 31))",
+                        },
+                    }
+                ],
+            },
+            [("PBI_Id", self._tag())],
+        )
+
+    def dimension_table(self, name):
+        attributes = self._unique(ATTRIBUTES, self.columns - 1)
+        columns = [self._column(f"{name} Key", "int64", isKey=True, isHidden=True)]
+        for attribute in attributes:
+            # Half the attributes are documented, for the missing-description check
+            extra = {}
+            if self.random.random() < 0.5:
+                extra["description"] = f"{attribute} of the {name.lower()}"
+            data_type = "dateTime" if attribute.endswith("Date") else "string"
+            columns.append(self._column(attribute, data_type, **extra))
+        table = {"name": name, "columns": columns}
+        if {"Category", "Subcategory", "Name"} <= set(attributes):
+            table["hierarchies"] = [
+                {
+                    "name": f"{name} Hierarchy",
+                    "levels": [
+                        {"name": level, "ordinal": i, "column": level}
+                        for i, level in enumerate(("Category", "Subcategory", "Name"))
+                    ],
+                }
+            ]
+        table["measures"] = self.measures_for(name, [f"{name} Key"], dimension=True)
+        table["partitions"] = [self._partition(name, columns)]
+        return self._noisy(table, [("PBI_ResultType", "Table")])
+
+    def fact_table(self, name, dimensions):
+        related = self.random.sample(
+            dimensions, min(self.relationships, len(dimensions))
+        )
+        columns = [self._column("Date", "dateTime")]
+        columns += [
+            self._column(
+                f"{dimension} Key", "int64", isHidden=self.random.random() < 0.7
+            )
+            for dimension in related
+        ]
+        values = self._unique(VALUES, max(self.columns - len(columns), 1))
+        columns += [
+            self._column(value, "int64" if value == "Quantity" else "decimal", "sum")
+            for value in values
+        ]
+        table = {
+            "name": name,
+            "columns": columns,
+            "measures": self.measures_for(name, values),
+            "partitions": [self._partition(name, columns)],
+        }
+        return self._noisy(table, [("PBI_ResultType", "Table")]), related
+
+    def measures_for(self, table, values, dimension=False):
+        """Base aggregations first, then measures built on them."""
+        ref = f"'{table}'"
+        measures = []
+        for i in range(self.measures):
+            value = values[i % len(values)]
+            base = measures[self.random.randrange(len(measures))] if measures else None
+            if dimension:
+                name = f"{table} Count" if i == 0 else f"{table} Count {i}"
+                expression = (
+                    f"COUNTROWS({ref})"
+                    if i % 2 == 0
+                    else f"DISTINCTCOUNT({ref}[{value}])"
+                )
+            elif i < min(3, len(values)):
+                name = f"Total {value} ({table})"
+                expression = f"SUM({ref}[{value}])"
+            else:
+                name = f"{base['name']} {self._pattern_name(i)} {i}"
+                expression = self._derived(ref, base["name"], values, i)
+            measures.append(
+                self._noisy(
+                    {
+                        "name": name,
+                        "expression": expression,
+                        "formatString": self.random.choice(FORMATS),
+                        "displayFolder": "Base" if base is None else "Analysis",
+                    }
+                )
+            )
+        return measures
+
+    PATTERNS = ("YTD", "LY", "Share", "Ratio", "Filtered", "Iterated", "Safe", "Var")
+
+    def _pattern_name(self, i):
+        return self.PATTERNS[i % len(self.PATTERNS)]
+
+    def _derived(self, ref, base, values, i):
+        value = values[i % len(values)]
+        other = values[(i + 1) % len(values)]
+        pattern = self._pattern_name(i)
+        if pattern == "YTD":
+            return f"TOTALYTD([{base}], 'Date'[Date])"
+        if pattern == "LY":
+            return f"CALCULATE([{base}], SAMEPERIODLASTYEAR('Date'[Date]))"
+        if pattern == "Share":
+            return f"DIVIDE([{base}], CALCULATE([{base}], ALL({ref})))"
+        if pattern == "Ratio":
+            # Plain division, flagged by the local DAX checks
+            return f"SUM({ref}[{value}]) / SUM({ref}[{other}])"
+        if pattern == "Filtered":
+            # Filtering a whole table instead of a column, also flagged
+            return (
+                f"CALCULATE([{base}], FILTER({ref}, {ref}[{value}] > "
+                f"{self.random.randint(1, 1000)}))"
+            )
+        if pattern == "Iterated":
+            return f"SUMX({ref}, {ref}[{value}] * {ref}[{other}])"
+        if pattern == "Safe":
+            return f"IFERROR([{base}] / [{base}], BLANK())"
+        return [
+            f"VAR CurrentValue = [{base}]",
+            f"VAR PreviousValue = CALCULATE([{base}], DATEADD('Date'[Date], -1, MONTH))",
+            "RETURN",
+            "    DIVIDE(CurrentValue - PreviousValue, PreviousValue)",
+        ]
+
+    def relationship(self, from_table, from_column, to_table, to_column, **extra):
+        relationship = {
+            "name": self._tag(),
+            "fromTable": from_table,
+            "fromColumn": from_column,
+            "toTable": to_table,
+            "toColumn": to_column,
+        }
+        relationship.update(extra)
+        return relationship
+
+    def build(self):
+        """Return the model as a dict ready for json.dump."""
+        # Besides Date, about a third of the tables are dimensions and the
+        # rest facts, with at least one dimension once there is room for it
+        others = self.tables - 1
+        dimension_count = max(1, others // 3) if others > 1 else 0
+        dimensions = self._unique(DIMENSIONS, dimension_count)
+        facts = self._unique(FACTS, others - dimension_count)
+
+        tables = [self.date_table()]
+        tables += [self.dimension_table(name) for name in dimensions]
+        relationships = []
+        for name in facts:
+            table, related = self.fact_table(name, dimensions)
+            tables.append(table)
+            relationships.append(self.relationship(name, "Date", "Date", "Date"))
+            for dimension in related:
+                extra = {}
+                if self.random.random() < 0.05:
+                    extra["crossFilteringBehavior"] = "bothDirections"
+                relationships.append(
+                    self.relationship(
+                        name, f"{dimension} Key", dimension, f"{dimension} Key", **extra
+                    )
+                )
+
+        model = {
+            "culture": "en-US",
+            "defaultPowerBIDataSourceVersion": "powerBI_V3",
+            "sourceQueryCulture": "en-US",
+            "dataAccessOptions": {
+                "legacyRedirects": True,
+                "returnErrorValuesAsNull": True,
+            },
+            "tables": tables,
+            "relationships": relationships,
+            "expressions": [
+                {
+                    "name": name,
+                    "kind": "m",
+                    "expression": f'"{value}" meta [IsParameterQuery=true, '
+                    'Type="Text", IsParameterQueryRequired=true]',
+                    "lineageTag": self._tag(),
+                }
+                for name, value in (
+                    ("ServerName", "sql.contoso.local"),
+                    ("DatabaseName", "Warehouse"),
+                )
+            ],
+            "roles": [
+                {
+                    "name": "Regional Managers",
+                    "modelPermission": "read",
+                    "tablePermissions": [
+                        {
+                            "name": dimension,
+                            "filterExpression": f"'{dimension}'[Manager] = "
+                            "USERPRINCIPALNAME()",
+                        }
+                        for dimension in dimensions[:2]
+                    ],
+                }
+            ],
+            "annotations": [
+                {"name": "PBI_QueryOrder", "value": json.dumps(dimensions + facts)},
+                {"name": "__PBI_TimeIntelligenceEnabled", "value": "0"},
+                {"name": "PBIDesktopVersion", "value": "2.128.751.0 (24.04)"},
+            ],
+        }
+        if self.noise:
+            model["annotations"].append(
+                {"name": "PBI_ProTooling", "value": '["DevMode"]'}
+            )
+            for table in tables:
+                if self.random.random() < self.noise / 2:
+                    table["modifiedTime"] = self._timestamp()
+                    table["structureModifiedTime"] = self._timestamp()
+        return {
+            "name": self._tag(),
+            "compatibilityLevel": 1567,
+            "model": model,
+        }
+
+
+def write_model(path, encoding="utf-16", **options):
+    """Generate a model and save it; Power BI saves .bim files as UTF-16."""
+    model = ModelGenerator(**options).build()
+    with open(path, "w", encoding=encoding) as f:
+        json.dump(model, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", required=True, help="path of the .bim file")
+    parser.add_argument(
+        "--tables",
+        type=int,
+        default=10,
+        help=f"tables in the model, the Date table included (at least {MIN_TABLES})",
+    )
+    parser.add_argument("--columns", type=int, default=20, help="columns per table")
+    parser.add_argument("--measures", type=int, default=10, help="measures per table")
+    parser.add_argument(
+        "--relationships",
+        type=int,
+        default=3,
+        help="dimensions each fact table is related to, besides Date",
+    )
+    parser.add_argument(
+        "--noise", type=float, default=0.5, help="tooling metadata, from 0 to 1"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--encoding", default="utf-16")
+    args = parser.parse_args()
+
+    try:
+        path = write_model(
+            args.output,
+            encoding=args.encoding,
+            tables=args.tables,
+            columns=args.columns,
+            measures=args.measures,
+            relationships=args.relationships,
+            noise=args.noise,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{path}: {os.path.getsize(path):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare the PDF export engines on the example reports.
+
+Usage: python benchmarks/pdf_backends.py [--repeat N] [--keep DIR]
+
+Each example in assets/examples is exported on its own, then all of them
+combined into one document, as "Download All" does. The first xhtml2pdf run
+includes building the inlined font stylesheet, which later runs reuse.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.file_handler import FileHandler  # noqa: E402
+
+ENGINES = ("xhtml2pdf", "fpdf2")
+
+
+def load_examples():
+    examples = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "assets", "examples", "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            examples[os.path.basename(path)] = f.read()
+    examples["combined"] = "\n\n---\n\n".join(examples.values())
+    return examples
+
+
+def time_export(content, engine, filename, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if not FileHandler.save_as_pdf(content, filename, engine=engine):
+            raise RuntimeError(f"{engine} failed on {os.path.basename(filename)}")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", help="directory to keep the generated PDFs in")
+    args = parser.parse_args()
+
+    FileHandler.interactive = False
+    out_dir = args.keep or tempfile.mkdtemp(prefix="pdf_bench_")
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"{'input':<20} {'engine':<10} {'first':>8} {'best':>8} {'size':>10}")
+    for name, content in load_examples().items():
+        for engine in ENGINES:
+            filename = os.path.join(
+                out_dir, f"{os.path.splitext(name)[0]}.{engine}.pdf"
+            )
+            timings = time_export(content, engine, filename, args.repeat)
+            print(
+                f"{name:<20} {engine:<10} {timings[0]:>7.3f}s {min(timings):>7.3f}s "
+                f"{os.path.getsize(filename):>9,}B"
+            )
+    print(f"PDFs written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
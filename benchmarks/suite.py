@@ -0,0 +1,281 @@
+"""Benchmark suite: ingestion, prompt construction, rendering and export.
+
+Usage:
+    python benchmarks/suite.py [--sizes small medium huge] [--only read_file ...]
+                               [--repeat N] [--save NAME] [--compare NAME]
+
+Each benchmark runs on small, medium and huge inputs (see inputs.py) and
+records the best and median wall time, peak Python memory (tracemalloc,
+measured on a separate run so it doesn't slow the timed ones) and
+throughput. --save writes the results to baselines/NAME.json; --compare
+checks them against a saved baseline and exits non-zero when a benchmark
+got slower or bigger by more than --threshold.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS_DIR)
+BASELINES_DIR = os.path.join(BENCHMARKS_DIR, "baselines")
+sys.path.append(ROOT)
+
+from app import markdown_ir, settings  # noqa: E402
+from app.controller import Controller  # noqa: E402
+from app.file_handler import FileHandler  # noqa: E402
+from app.html_renderer import HtmlRenderer  # noqa: E402
+from app.response_cache import ResponseCache  # noqa: E402
+from inputs import SIZES, build_report, write_model  # noqa: E402
+
+CANNED_REPORT = "## Analysis\n\n- Finding one\n- Finding two\n"
+
+
+class PromptRecorder:
+    """Stands in for AIAnalyzer: counts the prompt bytes instead of sending them."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_bytes = 0
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        self.requests += 1
+        self.prompt_bytes += len(task) + len(content)
+        return CANNED_REPORT
+
+    def close(self):
+        pass
+
+
+class Inputs:
+    """Lazily built inputs of one size, kept for every benchmark of the run."""
+
+    def __init__(self, size, work_dir, controller):
+        self.size = size
+        self.work_dir = work_dir
+        self.controller = controller
+        self._model_path = None
+        self._report = None
+
+    @property
+    def model_path(self):
+        if self._model_path is None:
+            self._model_path = write_model(
+                os.path.join(self.work_dir, f"{self.size}.bim"), self.size
+            )
+        return self._model_path
+
+    @property
+    def report(self):
+        if self._report is None:
+            self._report = build_report(SIZES[self.size]["report_scale"])
+        return self._report
+
+    def output(self, extension):
+        return os.path.join(self.work_dir, f"{self.size}.{extension}")
+
+
+# Each benchmark takes the Inputs and returns the number of input bytes it
+# processed, which the throughput is computed from
+
+
+def bench_read_file(inputs):
+    FileHandler.read_file(inputs.model_path)
+    return os.path.getsize(inputs.model_path)
+
+
+def bench_read_content(inputs):
+    """Streaming read with pruning and parsing, as process_file does it."""
+    controller = inputs.controller
+    controller.read_content(inputs.model_path, prune=True)
+    return os.path.getsize(inputs.model_path)
+
+
+def bench_build_prompts(inputs):
+    """process_file end to end with the AI requests replaced by PromptRecorder."""
+    for _ in inputs.controller.process_file(
+        inputs.model_path,
+        concurrent=False,
+        use_cache=False,
+        incremental=False,
+        multi_report=False,
+    ):
+        pass
+    return os.path.getsize(inputs.model_path)
+
+
+def bench_render_html(inputs):
+    """What GUI.display_analysis runs on its render thread, with cold caches."""
+    markdown_ir.clear_cache()
+    HtmlRenderer(max_entries=1).render(inputs.report)
+    return len(inputs.report.encode("utf-8"))
+
+
+def _exporter(file_format, extension, **options):
+    def bench(inputs):
+        markdown_ir.clear_cache()
+        filename = inputs.output(extension)
+        if file_format == "pdf":
+            saved = FileHandler.save_as_pdf(inputs.report, filename, **options)
+        else:
+            saved = FileHandler.save_analysis(
+                inputs.report, file_format, None, filename
+            )
+        if not saved:
+            raise RuntimeError(f"{file_format} export failed")
+        return len(inputs.report.encode("utf-8"))
+
+    return bench
+
+
+BENCHMARKS = {
+    "read_file": bench_read_file,
+    "read_content": bench_read_content,
+    "build_prompts": bench_build_prompts,
+    "render_html": bench_render_html,
+    "save_as_txt": _exporter("txt", "txt"),
+    "save_as_doc": _exporter("doc", "docx"),
+    "save_as_pdf_xhtml2pdf": _exporter("pdf", "pdf", engine="xhtml2pdf"),
+    "save_as_pdf_fpdf2": _exporter("pdf", "fpdf2.pdf", engine="fpdf2"),
+}
+
+
+def measure(bench, inputs, repeat):
+    # Warm-up run, which also builds the inputs outside the timings
+    processed = bench(inputs)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bench(inputs)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    bench(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "bytes": processed,
+        "best_s": round(best, 4),
+        "median_s": round(statistics.median(timings), 4),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "mb_per_s": round(processed / 1024 / 1024 / best, 2) if best else None,
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; return the regressed keys."""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta'].get('commit')}:")
+    for key, result in results.items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        time_ratio = result["best_s"] / previous["best_s"] if previous["best_s"] else 1
+        memory_ratio = (
+            result["peak_mb"] / previous["peak_mb"] if previous["peak_mb"] else 1
+        )
+        regressed = time_ratio > 1 + threshold or memory_ratio > 1 + threshold
+        if regressed:
+            regressions.append(key)
+        print(
+            f"  {key:<32} time {time_ratio:>5.2f}x  memory {memory_ratio:>5.2f}x"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="NAME", help="write baselines/NAME.json")
+    parser.add_argument(
+        "--compare", metavar="NAME", help="compare with baselines/NAME.json"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown or memory growth before a regression (default 0.25)",
+    )
+    args = parser.parse_args()
+
+    FileHandler.interactive = False
+    # Don't leave a telemetry file behind for every process_file call
+    settings.TELEMETRY_ENABLED = False
+    logging.getLogger("app").setLevel(logging.WARNING)
+    names = args.only or list(BENCHMARKS)
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="analysthub_bench_") as work_dir:
+        recorder = PromptRecorder()
+        controller = Controller(
+            ai_analyzer=recorder,
+            response_cache=ResponseCache(work_dir, enabled=False),
+        )
+        try:
+            print(
+                f"{'benchmark':<32} {'best':>9} {'median':>9} {'peak':>9} {'MB/s':>8}"
+            )
+            for size in args.sizes:
+                inputs = Inputs(size, work_dir, controller)
+                for name in names:
+                    key = f"{name}/{size}"
+                    result = measure(BENCHMARKS[name], inputs, args.repeat)
+                    results[key] = result
+                    print(
+                        f"{key:<32} {result['best_s']:>8.3f}s {result['median_s']:>8.3f}s "
+                        f"{result['peak_mb']:>7.1f}MB {result['mb_per_s'] or 0:>8.2f}"
+                    )
+        finally:
+            controller.close()
+
+    output = {"meta": metadata(), "results": results}
+    if args.save:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        path = os.path.join(BASELINES_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nBaseline written to {path}")
+
+    if args.compare:
+        with open(
+            os.path.join(BASELINES_DIR, f"{args.compare}.json"), encoding="utf-8"
+        ) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config  # noqa: F401 (Needed for configs setup)
+from dotenv import load_dotenv
+from app import settings
+from app.ai_analyzer import AIAnalyzer
+from app.controller import Controller
+from app.file_handler import FileHandler
+
+FILE_EXTENSIONS = {"txt": "txt", "pdf": "pdf", "doc": "docx"}
+
+
+def collect_files(paths):
+    """Expand the given files and directories into a sorted list of model files."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(directory, name)
+                    for name in names
+                    if FileHandler.is_valid_file_type(name)
+                )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"Skipping {path}: not found", file=sys.stderr)
+    return sorted(dict.fromkeys(files))
+
+
+def report_prefixes(files, output_dir=None):
+    """Map each file to the path prefix of its reports, unique across the batch.
+
+    Reports are named after the file; files sharing a name in the same output
+    directory (model.bim and model.pbit, or a/model.bim and b/model.bim with
+    --output-dir) get the extension added, then a number.
+    """
+    locations = {}
+    for file_path in files:
+        directory = output_dir or os.path.dirname(os.path.abspath(file_path))
+        stem, extension = os.path.splitext(os.path.basename(file_path))
+        locations[file_path] = (directory, stem, extension.lstrip("."))
+
+    def key(directory, name):
+        return os.path.normcase(os.path.join(directory, name))
+
+    counts = Counter(key(directory, stem) for directory, stem, _ in locations.values())
+    prefixes = {}
+    taken = set()
+    for file_path, (directory, stem, extension) in locations.items():
+        base = stem if counts[key(directory, stem)] == 1 else f"{stem}_{extension}"
+        name, number = base, 2
+        while key(directory, name) in taken:
+            name = f"{base}_{number}"
+            number += 1
+        taken.add(key(directory, name))
+        prefixes[file_path] = os.path.join(directory, name)
+    return prefixes
+
+
+def analyze_file(controller, file_path, args, prefix):
+    """Analyze one file and write its reports under prefix. Returns a summary dict."""
+    started = time.perf_counter()
+    summary = {"file": file_path, "tasks": 0, "failed": 0, "outputs": [], "error": None}
+
+    try:
+        results = {}
+        for task_name, result in controller.process_file(
+            file_path,
+            args.model,
+            concurrent=not args.sequential,
+            use_cache=not args.no_cache,
+            refresh_cache=args.refresh_cache,
+            prune=not args.no_prune,
+            slice_context=not args.no_slice,
+            local_checks=not args.no_local_checks,
+            multi_report=args.multi_report or None,
+        ):
+            results[task_name] = result
+            summary["tasks"] += 1
+            if not result or result.startswith("Analysis failed"):
+                summary["failed"] += 1
+
+        os.makedirs(os.path.dirname(prefix), exist_ok=True)
+
+        if args.per_task:
+            reports = {
+                f"{prefix}_{task_name}": results[task_name]
+                for task_name in controller.analysis_tasks()
+                if results.get(task_name)
+            }
+        else:
+            reports = {f"{prefix}_analysis": controller.combine_analyses(results)}
+
+        for name, content in reports.items():
+            for file_format in args.formats:
+                filename = f"{name}.{FILE_EXTENSIONS[file_format]}"
+                if controller.file_handler.save_analysis(
+                    content, file_format, filename=filename
+                ):
+                    summary["outputs"].append(filename)
+                else:
+                    summary["error"] = f"Failed to write {filename}"
+    except Exception as e:
+        logging.getLogger("app").error(f"Batch analysis of {file_path} failed: {e}")
+        summary["error"] = str(e)
+
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+def print_summary(summaries, elapsed):
+    width = max([len(summary["file"]) for summary in summaries] + [4])
+    print()
+    print(f"{'File':<{width}}  {'Tasks':>5}  {'Failed':>6}  {'Time (s)':>8}  Status")
+    for summary in summaries:
+        status = summary["error"] or f"{len(summary['outputs'])} file(s) written"
+        print(
+            f"{summary['file']:<{width}}  {summary['tasks']:>5}  "
+            f"{summary['failed']:>6}  {summary['seconds']:>8.1f}  {status}"
+        )
+    print(f"\n{len(summaries)} file(s) analyzed in {elapsed:.1f} s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyze Power BI model files without the desktop interface."
+    )
+    parser.add_argument("paths", nargs="+", help="model files or directories")
+    parser.add_argument(
+        "-m",
+        "--model",
+        default="gpt-4o-mini",
+        choices=Controller._ai_models(),
+        help="AI model to use (default: gpt-4o-mini)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        action="append",
+        choices=list(FILE_EXTENSIONS),
+        help="report format, may be repeated (default: txt)",
+    )
+    parser.add_argument(
+        "-o", "--output-dir", help="directory for reports (default: next to input)"
+    )
+    parser.add_argument(
+        "--per-task",
+        action="store_true",
+        help="write one report per analysis task instead of a combined report",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=2,
+        help="number of files analyzed at the same time (default: 2)",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=settings.ANALYSIS_MAX_WORKERS,
+        help="global cap on API requests in flight across all files "
+        f"(default: {settings.ANALYSIS_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--sequential", action="store_true", help="run the tasks of a file in order"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="don't read or write cached responses"
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="ignore cached responses but store the new ones",
+    )
+    parser.add_argument(
+        "--no-prune", action="store_true", help="send the file without pruning"
+    )
+    parser.add_argument(
+        "--no-slice",
+        action="store_true",
+        help="send every task the whole file instead of its slice of the model",
+    )
+    parser.add_argument(
+        "--no-local-checks",
+        action="store_true",
+        help="don't run the local rule checks before the AI analysis",
+    )
+    parser.add_argument(
+        "--multi-report",
+        action="store_true",
+        help="request all reports of a file in a single API call",
+    )
+    args = parser.parse_args(argv)
+    args.formats = list(dict.fromkeys(args.formats or ["txt"]))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Reports and errors go to the log and the summary instead of Tk dialogs
+    FileHandler.interactive = False
+
+    load_dotenv()
+    # AIAnalyzer also loads the .env bundled with the application
+    ai_analyzer = AIAnalyzer(max_concurrent_requests=args.max_requests)
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is not set.", file=sys.stderr)
+        return 2
+
+    files = collect_files(args.paths)
+    if not files:
+        print("No model files found.", file=sys.stderr)
+        return 2
+
+    prefixes = report_prefixes(files, args.output_dir)
+    controller = Controller(ai_analyzer=ai_analyzer, max_workers=args.max_requests)
+    started = time.perf_counter()
+    summaries = []
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, args.jobs), thread_name_prefix="batch"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    analyze_file, controller, file_path, args, prefixes[file_path]
+                )
+                for file_path in files
+            ]
+            for future in as_completed(futures):
+                summary = future.result()
+                summaries.append(summary)
+                print(
+                    f"[{len(summaries)}/{len(files)}] {summary['file']} "
+                    f"({summary['seconds']:.1f} s)"
+                )
+    finally:
+        controller.close()
+
+    summaries.sort(key=lambda summary: files.index(summary["file"]))
+    print_summary(summaries, time.perf_counter() - started)
+
+    failed = any(summary["error"] or summary["failed"] for summary in summaries)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,14 @@ from app.ui import GUI
 
 
 def main():
-    root = GUI().create_gui()
-    root.mainloop()
+    gui = GUI()
+    root = gui.create_gui()
+    try:
+        root.mainloop()
+    finally:
+        gui.renderer.shutdown()
+        gui.exports.shutdown()
+        gui.controller.close()
 
 
 if __name__ == "__main__":
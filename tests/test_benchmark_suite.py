@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+sys.path.insert(0, os.path.abspath(BENCHMARKS_DIR))
+
+import inputs  # noqa: E402
+import suite  # noqa: E402
+
+
+def result(best_s, peak_mb):
+    return {"best_s": best_s, "peak_mb": peak_mb}
+
+
+class CompareTest(unittest.TestCase):
+    def compare(self, results, previous, threshold=0.1):
+        baseline = {"meta": {"commit": "abc1234"}, "results": previous}
+        with contextlib.redirect_stdout(io.StringIO()):
+            return suite.compare(results, baseline, threshold)
+
+    def test_regressions_beyond_threshold(self):
+        previous = {
+            "read_file/small": result(1.0, 10),
+            "render_html/small": result(1.0, 10),
+            "save_as_txt/small": result(1.0, 10),
+        }
+        results = {
+            "read_file/small": result(1.05, 10.5),
+            "render_html/small": result(1.5, 10),
+            "save_as_txt/small": result(1.0, 20),
+        }
+        self.assertEqual(
+            self.compare(results, previous),
+            ["render_html/small", "save_as_txt/small"],
+        )
+
+    def test_new_and_zero_baselines_do_not_regress(self):
+        previous = {"read_file/small": result(0, 0)}
+        results = {
+            "read_file/small": result(2.0, 5),
+            "build_prompts/small": result(9.0, 90),
+        }
+        self.assertEqual(self.compare(results, previous), [])
+
+
+class MeasureTest(unittest.TestCase):
+    def test_runs_warm_up_and_repeats(self):
+        calls = []
+
+        def bench(_inputs):
+            calls.append(1)
+            return 2 * 1024 * 1024
+
+        measured = suite.measure(bench, None, repeat=3)
+        # Warm-up, timed runs and the tracemalloc run
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(measured["bytes"], 2 * 1024 * 1024)
+        self.assertLessEqual(measured["best_s"], measured["median_s"])
+
+
+class InputsTest(unittest.TestCase):
+    def test_report_scales(self):
+        once = inputs.build_report(1)
+        self.assertIn("```dax", once)
+        self.assertIn("| Sales0 | Column0 |", once)
+        self.assertEqual(len(inputs.build_report(3)), 3 * len(once) + 2 * 2)
+
+    def test_model_is_written_once(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            lazy = suite.Inputs("small", work_dir, controller=None)
+            path = lazy.model_path
+            self.assertEqual(path, os.path.join(work_dir, "small.bim"))
+            modified = os.path.getmtime(path)
+            self.assertEqual(lazy.model_path, path)
+            self.assertEqual(os.path.getmtime(path), modified)
+            self.assertEqual(lazy.output("pdf"), os.path.join(work_dir, "small.pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from app.bim_diff import ModelDiff
+from app.bim_model import parse_bim
+from app.controller import Controller
+from app.response_cache import ResponseCache
+
+MODEL = {
+    "name": "Sales",
+    "model": {
+        "culture": "en-US",
+        "annotations": [{"name": "PBIDesktopVersion", "value": "2.128"}],
+        "tables": [
+            {
+                "name": "Sales",
+                "lineageTag": "1",
+                "columns": [
+                    {"name": "Amount", "dataType": "decimal", "lineageTag": "2"},
+                    {"name": "Date", "dataType": "dateTime"},
+                ],
+                "measures": [{"name": "Total", "expression": "SUM ( Sales[Amount] )"}],
+            },
+            {"name": "Date", "columns": [{"name": "Date", "dataType": "dateTime"}]},
+        ],
+        "relationships": [
+            {
+                "fromTable": "Sales",
+                "fromColumn": "Date",
+                "toTable": "Date",
+                "toColumn": "Date",
+            }
+        ],
+    },
+}
+
+
+def edited(change):
+    data = copy.deepcopy(MODEL)
+    change(data["model"])
+    return data
+
+
+def set_measure(expression):
+    def change(model):
+        model["tables"][0]["measures"][0]["expression"] = expression
+
+    return change
+
+
+class ModelDiffTest(unittest.TestCase):
+    def diff(self, new):
+        return ModelDiff(parse_bim(json.dumps(MODEL)), parse_bim(json.dumps(new)))
+
+    def test_formatting_and_metadata_are_not_changes(self):
+        def change(model):
+            model["tables"].reverse()
+            model["tables"][1]["lineageTag"] = "other"
+            model["annotations"] = []
+
+        diff = self.diff(edited(change))
+        self.assertFalse(diff)
+        self.assertEqual(diff.summary(), "no semantic changes")
+        self.assertEqual(diff.affected_tasks(["general", "dax"]), [])
+
+    def test_changed_measure(self):
+        diff = self.diff(edited(set_measure("SUMX ( Sales, Sales[Amount] )")))
+        self.assertEqual(
+            [(c.kind, c.ref, c.action, c.fields) for c in diff.changes],
+            [("measures", "Sales[Total]", "changed", ("expression",))],
+        )
+        self.assertEqual(diff.summary(), "measures: 1 changed")
+        affected = diff.affected_tasks(Controller.analysis_tasks())
+        self.assertIn("general", affected)
+        self.assertIn("dax", affected)
+        self.assertNotIn("model", affected)
+
+    def test_added_table_affects_every_sliced_task(self):
+        diff = self.diff(edited(lambda model: model["tables"].append({"name": "New"})))
+        self.assertEqual(
+            diff.counts(), {"tables": {"added": 1, "removed": 0, "changed": 0}}
+        )
+        self.assertEqual(
+            diff.affected_tasks(Controller.analysis_tasks()),
+            list(Controller.analysis_tasks()),
+        )
+
+    def test_removed_relationship(self):
+        diff = self.diff(edited(lambda model: model.pop("relationships")))
+        affected = diff.affected_tasks(Controller.analysis_tasks())
+        self.assertIn("model", affected)
+        self.assertNotIn("dax", affected)
+        self.assertNotIn("dictionary", affected)
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.tasks = []
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        self.tasks.append(task)
+        return f"# Report {len(self.tasks)}"
+
+
+@mock.patch("app.settings.TELEMETRY_ENABLED", False)
+class IncrementalAnalysisTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "Sales.bim")
+        self.analyzer = FakeAnalyzer()
+        self.controller = Controller(
+            ai_analyzer=self.analyzer, response_cache=ResponseCache(enabled=False)
+        )
+        self.addCleanup(self.controller.chunked_analyzer.shutdown)
+
+    def run_analysis(self, data):
+        with open(self.path, "w", encoding="utf-16") as f:
+            json.dump(data, f)
+        calls = len(self.analyzer.tasks)
+        results = dict(
+            self.controller.process_file(
+                self.path,
+                concurrent=False,
+                incremental=True,
+                multi_report=False,
+                local_checks=False,
+            )
+        )
+        return results, len(self.analyzer.tasks) - calls
+
+    def test_only_affected_tasks_rerun(self):
+        first, calls = self.run_analysis(MODEL)
+        self.assertEqual(calls, len(Controller.analysis_tasks()))
+        self.assertEqual(self.run_analysis(MODEL), (first, 0))
+
+        second, calls = self.run_analysis(edited(set_measure("SUM ( Sales[Date] )")))
+        affected = self.controller.last_diff.affected_tasks(Controller.analysis_tasks())
+        self.assertEqual(calls, len(affected))
+        for task_name in Controller.analysis_tasks():
+            with self.subTest(task_name):
+                if task_name in affected:
+                    self.assertNotEqual(second[task_name], first[task_name])
+                else:
+                    self.assertEqual(second[task_name], first[task_name])
+
+    def test_changed_options_rerun_everything(self):
+        self.run_analysis(MODEL)
+        calls = len(self.analyzer.tasks)
+        list(
+            self.controller.process_file(
+                self.path,
+                model="gpt-4o",
+                concurrent=False,
+                incremental=True,
+                multi_report=False,
+                local_checks=False,
+            )
+        )
+        self.assertEqual(
+            len(self.analyzer.tasks) - calls, len(Controller.analysis_tasks())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
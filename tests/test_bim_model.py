@@ -0,0 +1,89 @@
+import io
+import json
+import unittest
+
+from app.bim_model import parse_bim
+from app.bim_reader import BimStreamReader
+
+MALFORMED = {
+    "root": ("[1, 2]", "TMSL root must be an object"),
+    "null model": ('{"model": null}', '"model" must be an object'),
+    "model list": ('{"model": []}', '"model" must be an object'),
+    "tables object": ('{"model": {"tables": {}}}', '"tables" must be a list'),
+    "table number": ('{"model": {"tables": [1]}}', '"tables" must be a list'),
+    "column string": (
+        '{"model": {"tables": [{"name": "Sales", "columns": ["Amount"]}]}}',
+        '"columns" must be a list',
+    ),
+    "measures object": (
+        '{"model": {"tables": [{"name": "Sales", "measures": {"name": "Total"}}]}}',
+        '"measures" must be a list',
+    ),
+    "relationship null": (
+        '{"model": {"relationships": [null]}}',
+        '"relationships" must be a list',
+    ),
+}
+
+
+class ParseBimTest(unittest.TestCase):
+    def test_parses_tables_measures_and_relationships(self):
+        model = parse_bim(
+            json.dumps(
+                {
+                    "name": "Sales",
+                    "compatibilityLevel": 1567,
+                    "model": {
+                        "tables": [
+                            {
+                                "name": "Sales",
+                                "columns": [{"name": "Date"}, {"name": "Amount"}],
+                                "measures": [
+                                    {"name": "Total", "expression": ["SUM (", ")"]}
+                                ],
+                            },
+                            {"name": "Date", "columns": [{"name": "Date"}]},
+                        ],
+                        "relationships": [
+                            {
+                                "fromTable": "Sales",
+                                "fromColumn": "Date",
+                                "toTable": "Date",
+                                "toColumn": "Date",
+                            }
+                        ],
+                    },
+                }
+            )
+        )
+        self.assertEqual(model.name, "Sales")
+        self.assertEqual([table.name for table in model.tables], ["Sales", "Date"])
+        self.assertEqual(model.measure("Total").expression, "SUM (\n)")
+        self.assertEqual(len(model.relationships_by_table["Date"]), 1)
+
+    def test_null_lists_are_empty(self):
+        model = parse_bim('{"model": {"tables": null, "roles": null}}')
+        self.assertEqual((model.tables, model.roles), ([], []))
+
+    def test_malformed_models_raise_value_error(self):
+        for case, (content, message) in MALFORMED.items():
+            with self.subTest(case):
+                with self.assertRaisesRegex(ValueError, message):
+                    parse_bim(content)
+
+
+class StreamedMalformedModelTest(unittest.TestCase):
+    def test_malformed_models_raise_value_error(self):
+        for case, (content, message) in MALFORMED.items():
+            if case == "root":
+                # The streaming reader only reads objects
+                message = "Expected '{'"
+            with self.subTest(case):
+                with self.assertRaisesRegex(ValueError, message):
+                    BimStreamReader(chunk_size=4).read_stream(
+                        io.BytesIO(content.encode("utf-8")), "model.bim"
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
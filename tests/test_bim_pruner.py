@@ -0,0 +1,94 @@
+import json
+import unittest
+
+from app.bim_pruner import BimPruner
+
+MODEL = {
+    "name": "Sales",
+    "model": {
+        "annotations": [{"name": "PBIDesktopVersion", "value": "2.128"}],
+        "PBI_ProTooling": ["DevMode"],
+        "tables": [
+            {
+                "name": "Sales",
+                "lineageTag": "5f0c",
+                "modifiedTime": "2024-01-01T00:00:00",
+                "columns": [
+                    {
+                        "name": "Amount",
+                        "dataType": "decimal",
+                        "formatString": "#,0",
+                        "lineageTag": "a1",
+                    }
+                ],
+                "measures": [{"name": "Total", "expression": "SUM(Sales[Amount])"}],
+            }
+        ],
+    },
+}
+
+PRUNED = {
+    "name": "Sales",
+    "model": {
+        "tables": [
+            {
+                "name": "Sales",
+                "columns": [{"name": "Amount", "dataType": "decimal"}],
+                "measures": [{"name": "Total", "expression": "SUM(Sales[Amount])"}],
+            }
+        ],
+    },
+}
+
+
+class BimPrunerTest(unittest.TestCase):
+    def setUp(self):
+        self.pruner = BimPruner(
+            properties=("lineageTag", "annotations", "formatString", "modifiedTime"),
+            prefixes=("PBI_",),
+        )
+        self.content = json.dumps(MODEL, indent=2)
+
+    def test_drops_tooling_metadata_and_minifies(self):
+        pruned, report = self.pruner.prune(self.content)
+        self.assertEqual(json.loads(pruned), PRUNED)
+        self.assertNotIn("\n", pruned)
+        self.assertEqual(
+            report["removed_properties"],
+            {
+                "lineageTag": 2,
+                "annotations": 1,
+                "PBI_ProTooling": 1,
+                "modifiedTime": 1,
+                "formatString": 1,
+            },
+        )
+        self.assertEqual(
+            report["bytes_saved"], report["original_bytes"] - report["pruned_bytes"]
+        )
+        self.assertGreater(report["tokens_saved"], 0)
+
+    def test_keeps_indentation_without_minify(self):
+        pruner = BimPruner(properties=("lineageTag",), prefixes=(), minify=False)
+        pruned, _ = pruner.prune(self.content)
+        self.assertIn('\n  "name": "Sales"', pruned)
+
+    def test_byte_order_mark_is_ignored(self):
+        pruned, _ = self.pruner.prune("\ufeff" + self.content)
+        self.assertEqual(json.loads(pruned), PRUNED)
+
+    def test_invalid_json_is_returned_unchanged(self):
+        pruned, report = self.pruner.prune("not json")
+        self.assertEqual(pruned, "not json")
+        self.assertEqual(report["bytes_saved"], 0)
+        self.assertEqual(report["removed_properties"], {})
+
+    def test_default_properties_include_lineage_and_prefixes(self):
+        pruner = BimPruner(properties=None, prefixes=None)
+        self.assertTrue(pruner.is_pruned("lineageTag"))
+        self.assertTrue(pruner.is_pruned("PBI_QueryOrder"))
+        self.assertFalse(pruner.is_pruned("expression"))
+
+
+if __name__ == "__main__":
+    unittest.main()
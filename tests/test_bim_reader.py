@@ -0,0 +1,79 @@
+import codecs
+import io
+import json
+import unittest
+
+from app.bim_pruner import BimPruner
+from app.bim_reader import BimStreamReader, detect_encoding
+
+MODEL = {
+    "name": "Ventes €",
+    "compatibilityLevel": 1567,
+    "model": {
+        "culture": "fr-FR",
+        "tables": [
+            {
+                "name": "Données",
+                "lineageTag": "5f0c",
+                "columns": [
+                    {"name": "Montant", "dataType": "decimal", "lineageTag": "a1"},
+                    {"name": "Client — nom", "dataType": "string"},
+                ],
+                "measures": [
+                    {
+                        "name": "Total",
+                        "expression": 'SUM ( Données[Montant] ) // "quoted" {}',
+                    }
+                ],
+            },
+            {"name": "Date", "columns": [{"name": "Jour", "dataType": "dateTime"}]},
+        ],
+        "annotations": [{"name": "PBI_QueryOrder", "value": "[]"}],
+        "PBI_ProTooling": ["DevMode"],
+    },
+}
+
+
+class BimStreamReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.pruner = BimPruner(properties=("lineageTag",), prefixes=("PBI_",))
+        self.text = json.dumps(MODEL, ensure_ascii=False, indent=2)
+
+    def assert_matches_json_loads(self, data):
+        expected, removed = self.pruner.prune_data(self.text)
+        for chunk_size in (1, 3, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                reader = BimStreamReader(self.pruner, chunk_size=chunk_size)
+                model, text, report = reader.read_stream(io.BytesIO(data), "x.bim")
+                self.assertEqual(json.loads(text), expected)
+                self.assertEqual(report["removed_properties"], dict(removed))
+                self.assertEqual(report["original_bytes"], len(data))
+                self.assertEqual(model.name, "Ventes €")
+                self.assertEqual(
+                    [table.name for table in model.tables],
+                    ["Données", "Date"],
+                )
+
+    def test_utf16_with_bom(self):
+        data = self.text.encode("utf-16")
+        self.assertEqual(detect_encoding(data), "utf-16")
+        self.assert_matches_json_loads(data)
+
+    def test_utf16_without_bom(self):
+        data = self.text.encode("utf-16-le")
+        self.assertEqual(detect_encoding(data), "utf-16-le")
+        self.assert_matches_json_loads(data)
+
+    def test_utf8_with_bom(self):
+        data = codecs.BOM_UTF8 + self.text.encode("utf-8")
+        self.assertEqual(detect_encoding(data), "utf-8-sig")
+        self.assert_matches_json_loads(data)
+
+    def test_trailing_data_is_rejected(self):
+        reader = BimStreamReader(self.pruner, chunk_size=5)
+        with self.assertRaises(ValueError):
+            reader.read_stream(io.BytesIO(b'{"model": {}} {}'), "x.bim")
+
+
+if __name__ == "__main__":
+    unittest.main()
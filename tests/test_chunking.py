@@ -0,0 +1,137 @@
+import json
+import threading
+import unittest
+
+from app.chunking import MAP_TASK, REDUCE_TASK, ChunkedAnalyzer, ModelChunker
+from app.tokens import estimate_tokens
+
+
+def model_json(tables=12, measures=5):
+    return json.dumps(
+        {
+            "name": "Sales",
+            "model": {
+                "culture": "en-US",
+                "tables": [
+                    {
+                        "name": f"Table {index}",
+                        "columns": [{"name": f"Column {index}", "dataType": "int64"}],
+                        "measures": [
+                            {
+                                "name": f"Measure {index}.{number}",
+                                "expression": f"SUM ( 'Table {index}'[Column {index}] )",
+                            }
+                            for number in range(measures)
+                        ],
+                    }
+                    for index in range(tables)
+                ],
+                "relationships": [
+                    {"fromTable": "Table 1", "toTable": "Table 0", "fromColumn": "Id"}
+                ],
+            },
+        }
+    )
+
+
+class RecordingAnalyzer:
+    """Answers every request with a fixed text, recording the partial counts."""
+
+    def __init__(self, answer="# Report"):
+        self.answer = answer
+        self.merges = []
+        self.parts = []
+        self.map_tasks = []
+        self._lock = threading.Lock()
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        with self._lock:
+            if task.endswith(REDUCE_TASK):
+                self.merges.append(content.count("<!-- Partial report"))
+            else:
+                self.parts.append(content)
+                self.map_tasks.append(task)
+        return self.answer
+
+
+class ModelChunkerTest(unittest.TestCase):
+    def test_small_content_is_one_chunk(self):
+        content = model_json(tables=1)
+        self.assertEqual(ModelChunker(10000).split(content), [content])
+
+    def test_chunks_keep_whole_tables_within_the_budget(self):
+        content = model_json()
+        chunks = ModelChunker(300).split(content)
+        self.assertGreater(len(chunks), 1)
+        names = []
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 300)
+            data = json.loads(chunk)
+            # Model-level properties are repeated in every chunk
+            self.assertEqual(data["model"]["culture"], "en-US")
+            self.assertEqual(len(data["model"]["relationships"]), 1)
+            names += [table["name"] for table in data["model"]["tables"]]
+        self.assertEqual(names, [f"Table {index}" for index in range(12)])
+
+    def test_large_table_is_split_by_measures(self):
+        content = model_json(tables=1, measures=60)
+        chunks = ModelChunker(400).split(content)
+        self.assertGreater(len(chunks), 1)
+        measures = [
+            measure["name"]
+            for chunk in chunks
+            for table in json.loads(chunk)["model"]["tables"]
+            for measure in table.get("measures", [])
+        ]
+        self.assertEqual(measures, [f"Measure 0.{number}" for number in range(60)])
+
+    def test_text_is_split_on_lines(self):
+        content = "".join(f"line {index}\n" for index in range(200))
+        chunks = ModelChunker(50).split(content)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), content)
+
+
+class ChunkedAnalyzerTest(unittest.TestCase):
+    def make_analyzer(self, analyzer, budget):
+        chunked = ChunkedAnalyzer(analyzer, ModelChunker(budget), 2, enabled=True)
+        self.addCleanup(chunked.shutdown)
+        return chunked
+
+    def test_parts_are_analyzed_and_merged(self):
+        analyzer = RecordingAnalyzer()
+        result = self.make_analyzer(analyzer, 300).analyze("Review.", model_json())
+        self.assertEqual(result, "# Report")
+        self.assertGreater(len(analyzer.parts), 1)
+        parts = len(analyzer.parts)
+        self.assertEqual(
+            sorted(analyzer.map_tasks),
+            sorted(
+                "Review." + MAP_TASK.format(part=part, parts=parts)
+                for part in range(1, parts + 1)
+            ),
+        )
+        self.assertEqual(analyzer.merges, [len(analyzer.parts)])
+
+    def test_partials_that_fill_the_budget_are_merged_in_pairs(self):
+        analyzer = RecordingAnalyzer()
+        chunked = self.make_analyzer(analyzer, 100)
+        chunked.reduce("Review.", ["x" * 400] * 7, "gpt-4o-mini")
+        self.assertEqual(sorted(analyzer.merges[:3]), [2, 2, 3])
+        self.assertEqual(analyzer.merges[3:], [3])
+
+    def test_empty_partials_are_skipped(self):
+        analyzer = RecordingAnalyzer()
+        chunked = self.make_analyzer(analyzer, 1000)
+        result = chunked.reduce("Review.", ["# A", None, "", "# B"], "gpt-4o-mini")
+        self.assertEqual(result, "# Report")
+        self.assertEqual(analyzer.merges, [2])
+
+    def test_all_partials_empty_fails(self):
+        chunked = self.make_analyzer(RecordingAnalyzer(), 1000)
+        with self.assertRaises(ValueError):
+            chunked.reduce("Review.", [None, ""], "gpt-4o-mini")
+
+
+if __name__ == "__main__":
+    unittest.main()
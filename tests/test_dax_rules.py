@@ -0,0 +1,79 @@
+import unittest
+
+from app.bim_model import SemanticModel, Table
+from app.dax_rules import DaxScanner, tokenize
+
+
+def sales_model():
+    model = SemanticModel("Sales")
+    model.add_table(
+        Table(
+            {
+                "name": "Sales",
+                "columns": [{"name": "Amount"}, {"name": "Qty"}],
+                "measures": [
+                    {"name": "Total", "expression": "SUM ( Sales[Amount] )"},
+                    {"name": "Per Unit", "expression": "[Total] / SUM ( [Qty] )"},
+                ],
+            }
+        )
+    )
+    model.add_table(Table({"name": "Date", "columns": [{"name": "Date"}]}))
+    return model
+
+
+class DaxScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = DaxScanner()
+
+    def rule_ids(self, expression, model=None):
+        return [
+            rule.rule_id for rule, _ in self.scanner.scan_expression(expression, model)
+        ]
+
+    def test_tokens_skip_comments_and_strings(self):
+        tokens = tokenize('"SUMX(" // FILTER(Sales)\n[Total]')
+        self.assertEqual(
+            [(token.kind, token.text) for token in tokens],
+            [("string", '"SUMX("'), ("column", "[Total]")],
+        )
+
+    def test_anti_patterns(self):
+        cases = {
+            "CALCULATE ( [Total], FILTER ( Sales, Sales[Qty] > 1 ) )": ["DAX001"],
+            "SUMX ( Sales, SUMX ( 'Date', 1 ) )": ["DAX002"],
+            "SUMX ( ALL ( Sales ), Sales[Qty] )": ["DAX003"],
+            "Sales[Amount] / Sales[Qty]": ["DAX004"],
+            "IFERROR ( Sales[Amount], 0 )": ["DAX005"],
+            "EARLIER ( Sales[Qty] )": ["DAX006"],
+            "COUNT ( Sales[Qty] )": ["DAX007"],
+            "DIVIDE ( SUM ( Sales[Amount] ), SUM ( Sales[Qty] ) )": [],
+            "CALCULATE ( [Total], KEEPFILTERS ( Sales[Qty] > 1 ) )": [],
+        }
+        for expression, expected in cases.items():
+            with self.subTest(expression):
+                self.assertEqual(self.rule_ids(expression), expected)
+
+    def test_unqualified_column_and_qualified_measure(self):
+        model = sales_model()
+        self.assertEqual(self.rule_ids("SUM ( [Qty] )", model), ["DAX008"])
+        self.assertEqual(self.rule_ids("Sales[Total] + 1", model), ["DAX009"])
+        # Measures are referenced without a table, and unknown names are left alone
+        self.assertEqual(self.rule_ids("[Total] + [Unknown]", model), [])
+
+    def test_scan_model_reports_the_object(self):
+        findings = self.scanner.scan_model(sales_model())
+        self.assertEqual(
+            [(finding.rule_id, finding.object_ref) for finding in findings],
+            [("DAX004", "Sales[Per Unit]"), ("DAX008", "Sales[Per Unit]")],
+        )
+
+    def test_model_indexes_column_names(self):
+        model = sales_model()
+        self.assertTrue(model.has_column("Qty"))
+        self.assertTrue(model.has_column("Date"))
+        self.assertFalse(model.has_column("Total"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from docx import Document
+
+from app.file_handler import FileHandler
+
+REPORT = """# Model review
+
+Relationships use **single** direction.
+
+| Table | Rows |
+|:------|-----:|
+| Sales | 1,000 |
+| Date | 365 |
+
+- Measures
+  1. Total Sales
+
+```dax
+Total Sales = SUM ( Sales[Amount] )
+```
+"""
+
+
+class DocxWriterTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(FileHandler, "interactive", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.filename = os.path.join(work_dir.name, "report.docx")
+        self.assertTrue(FileHandler.save_as_doc(REPORT, self.filename))
+        self.document = Document(self.filename)
+
+    def test_paragraphs(self):
+        texts = [paragraph.text for paragraph in self.document.paragraphs]
+        self.assertIn("Model review", texts)
+        self.assertIn("Relationships use single direction.", texts)
+        self.assertIn("Total Sales", texts)
+        self.assertTrue(any("SUM ( Sales[Amount] )" in text for text in texts))
+
+    def test_bold_run(self):
+        (paragraph,) = [
+            p for p in self.document.paragraphs if p.text.startswith("Relationships")
+        ]
+        self.assertEqual([run.text for run in paragraph.runs if run.bold], ["single"])
+
+    def test_table(self):
+        (table,) = self.document.tables
+        self.assertEqual(
+            [[cell.text for cell in row.cells] for row in table.rows],
+            [["Table", "Rows"], ["Sales", "1,000"], ["Date", "365"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
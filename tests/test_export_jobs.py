@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from app.export_jobs import ExportManager
+
+
+class BlockingHandler:
+    """Stands in for FileHandler; each save waits until release is set."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.saved = []
+
+    def collect_messages(self):
+        return []
+
+    def show_error(self, title, message):
+        pass
+
+    def save_analysis(self, content, file_format, filename=None):
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise OSError("disk full")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.saved.append(file_format)
+        return True
+
+
+class ExportManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+
+    def manager(self, handler, max_workers=2):
+        manager = ExportManager(handler, max_workers=max_workers)
+        self.addCleanup(manager.shutdown)
+        self.addCleanup(handler.release.set)
+        return manager
+
+    def submit(self, manager, formats):
+        # The writers block until released, so the files can be moved into
+        # the temporary directory before anything is written
+        jobs = manager.submit("# Report\n", formats)
+        for job in jobs:
+            job.filename = os.path.join(self.work_dir.name, f"report.{job.file_format}")
+        return jobs
+
+    def wait(self, manager, count):
+        done = []
+        deadline = time.monotonic() + 5
+        while len(done) < count and time.monotonic() < deadline:
+            done += manager.poll()
+            time.sleep(0.01)
+        return done
+
+    def test_saves_every_format(self):
+        handler = BlockingHandler()
+        manager = self.manager(handler)
+        jobs = self.submit(manager, ["txt", "doc"])
+        handler.release.set()
+
+        done = self.wait(manager, 2)
+        self.assertEqual({job.job_id for job in done}, {job.job_id for job in jobs})
+        self.assertEqual([job.status for job in done], ["saved", "saved"])
+        self.assertEqual(sorted(handler.saved), ["doc", "txt"])
+        self.assertEqual((manager.batch_done, manager.batch_total), (2, 2))
+        self.assertEqual(manager.active, 0)
+
+    def test_writer_error_fails_the_job(self):
+        handler = BlockingHandler(fail=True)
+        manager = self.manager(handler)
+        self.submit(manager, ["txt"])
+        handler.release.set()
+
+        (job,) = self.wait(manager, 1)
+        self.assertEqual(job.status, "failed")
+
+    def test_cancel(self):
+        handler = BlockingHandler()
+        manager = self.manager(handler, max_workers=1)
+        running, queued = self.submit(manager, ["txt", "pdf"])
+        self.assertTrue(handler.started.wait(5))
+
+        manager.cancel()
+        handler.release.set()
+
+        done = {job.job_id: job for job in self.wait(manager, 2)}
+        self.assertEqual(done[queued.job_id].status, "cancelled")
+        self.assertEqual(done[running.job_id].status, "cancelled")
+        # The running writer finished, but its file is removed afterwards
+        self.assertEqual(handler.saved, ["txt"])
+        self.assertFalse(os.path.exists(running.filename))
+
+    def test_default_filename(self):
+        filename = ExportManager.default_filename("sales", "doc")
+        self.assertTrue(os.path.basename(filename).startswith("sales_"))
+        self.assertTrue(filename.endswith(".docx"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from app import markdown_ir
+from app.markdown_ir import BOLD, CODE, ITALIC
+
+REPORT = """| Table | Rows |
+|:------|-----:|
+| **Sales** | 1,000 |
+| `Date` | 365 |
+
+- Measures
+  - [Total Sales](#sales)
+  - *Margin %*
+- Columns
+  1. Key
+  2. Name
+
+```dax
+Total Sales = SUM ( Sales[Amount] )
+-- | not a table
+```
+"""
+
+
+class MarkdownIRTest(unittest.TestCase):
+    def setUp(self):
+        self.document = markdown_ir.MarkdownCache().parse(REPORT)
+
+    def test_blocks(self):
+        self.assertEqual(
+            [block.kind for block in self.document.blocks], ["table", "list", "code"]
+        )
+
+    def test_table(self):
+        table = self.document.blocks[0]
+        self.assertEqual(table.aligns, ["left", "right"])
+        self.assertEqual(table.header, [[("Table", 0, None)], [("Rows", 0, None)]])
+        self.assertEqual(
+            table.rows,
+            [
+                [[("Sales", BOLD, None)], [("1,000", 0, None)]],
+                [[("Date", CODE, None)], [("365", 0, None)]],
+            ],
+        )
+
+    def test_nested_lists(self):
+        outer = self.document.blocks[1]
+        self.assertFalse(outer.ordered)
+        self.assertEqual(len(outer.items), 2)
+        measures, columns = (item[1] for item in outer.items)
+        self.assertFalse(measures.ordered)
+        self.assertEqual(
+            [item[0].spans for item in measures.items],
+            [[("Total Sales", 0, "#sales")], [("Margin %", ITALIC, None)]],
+        )
+        self.assertTrue(columns.ordered)
+        self.assertEqual(columns.start, 1)
+
+    def test_code_keeps_its_text(self):
+        code = self.document.blocks[2]
+        self.assertEqual(code.language, "dax")
+        self.assertEqual(
+            code.text, "Total Sales = SUM ( Sales[Amount] )\n-- | not a table"
+        )
+
+    def test_html(self):
+        html = markdown_ir.to_html(self.document)
+        self.assertIn('<td style="text-align:left;"><strong>Sales</strong></td>', html)
+        self.assertIn(
+            '<li>Measures\n<ul>\n<li><a href="#sales">Total Sales</a></li>', html
+        )
+        self.assertIn("<li>Columns\n<ol>\n<li>Key</li>", html)
+        self.assertIn(
+            '<pre><code class="language-dax">Total Sales = SUM ( Sales[Amount] )\n'
+            "-- | not a table\n</code></pre>",
+            html,
+        )
+
+    def test_text(self):
+        self.assertEqual(
+            markdown_ir.to_text(self.document),
+            "Table | Rows\n"
+            "------+------\n"
+            "Sales | 1,000\n"
+            "Date  | 365\n"
+            "\n"
+            "- Measures\n"
+            "  - Total Sales (#sales)\n"
+            "  - Margin %\n"
+            "- Columns\n"
+            "  1. Key\n"
+            "  2. Name\n"
+            "\n"
+            "    Total Sales = SUM ( Sales[Amount] )\n"
+            "    -- | not a table\n",
+        )
+
+    def test_text_of_lists_parses_back_to_itself(self):
+        lists = markdown_ir.to_text(self.document).split("\n\n")[1] + "\n"
+        reparsed = markdown_ir.MarkdownCache().parse(lists)
+        self.assertEqual(markdown_ir.to_text(reparsed), lists)
+
+
+class MarkdownCacheTest(unittest.TestCase):
+    def test_same_text_is_parsed_once(self):
+        cache = markdown_ir.MarkdownCache(max_entries=2)
+        first = cache.parse(REPORT)
+        self.assertIs(cache.parse(REPORT), first)
+        cache.parse("# Other")
+        third = cache.parse("# Third")
+        # The least recently used document was evicted
+        self.assertIsNot(cache.parse(REPORT), first)
+        cache.clear()
+        self.assertIsNot(cache.parse("# Third"), third)
+
+    def test_windows_line_endings_and_tabs(self):
+        document = markdown_ir.MarkdownCache().parse("- a\r\n\t- b\r\n")
+        self.assertEqual(markdown_ir.to_text(document), "- a\n  - b\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+sys.path.insert(0, os.path.abspath(BENCHMARKS_DIR))
+
+import model_generator  # noqa: E402
+from app.bim_model import SemanticModel  # noqa: E402
+from app.bim_reader import BimStreamReader  # noqa: E402
+
+
+class ModelGeneratorTest(unittest.TestCase):
+    def test_table_count_includes_date(self):
+        model = model_generator.ModelGenerator(tables=6, seed=3).build()
+        names = [table["name"] for table in model["model"]["tables"]]
+        self.assertEqual(len(names), 6)
+        self.assertIn("Date", names)
+
+    def test_same_seed_same_model(self):
+        first = model_generator.ModelGenerator(tables=5, seed=7).build()
+        second = model_generator.ModelGenerator(tables=5, seed=7).build()
+        self.assertEqual(first, second)
+        self.assertNotEqual(
+            first, model_generator.ModelGenerator(tables=5, seed=8).build()
+        )
+
+    def test_too_few_tables(self):
+        with self.assertRaises(ValueError):
+            model_generator.ModelGenerator(tables=model_generator.MIN_TABLES - 1)
+
+    def test_written_model_parses(self):
+        data = model_generator.ModelGenerator(tables=4, columns=5, seed=1).build()
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = model_generator.write_model(
+                os.path.join(work_dir, "model.bim"), tables=4, columns=5, seed=1
+            )
+            model, _, _ = BimStreamReader().read(path)
+        self.assertEqual(
+            [table.name for table in model.tables],
+            [table.name for table in SemanticModel.from_dict(data).tables],
+        )
+        self.assertTrue(model.relationships)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import unittest
+
+from app.bim_model import parse_bim
+from app.local_checks import LocalChecker
+from app.model_rules import ModelRule, ModelRuleEngine
+
+MODEL = {
+    "name": "Sales",
+    "model": {
+        "tables": [
+            {
+                "name": "Sales",
+                "description": "Order lines",
+                "columns": [
+                    {
+                        "name": "CustomerKey",
+                        "dataType": "double",
+                        "summarizeBy": "sum",
+                        "description": "Customer",
+                    },
+                    {
+                        "name": "Share",
+                        "type": "calculated",
+                        "expression": "SUM ( Sales[Amount] )",
+                        "isHidden": True,
+                    },
+                    {
+                        "name": "Line Total",
+                        "type": "calculated",
+                        "expression": "Sales[Qty] * Sales[Price]",
+                        "isHidden": True,
+                    },
+                ],
+            },
+            {
+                "name": "Customer",
+                "columns": [
+                    {"name": "CustomerKey", "dataType": "int64", "isHidden": True},
+                    {"name": "Name", "dataType": "string"},
+                ],
+            },
+            {"name": "Notes", "columns": [{"name": "Text"}], "isHidden": True},
+            {"name": "LocalDateTable_1a2b", "columns": [{"name": "Date"}]},
+        ],
+        "relationships": [
+            {
+                "fromTable": "Sales",
+                "fromColumn": "CustomerKey",
+                "toTable": "Customer",
+                "toColumn": "CustomerKey",
+                "crossFilteringBehavior": "bothDirections",
+            }
+        ],
+    },
+}
+
+
+class ModelRuleEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.model = parse_bim(json.dumps(MODEL))
+
+    def findings(self):
+        return {
+            (finding.rule_id, finding.object_ref)
+            for finding in ModelRuleEngine().run(self.model)
+        }
+
+    def test_rules(self):
+        relationship = "Sales[CustomerKey] -> Customer[CustomerKey]"
+        self.assertEqual(
+            self.findings(),
+            {
+                ("MDL001", relationship),
+                ("MDL002", "Sales[Share]"),
+                ("MDL003", "Sales[CustomerKey]"),
+                ("MDL004", "'Customer'"),
+                ("MDL005", "Sales"),
+                ("MDL006", "Sales[CustomerKey]"),
+                ("MDL007", "'Notes'"),
+                ("MDL009", "Sales[CustomerKey]"),
+            },
+        )
+
+    def test_engine_only_runs_the_given_rules(self):
+        rule = ModelRule(
+            "T001", "model", "info", "measure", "Any measure", lambda m, i: "found"
+        )
+        self.assertEqual(ModelRuleEngine([rule]).run(self.model), [])
+
+    def test_unknown_scope_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ModelRule("T001", "model", "info", "partition", "x", lambda o, i: None)
+
+
+class LocalCheckerTest(unittest.TestCase):
+    def test_findings_are_split_by_task(self):
+        checker = LocalChecker()
+        findings = checker.run(parse_bim(json.dumps(MODEL)))
+        section = checker.task_section(findings, "missing")
+        self.assertTrue(section.startswith("## Automated Completeness Checks"))
+        self.assertIn("'Notes'", section)
+        self.assertNotIn("MDL001", section)
+        self.assertIsNone(checker.task_section(findings, "general"))
+        self.assertEqual(checker.task_hints(findings, "general"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
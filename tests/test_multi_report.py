@@ -0,0 +1,77 @@
+import unittest
+
+from app.controller import Controller
+from app.multi_report import REPORT_END, REPORT_START, build_task, split_reports
+
+
+def section(name, text, end=True):
+    closing = f"\n{REPORT_END.format(name=name)}" if end else ""
+    return f"{REPORT_START.format(name=name)}\n{text}{closing}\n"
+
+
+class FakeAnalyzer:
+    def __init__(self, response):
+        self.response = response
+        self.tasks = []
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        self.tasks.append(task)
+        return self.response
+
+
+class SplitReportsTest(unittest.TestCase):
+    def test_complete_reports(self):
+        text = section("general", "# General") + section("dax_review", "# DAX")
+        self.assertEqual(
+            split_reports(text),
+            {"general": ("# General", True), "dax_review": ("# DAX", True)},
+        )
+
+    def test_truncated_report_is_incomplete(self):
+        text = section("general", "# General") + section("dax_review", "# DA", False)
+        self.assertEqual(split_reports(text)["dax_review"], ("# DA", False))
+
+    def test_report_started_without_closing_the_previous_one(self):
+        text = section("general", "# General", False) + section("dax_review", "# DAX")
+        self.assertEqual(
+            split_reports(text),
+            {"general": ("# General", False), "dax_review": ("# DAX", True)},
+        )
+
+    def test_no_markers(self):
+        self.assertEqual(split_reports("Sorry, I can't help with that."), {})
+
+    def test_task_lists_every_marker(self):
+        task = build_task({"general": "Describe it.", "dax_review": "Review DAX."})
+        for name in ("general", "dax_review"):
+            self.assertIn(REPORT_START.format(name=name), task)
+            self.assertIn(REPORT_END.format(name=name), task)
+
+
+class MultiReportFallbackTest(unittest.TestCase):
+    TASKS = {
+        name: (f"Task {name}.", None, None, None)
+        for name in ("general", "dax_review", "naming")
+    }
+
+    def run_multi_report(self, response):
+        controller = Controller(ai_analyzer=FakeAnalyzer(response))
+        try:
+            return controller._run_multi_report(dict(self.TASKS), "{}", "gpt-4o-mini")
+        finally:
+            controller.chunked_analyzer.shutdown()
+
+    def test_missing_and_truncated_reports_fall_back(self):
+        response = section("general", "# General") + section("naming", "# Nam", False)
+        self.assertEqual(self.run_multi_report(response), {"general": "# General"})
+
+    def test_empty_report_falls_back(self):
+        response = section("general", "") + section("naming", "# Naming")
+        self.assertEqual(self.run_multi_report(response), {"naming": "# Naming"})
+
+    def test_empty_response_falls_back(self):
+        self.assertEqual(self.run_multi_report(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from app.controller import Controller
+from app.pbix_reader import LAYOUT_MEMBER, MODEL_MEMBER, PbixReader
+from app.response_cache import ResponseCache
+
+MODEL = {
+    "name": "Sales",
+    "model": {
+        "tables": [{"name": "Sales", "columns": [{"name": "Amount"}]}],
+    },
+}
+
+
+def layout(visual_type):
+    config = {
+        "singleVisual": {
+            "visualType": visual_type,
+            "projections": {"Values": [{"queryRef": "Sales.Amount"}]},
+        }
+    }
+    return {
+        "sections": [
+            {
+                "displayName": "Overview",
+                "visualContainers": [{"config": json.dumps(config)}],
+            }
+        ]
+    }
+
+
+def write_pbix(path, report=None, model=None):
+    with zipfile.ZipFile(path, "w") as archive:
+        if report is not None:
+            archive.writestr(LAYOUT_MEMBER, json.dumps(report).encode("utf-16-le"))
+        if model is not None:
+            archive.writestr(MODEL_MEMBER, json.dumps(model).encode("utf-16-le"))
+    return path
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze(self, task, content, model="gpt-4o-mini", on_delta=None):
+        self.calls += 1
+        return f"# Report {self.calls}"
+
+
+class PbixReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "Sales.pbix")
+
+    def test_layout_is_summarised(self):
+        write_pbix(self.path, layout("barChart"))
+        model, content, report = PbixReader().read(self.path)
+        expected = {
+            "pages": [
+                {
+                    "name": "Overview",
+                    "visuals": [{"type": "barChart", "fields": ["Sales.Amount"]}],
+                }
+            ]
+        }
+        self.assertEqual(json.loads(content), {"name": "Sales", "report": expected})
+        self.assertIsNone(report)
+        self.assertEqual(model.tables, [])
+        self.assertEqual(model.report, expected)
+
+    def test_model_and_layout(self):
+        write_pbix(self.path, layout("barChart"), MODEL)
+        model, content, report = PbixReader().read(self.path)
+        data = json.loads(content)
+        self.assertEqual(data["model"]["tables"][0]["name"], "Sales")
+        self.assertEqual(data["report"], model.report)
+        self.assertEqual([table.name for table in model.tables], ["Sales"])
+        self.assertIsNotNone(report)
+
+    def test_empty_archive_is_rejected(self):
+        write_pbix(self.path)
+        with self.assertRaises(ValueError):
+            PbixReader().read(self.path)
+
+
+@mock.patch("app.settings.TELEMETRY_ENABLED", False)
+class IncrementalLayoutTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "Sales.pbix")
+        self.analyzer = FakeAnalyzer()
+        self.controller = Controller(
+            ai_analyzer=self.analyzer, response_cache=ResponseCache(enabled=False)
+        )
+        self.addCleanup(self.controller.chunked_analyzer.shutdown)
+
+    def run_analysis(self, report, model=None):
+        write_pbix(self.path, report, model)
+        calls = self.analyzer.calls
+        results = dict(
+            self.controller.process_file(
+                self.path, concurrent=False, incremental=True, multi_report=False
+            )
+        )
+        return results, self.analyzer.calls - calls
+
+    def test_layout_change_reruns_every_task_of_a_report_only_file(self):
+        results, calls = self.run_analysis(layout("barChart"))
+        self.assertEqual(calls, len(results))
+        self.assertEqual(self.run_analysis(layout("barChart"))[1], 0)
+        self.assertEqual(self.run_analysis(layout("pieChart"))[1], len(results))
+
+    def test_layout_change_reruns_the_report_tasks(self):
+        self.run_analysis(layout("barChart"), MODEL)
+        self.run_analysis(layout("pieChart"), MODEL)
+        self.assertEqual(
+            sorted(
+                change.ref
+                for change in self.controller.last_diff.changes
+                if change.kind == "report"
+            ),
+            ["layout"],
+        )
+        affected = self.controller.last_diff.affected_tasks(
+            self.controller.analysis_tasks()
+        )
+        self.assertIn("report_ideas", affected)
+        self.assertIn("analysis_ideas", affected)
+        self.assertNotIn("dax", affected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.file_handler import FileHandler
+
+REPORT = """# Model review
+
+Relationships use **single** direction and `Date` is marked as a date table.
+
+| Table | Rows |
+|:------|-----:|
+| Sales | 1,000 |
+
+- Measures
+  1. Total Sales
+
+```dax
+Total Sales = SUM ( Sales[Amount] )
+```
+"""
+
+
+class Fpdf2EngineTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(FileHandler, "interactive", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        FileHandler.collect_messages()
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+
+    def test_writes_a_pdf(self):
+        filename = os.path.join(self.work_dir.name, "report.pdf")
+        self.assertTrue(FileHandler.save_as_pdf(REPORT, filename, engine="fpdf2"))
+        with open(filename, "rb") as f:
+            self.assertEqual(f.read(5), b"%PDF-")
+        self.assertEqual(FileHandler.collect_messages()[0][0], "info")
+
+    def test_text_outside_latin1(self):
+        filename = os.path.join(self.work_dir.name, "unicode.pdf")
+        content = "## Notes\n\n- “Quoted” — ✓ done\n- 売上 total\n"
+        self.assertTrue(FileHandler.save_as_pdf(content, filename, engine="fpdf2"))
+        self.assertGreater(os.path.getsize(filename), 0)
+
+    def test_unknown_engine(self):
+        filename = os.path.join(self.work_dir.name, "report.pdf")
+        self.assertFalse(FileHandler.save_as_pdf(REPORT, filename, engine="latex"))
+        self.assertFalse(os.path.exists(filename))
+        self.assertEqual(FileHandler.collect_messages()[0][0], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import time
+import unittest
+
+import httpx
+import openai
+
+from app.rate_limiter import RateLimiter, RequestScheduler
+
+
+def rate_limit_error(code=None, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    body = {"message": "Rate limit reached", "type": "requests", "code": code}
+    return openai.RateLimitError("Rate limit reached", response=response, body=body)
+
+
+class RequestSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RequestScheduler(
+            RateLimiter({"default": (10000, 10000000)}), max_retries=3, base_delay=0
+        )
+
+    def test_waits_out_retry_after_then_retries(self):
+        calls = []
+
+        def request():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise rate_limit_error(headers={"retry-after-ms": "200"})
+            return "report"
+
+        self.assertEqual(self.scheduler.run("gpt-4o-mini", 100, request), "report")
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.2)
+
+    def test_does_not_retry_exhausted_quota(self):
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise rate_limit_error(code="insufficient_quota")
+
+        with self.assertRaises(openai.RateLimitError):
+            self.scheduler.run("gpt-4o-mini", 100, request)
+        self.assertEqual(len(calls), 1)
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise rate_limit_error(headers={"retry-after": "0"})
+
+        with self.assertRaises(openai.RateLimitError):
+            self.scheduler.run("gpt-4o-mini", 100, request)
+        self.assertEqual(len(calls), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
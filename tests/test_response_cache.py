@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.response_cache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def make_cache(self, max_bytes=1024, enabled=True):
+        return ResponseCache(self.directory, max_bytes=max_bytes, enabled=enabled)
+
+    def key(self, content, task="Describe the model."):
+        return ResponseCache.make_key(
+            ResponseCache.content_hash(content), task, "\nUse Markdown.", "gpt-4o-mini"
+        )
+
+    def test_key_depends_on_content_task_and_model(self):
+        key = self.key("{}")
+        self.assertEqual(key, self.key("{}"))
+        self.assertNotEqual(key, self.key("{ }"))
+        self.assertNotEqual(key, self.key("{}", "Review the DAX."))
+        self.assertNotEqual(
+            key,
+            ResponseCache.make_key(
+                ResponseCache.content_hash("{}"),
+                "Describe the model.",
+                "\nUse Markdown.",
+                "gpt-4o",
+            ),
+        )
+
+    def test_round_trip_survives_a_new_instance(self):
+        self.make_cache().put(self.key("{}"), "# Überblick")
+        self.assertEqual(self.make_cache().get(self.key("{}")), "# Überblick")
+        self.assertIsNone(self.make_cache().get(self.key("{ }")))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.make_cache(max_bytes=25)
+        for name in ("a", "b", "c"):
+            cache.put(self.key(name), name * 10)
+        self.assertIsNone(cache.get(self.key("a")))
+        self.assertEqual(cache.get(self.key("b")), "b" * 10)
+        cache.put(self.key("d"), "d" * 10)
+        # b was read after c was written, so c goes first
+        self.assertIsNone(cache.get(self.key("c")))
+        self.assertEqual(cache.get(self.key("b")), "b" * 10)
+
+    def test_empty_and_oversized_values_are_not_stored(self):
+        cache = self.make_cache(max_bytes=5)
+        cache.put(self.key("a"), "")
+        cache.put(self.key("b"), "too long")
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_disabled_cache_does_nothing(self):
+        cache = self.make_cache(enabled=False)
+        cache.put(self.key("{}"), "# Report")
+        self.assertIsNone(cache.get(self.key("{}")))
+        self.assertFalse(os.listdir(self.directory))
+
+    def test_invalidate_and_clear(self):
+        cache = self.make_cache()
+        cache.put(self.key("a"), "A")
+        cache.put(self.key("b"), "B")
+        cache.invalidate(self.key("a"))
+        self.assertIsNone(cache.get(self.key("a")))
+        cache.clear()
+        self.assertIsNone(cache.get(self.key("b")))
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import unittest
+
+from app.bim_model import Table, parse_bim
+from app.task_context import ALL_FIELDS, TASK_CONTEXT, ContextSlicer
+
+MODEL = {
+    "name": "Sales",
+    "model": {
+        "tables": [
+            {
+                "name": "Sales",
+                "description": "One row per order line",
+                "columns": [
+                    {"name": "Amount", "dataType": "decimal", "description": "Net"},
+                    {
+                        "name": "Margin",
+                        "type": "calculated",
+                        "dataType": "decimal",
+                        "expression": "Sales[Amount] * 0.1",
+                    },
+                ],
+                "measures": [{"name": "Total", "expression": "SUM ( Sales[Amount] )"}],
+                "partitions": [
+                    {"name": "Sales", "source": {"type": "m", "expression": "let"}}
+                ],
+            },
+            {
+                "name": "Calendar",
+                "partitions": [
+                    {
+                        "name": "Calendar",
+                        "source": {
+                            "type": "calculated",
+                            "expression": "CALENDARAUTO()",
+                        },
+                    }
+                ],
+            },
+        ],
+        "relationships": [
+            {
+                "fromTable": "Sales",
+                "fromColumn": "Date",
+                "toTable": "Calendar",
+                "toColumn": "Date",
+            }
+        ],
+    },
+}
+
+
+class ContextSlicerTest(unittest.TestCase):
+    def setUp(self):
+        self.model = parse_bim(json.dumps(MODEL))
+        self.slicer = ContextSlicer(self.model)
+
+    def render(self, task_name):
+        return json.loads(self.slicer.render(task_name))
+
+    def test_task_without_selector_gets_the_whole_file(self):
+        self.assertIsNone(self.slicer.render("general"))
+        self.assertIsNone(self.slicer.render("unknown"))
+
+    def test_dax_gets_only_calculations(self):
+        self.assertEqual(
+            self.render("dax")["tables"],
+            [
+                {
+                    "name": "Sales",
+                    "columns": [
+                        {
+                            "name": "Margin",
+                            "dataType": "decimal",
+                            "expression": "Sales[Amount] * 0.1",
+                        }
+                    ],
+                    "measures": [
+                        {"name": "Total", "expression": "SUM ( Sales[Amount] )"}
+                    ],
+                },
+                {
+                    "name": "Calendar",
+                    "partitions": [
+                        {
+                            "name": "Calendar",
+                            "source": {
+                                "type": "calculated",
+                                "expression": "CALENDARAUTO()",
+                            },
+                        }
+                    ],
+                },
+            ],
+        )
+
+    def test_fields_are_limited_to_the_selector(self):
+        model = self.render("model")
+        self.assertEqual(model["scope"], TASK_CONTEXT["model"]["scope"])
+        sales = model["tables"][0]
+        self.assertEqual(sales["description"], "One row per order line")
+        self.assertNotIn("measures", sales)
+        self.assertNotIn("expression", sales["columns"][1])
+        self.assertEqual(model["relationships"][0]["toTable"], "Calendar")
+
+    def test_report_layout_only_reaches_report_tasks(self):
+        self.model.report = {"pages": [{"name": "Overview"}]}
+        slicer = ContextSlicer(self.model)
+        for task_name, selector in TASK_CONTEXT.items():
+            if selector is None:
+                continue
+            with self.subTest(task_name):
+                data = json.loads(slicer.render(task_name))
+                self.assertEqual("report" in data, selector.get("report") == ALL_FIELDS)
+
+    def test_tables_without_selected_objects_are_left_out(self):
+        self.model.add_table(Table({"name": "Notes", "columns": [{"name": "Text"}]}))
+        slicer = ContextSlicer(self.model)
+        dax = json.loads(slicer.render("dax"))
+        self.assertEqual(
+            [table["name"] for table in dax["tables"]], ["Sales", "Calendar"]
+        )
+        # Selectors with table fields keep every table
+        missing = json.loads(slicer.render("missing"))
+        self.assertIn("Notes", [table["name"] for table in missing["tables"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app import telemetry
+
+
+def finished_request(name, prompt_tokens=100, cached_tokens=0):
+    record = telemetry.RequestRecord(name, "gpt-4o-mini", False, 2048, 0.0)
+    record.start_attempt()
+    record.set_usage(
+        SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=50,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        )
+    )
+    record.finished_at = record.sent_at + 0.5
+    telemetry.record_request(record)
+    return record
+
+
+class TelemetryRunTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def make_run(self):
+        return telemetry.TelemetryRun(
+            "model.bim", "gpt-4o-mini", self.directory, enabled=True
+        )
+
+    def test_requests_are_attributed_to_their_task(self):
+        run = self.make_run()
+        with telemetry.task(run, "dax"):
+            finished_request("dax", cached_tokens=64)
+        with telemetry.task(run, "model"):
+            finished_request("model")
+        run.add_task("general", "cache")
+
+        summary = run.summary()
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual(summary["prompt_tokens"], 200)
+        self.assertEqual(summary["cached_tokens"], 64)
+        self.assertEqual(summary["tasks"]["dax"]["requests"], 1)
+        self.assertEqual(summary["tasks"]["general"]["source"], "cache")
+        self.assertEqual(summary["tasks"]["general"]["requests"], 0)
+        self.assertIn("1 from cache", run.summary_text())
+
+    def test_pool_workers_keep_the_task(self):
+        run = self.make_run()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with telemetry.task(run, "dax"):
+                names = [
+                    telemetry.submit(
+                        executor, lambda: telemetry.current().task
+                    ).result()
+                    for _ in range(2)
+                ]
+        self.assertEqual(names, ["dax", "dax"])
+
+    def test_batch_request_is_not_counted_as_a_task(self):
+        run = self.make_run()
+        with telemetry.task(run, "multi_report", telemetry.BATCH):
+            finished_request("multi_report")
+        run.add_task("dax", "multi-report request")
+        run.add_task("model", "multi-report request")
+
+        summary = run.summary()
+        self.assertEqual(sorted(summary["tasks"]), ["dax", "model"])
+        self.assertEqual(summary["batches"]["multi_report"]["requests"], 1)
+        self.assertEqual(summary["requests"], 1)
+        self.assertIn("2 from multi-report request", run.summary_text())
+
+    def test_runs_of_the_same_file_keep_their_own_files(self):
+        paths = {self.make_run().finish() for _ in range(3)}
+        self.assertEqual(len(paths), 3)
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["file"], "model.bim")
+
+    def test_disabled_run_writes_nothing(self):
+        run = telemetry.TelemetryRun(
+            "model.bim", "gpt-4o-mini", self.directory, enabled=False
+        )
+        self.assertIsNone(run.finish())
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,38 @@
 import os
+
 from fpdf import FPDF
+from fpdf.fonts import FontFace
+
+from app import markdown_ir
+from app.markdown_ir import BOLD, BREAK, CODE, ITALIC
+
+HEADING_LEVELS = {1: "heading1", 2: "heading2", 3: "heading3"}
+
+
+# Typographic characters common in AI output, spelled in ASCII for Courier
+ASCII_PUNCTUATION = str.maketrans(
+    {
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2013": "-",
+        "\u2014": "--",
+        "\u2026": "...",
+        "\u2192": "->",
+        "\u2190": "<-",
+        "\u2264": "<=",
+        "\u2265": ">=",
+        "\u2260": "!=",
+        "\u00a0": " ",
+    }
+)
+
+
+def _latin1(text):
+    # The built-in Courier font only covers Latin-1
+    text = text.translate(ASCII_PUNCTUATION)
+    return text.encode("latin-1", "replace").decode("latin-1")
 
 
 class PDFSettings(FPDF):
@@ -29,19 +62,29 @@ class PDFSettings(FPDF):
             "assets",
             "fonts",
         )
-        pdf.add_font(
-            "Poppins", "", os.path.join(fonts_dir, "Poppins-Regular.ttf"), uni=True
-        )
-        pdf.add_font(
-            "Poppins", "B", os.path.join(fonts_dir, "Poppins-Bold.ttf"), uni=True
-        )
-        pdf.add_font(
-            "Poppins", "I", os.path.join(fonts_dir, "Poppins-Italic.ttf"), uni=True
-        )
+        pdf.add_font("Poppins", "", os.path.join(fonts_dir, "Poppins-Regular.ttf"))
+        pdf.add_font("Poppins", "B", os.path.join(fonts_dir, "Poppins-Bold.ttf"))
+        pdf.add_font("Poppins", "I", os.path.join(fonts_dir, "Poppins-Italic.ttf"))
         pdf.set_font("Poppins", size=12)
+        pdf.set_auto_page_break(True, margin=15)
         pdf.add_page()
         return pdf
 
+    @staticmethod
+    def save(content, filename):
+        """Render Markdown content to a PDF file."""
+        pdf = PDFSettings.setup_pdf()
+        PDFSettings.render_document(
+            pdf, markdown_ir.parse(content), PDFSettings.get_styling_config()
+        )
+        pdf.output(filename)
+
+    @staticmethod
+    def render_document(pdf, document, style):
+        """Draw the blocks of a parsed Markdown document (app/markdown_ir.py)."""
+        for block in document.blocks:
+            PDFSettings.render_block(pdf, block, style)
+
     @staticmethod
     def get_styling_config():
         return {
@@ -52,15 +95,18 @@ class PDFSettings(FPDF):
                 "heading2": (102, 84, 245),
                 "heading3": (102, 84, 245),
                 "default_text": (11, 12, 24),
+                "link": (102, 84, 245),
                 "table_header_bg": (242, 179, 71),
                 "table_header_text": (255, 255, 255),
                 "table_row_bg": (245, 245, 245),
                 "code_block_bg": (235, 235, 235),
+                "rule": (200, 200, 200),
             },
             "fonts": {
                 "heading1": {"name": "Poppins", "style": "B", "size": 28},
                 "heading2": {"name": "Poppins", "style": "B", "size": 22},
                 "heading3": {"name": "Poppins", "style": "B", "size": 18},
+                "heading4": {"name": "Poppins", "style": "B", "size": 14},
                 "normal": {"name": "Poppins", "style": "", "size": 12},
                 "bold": {"name": "Poppins", "style": "B", "size": 12},
                 "code": {"name": "Courier", "style": "", "size": 10},
@@ -80,182 +126,151 @@ class PDFSettings(FPDF):
         }
 
     @staticmethod
-    def process_markdown(content):
-        import re
-        import markdown2
-
-        content = re.sub(r"\n{3,}", "\n\n", content)
-        html_content = markdown2.markdown(
-            content,
-            extras=[
-                "fenced-code-blocks",
-                "tables",
-                "code-friendly",
-                "numbering",
-                "cuddled-lists",
-            ],
-        )
-        return html_content
+    def set_font_config(pdf, font_config):
+        pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
 
     @staticmethod
-    def render_section(pdf, section, style):
-        import re
-
-        if not section.strip():
-            return
+    def write_spans(pdf, spans, style, font_key="normal", line_height=None):
+        """Write inline spans with bold, italic, code and link runs, wrapping lines."""
+        line_height = line_height or style["line_height"]
+        base = style["fonts"][font_key]
+        for text, flags, href in spans:
+            if flags & BREAK:
+                pdf.ln(line_height)
+                continue
+            if flags & CODE:
+                font = style["fonts"]["code"]
+                pdf.set_font(font["name"], "", base["size"] - 1)
+                text = _latin1(text)
+            else:
+                font_style = base["style"]
+                if flags & BOLD:
+                    font_style = "B"
+                elif flags & ITALIC and "B" not in font_style:
+                    font_style = "I"
+                pdf.set_font(base["name"], font_style, base["size"])
+            if href:
+                pdf.set_text_color(*style["colors"]["link"])
+                pdf.write(line_height, text, link=href)
+                pdf.set_text_color(*style["colors"]["default_text"])
+            else:
+                pdf.write(line_height, text)
+        PDFSettings.set_font_config(pdf, base)
 
-        if section.startswith("<h1"):
-            text = re.sub(r"<h1.*?>(.*?)</h1>", r"\1", section)
-            pdf.ln(style["spacing"]["before_h1"])
-            pdf.set_text_color(*style["colors"]["heading1"])
-            font_config = style["fonts"]["heading1"]
-            pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
-            pdf.write(10, text)
-            pdf.ln(style["spacing"]["after_h1"])
-            pdf.set_text_color(*style["colors"]["default_text"])
+    @staticmethod
+    def render_block(pdf, block, style):
+        kind = block.kind
+        pdf.set_text_color(*style["colors"]["default_text"])
 
-        elif section.startswith("<h2"):
-            text = re.sub(r"<h2.*?>(.*?)</h2>", r"\1", section)
-            pdf.ln(style["spacing"]["before_h2"])
-            pdf.set_text_color(*style["colors"]["heading2"])
-            font_config = style["fonts"]["heading2"]
-            pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
-            pdf.write(10, text)
-            pdf.ln(style["spacing"]["after_h2"])
+        if kind == "heading" and block.level in HEADING_LEVELS:
+            key = HEADING_LEVELS[block.level]
+            level = block.level
+            pdf.ln(style["spacing"][f"before_h{level}"])
+            pdf.set_text_color(*style["colors"][key])
+            PDFSettings.set_font_config(pdf, style["fonts"][key])
+            pdf.multi_cell(0, 10 + 2 * (3 - level), markdown_ir.plain_text(block.spans))
+            pdf.ln(style["spacing"][f"after_h{level}"] - 10)
             pdf.set_text_color(*style["colors"]["default_text"])
 
-        elif section.startswith("<h3"):
-            text = re.sub(r"<h3.*?>(.*?)</h3>", r"\1", section)
-            pdf.ln(style["spacing"]["before_h3"])
-            pdf.set_text_color(*style["colors"]["heading3"])
-            font_config = style["fonts"]["heading3"]
-            pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
-            pdf.write(10, text)
-            pdf.ln(style["spacing"]["after_h3"])
-            pdf.set_text_color(*style["colors"]["default_text"])
+        elif kind == "heading":
+            pdf.ln(style["paragraph_spacing"])
+            PDFSettings.set_font_config(pdf, style["fonts"]["heading4"])
+            pdf.multi_cell(0, 8, markdown_ir.plain_text(block.spans))
+            pdf.ln(style["paragraph_spacing"])
 
-        elif section.startswith("<pre><code>"):
-            code = section.replace("<pre><code>", "").replace("</code></pre>", "")
+        elif kind == "code":
             pdf.set_fill_color(*style["colors"]["code_block_bg"])
-            font_config = style["fonts"]["code"]
-            pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
-            for line in code.split("\n"):
-                pdf.set_x(15)
-                pdf.cell(0, 5, line, 0, 1, fill=True)
-            font_config = style["fonts"]["normal"]
-            pdf.set_font(font_config["name"], font_config["style"], font_config["size"])
+            PDFSettings.set_font_config(pdf, style["fonts"]["code"])
+            pdf.set_x(pdf.l_margin + 5)
+            pdf.multi_cell(
+                pdf.epw - 5,
+                5,
+                _latin1(block.text),
+                fill=True,
+                new_x="LMARGIN",
+                new_y="NEXT",
+            )
+            PDFSettings.set_font_config(pdf, style["fonts"]["normal"])
             pdf.ln(style["paragraph_spacing"])
 
-        elif section.startswith("<ul>") or section.startswith("<ol>"):
-            PDFSettings.render_list(pdf, section, style)
+        elif kind == "list":
+            PDFSettings.render_list(pdf, block, style)
 
-        elif section.startswith("<p>"):
-            text = re.sub(r"<p>(.*?)</p>", r"\1", section)
-            text = re.sub(r"<[^>]+>", "", text)
-            if text.strip():
-                normal_font = style["fonts"]["normal"]
-                bold_font = style["fonts"]["bold"]
-                pdf.set_font(
-                    normal_font["name"], normal_font["style"], normal_font["size"]
-                )
-                parts = re.split(r"(\*\*.*?\*\*)", text)
-                for i, part in enumerate(parts):
-                    if i % 2 == 1:
-                        pdf.set_font(
-                            bold_font["name"], bold_font["style"], bold_font["size"]
-                        )
-                        pdf.write(style["line_height"], part.replace("**", ""))
-                        pdf.set_font(
-                            normal_font["name"],
-                            normal_font["style"],
-                            normal_font["size"],
-                        )
-                    else:
-                        pdf.write(style["line_height"], part)
-                pdf.ln(style["paragraph_spacing"])
+        elif kind == "table":
+            PDFSettings.render_table(pdf, block, style)
 
-        elif section.startswith("<table>"):
-            rows = re.findall(r"<tr>(.*?)</tr>", section, re.DOTALL)
-            is_header = True
-            for row in rows:
-                cells = re.findall(r"<t[hd]>(.*?)</t[hd]>", row)
-                cell_width = 190 / max(len(cells), 1)
-                if is_header:
-                    pdf.set_fill_color(*style["colors"]["table_header_bg"])
-                    pdf.set_text_color(*style["colors"]["table_header_text"])
-                    header_font = style["fonts"]["table_header"]
-                    pdf.set_font(
-                        header_font["name"], header_font["style"], header_font["size"]
-                    )
-                else:
-                    pdf.set_fill_color(*style["colors"]["table_row_bg"])
-                    pdf.set_text_color(*style["colors"]["default_text"])
-                    cell_font = style["fonts"]["table_cell"]
-                    pdf.set_font(
-                        cell_font["name"], cell_font["style"], cell_font["size"]
-                    )
-                for cell in cells:
-                    text = re.sub(r"<[^>]+>", "", cell)
-                    pdf.cell(cell_width, 8, text, 1, 0, fill=True)
-                pdf.ln()
-                is_header = False
+        elif kind == "rule":
             pdf.ln(style["paragraph_spacing"])
-            pdf.set_text_color(*style["colors"]["default_text"])
+            pdf.set_draw_color(*style["colors"]["rule"])
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+            pdf.ln(style["paragraph_spacing"])
+
+        elif kind == "quote":
+            left_margin = pdf.l_margin
+            pdf.set_left_margin(left_margin + style["list_indent"])
+            pdf.set_x(pdf.l_margin)
+            for child in block.blocks:
+                if child.kind == "paragraph":
+                    spans = [(t, f | ITALIC, h) for t, f, h in child.spans]
+                    PDFSettings.write_spans(pdf, spans, style)
+                    pdf.ln(style["line_height"] + style["paragraph_spacing"])
+                else:
+                    PDFSettings.render_block(pdf, child, style)
+            pdf.set_left_margin(left_margin)
+            pdf.set_x(left_margin)
 
-        else:
-            text = re.sub(r"<[^>]+>", "", section)
-            if text.strip():
-                normal_font = style["fonts"]["normal"]
-                pdf.set_font(
-                    normal_font["name"], normal_font["style"], normal_font["size"]
-                )
-                pdf.write(style["line_height"], text)
-                pdf.ln(style["paragraph_spacing"])
+        elif block.spans:
+            PDFSettings.write_spans(pdf, block.spans, style)
+            pdf.ln(style["line_height"] + style["paragraph_spacing"])
 
     @staticmethod
-    def render_list(pdf, section, style):
-        import re
-
-        list_type = "ul" if section.startswith("<ul>") else "ol"
-        items = re.findall(r"<li>(.*?)</li>", section, re.DOTALL)
+    def render_table(pdf, block, style):
+        colors = style["colors"]
+        PDFSettings.set_font_config(pdf, style["fonts"]["table_cell"])
+        header_font = style["fonts"]["table_header"]
+        aligns = [(align or "left").upper() for align in block.aligns]
+        with pdf.table(
+            line_height=style["line_height"] + 1,
+            headings_style=FontFace(
+                family=header_font["name"],
+                emphasis="BOLD",
+                size_pt=header_font["size"],
+                color=colors["table_header_text"],
+                fill_color=colors["table_header_bg"],
+            ),
+            cell_fill_color=colors["table_row_bg"],
+            cell_fill_mode="ROWS",
+        ) as table:
+            for row in [block.header] + block.rows:
+                cells = table.row()
+                for spans, align in zip(row, aligns):
+                    cells.cell(markdown_ir.plain_text(spans), align=align)
+        pdf.ln(style["paragraph_spacing"])
 
-        normal_font = style["fonts"]["normal"]
-        bold_font = style["fonts"]["bold"]
+    @staticmethod
+    def render_list(pdf, block, style, level=0):
         indent = style["list_indent"]
+        left_margin = pdf.l_margin
+        item_margin = left_margin + indent
 
-        for i, item_text in enumerate(items):
-            pdf.set_x(pdf.get_x() + indent)
-            item_text = re.sub(r"<[^>]+>", "", item_text).strip()
-
-            # Create bullet point or number
-            if list_type == "ul":
-                bullet = "•"
-                pdf.set_font(
-                    normal_font["name"], normal_font["style"], normal_font["size"]
-                )
-                pdf.write(style["line_height"], f"{bullet} ")
-            else:
-                number = f"{i + 1}."
-                pdf.set_font(
-                    normal_font["name"], normal_font["style"], normal_font["size"]
-                )
-                pdf.write(style["line_height"], f"{number} ")
-
-            # Handle text with potential bold sections
-            parts = re.split(r"(\*\*.*?\*\*)", item_text)
-            for j, part in enumerate(parts):
-                if j % 2 == 1:  # Bold text
-                    pdf.set_font(
-                        bold_font["name"], bold_font["style"], bold_font["size"]
-                    )
-                    pdf.write(style["line_height"], part.replace("**", ""))
-                    pdf.set_font(
-                        normal_font["name"], normal_font["style"], normal_font["size"]
-                    )
-                else:  # Regular text
-                    pdf.write(style["line_height"], part)
+        for number, item in enumerate(block.items, block.start):
+            pdf.set_left_margin(item_margin)
+            pdf.set_x(left_margin + indent / 2)
+            PDFSettings.set_font_config(pdf, style["fonts"]["normal"])
+            pdf.write(style["line_height"], f"{number}. " if block.ordered else "• ")
+            if not item or item[0].kind != "paragraph":
+                pdf.ln(style["line_height"] + style["bullet_spacing"])
 
-            pdf.ln(style["bullet_spacing"] + 3)
-            pdf.set_x(pdf.get_x() - indent)  # Reset x position
+            for child in item:
+                if child.kind == "list":
+                    PDFSettings.render_list(pdf, child, style, level + 1)
+                elif child.kind == "paragraph":
+                    PDFSettings.write_spans(pdf, child.spans, style)
+                    pdf.ln(style["line_height"] + style["bullet_spacing"])
+                else:
+                    PDFSettings.render_block(pdf, child, style)
+            pdf.set_left_margin(left_margin)
+            pdf.set_x(left_margin)
 
-        pdf.ln(style["paragraph_spacing"])
+        if level == 0:
+            pdf.ln(style["paragraph_spacing"])